@@ -0,0 +1,49 @@
+""" Exact ``nunique`` against the HyperLogLog estimate of ``approx_nunique``
+
+Reports the time taken and the relative error of the estimate for columns of
+increasing cardinality, on a NumPy array and on the same data in chunks.
+
+    $ python benchmarks/bench_nunique.py
+"""
+from __future__ import absolute_import, division, print_function
+
+from timeit import default_timer
+
+import numpy as np
+from odo.chunks import chunks
+
+from blaze import compute, symbol
+
+
+def timeit(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = default_timer()
+        result = func()
+        best = min(best, default_timer() - start)
+    return best, result
+
+
+def main(n=10 ** 6, chunksize=10 ** 5):
+    s = symbol('s', 'var * int64')
+    rng = np.random.RandomState(0)
+
+    print('%d rows, chunks of %d' % (n, chunksize))
+    print('%-10s %-8s %12s %12s %10s' % ('distinct', 'data', 'exact ms',
+                                         'approx ms', 'error %'))
+    for cardinality in [10 ** 2, 10 ** 4, 10 ** 6]:
+        x = rng.randint(0, cardinality, size=n).astype('int64')
+        cx = chunks(np.ndarray)([x[i:i + chunksize]
+                                 for i in range(0, n, chunksize)])
+        for name, data in [('array', x), ('chunks', cx)]:
+            exact_time, exact = timeit(
+                lambda: compute(s.nunique(), {s: data}))
+            approx_time, approx = timeit(
+                lambda: compute(s.nunique(approx=True), {s: data}))
+            print('%-10d %-8s %12.1f %12.1f %10.2f' % (
+                cardinality, name, exact_time * 1e3, approx_time * 1e3,
+                abs(approx - exact) / exact * 100))
+
+
+if __name__ == '__main__':
+    main()
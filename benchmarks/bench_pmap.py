@@ -0,0 +1,64 @@
+""" Scaling of ``ProcessPool`` from one worker to one per core
+
+Reports the time taken by the builtin ``map``, a thread pool and process
+pools of increasing size on chunks of a NumPy array, and on a bcolz table
+when bcolz is installed.
+
+    $ python benchmarks/bench_pmap.py
+"""
+from __future__ import absolute_import, division, print_function
+
+from multiprocessing.pool import ThreadPool
+from timeit import default_timer
+
+import numpy as np
+import psutil
+from odo.chunks import chunks
+
+from blaze import ProcessPool, compute, symbol
+
+
+def timeit(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = default_timer()
+        result = func()
+        best = min(best, default_timer() - start)
+    return best, result
+
+
+def datasets(n, chunksize):
+    rng = np.random.RandomState(0)
+    x = rng.randint(0, n // 10, size=n).astype('int64')
+    yield 'chunks', chunks(np.ndarray)([x[i:i + chunksize]
+                                        for i in range(0, n, chunksize)])
+    try:
+        import bcolz
+    except ImportError:
+        return
+    yield 'bcolz', bcolz.carray(x, chunklen=chunksize)
+
+
+def main(n=10 ** 7, chunksize=10 ** 6):
+    cores = psutil.cpu_count()
+    pools = [('map', map), ('threads', ThreadPool(cores).map)]
+    pools.extend(('%d procs' % k, ProcessPool(k).map)
+                 for k in sorted(set([1, 2, 4, cores])) if k <= cores)
+
+    print('%d rows, chunks of %d, %d cores' % (n, chunksize, cores))
+    print('%-8s %-10s %12s %12s' % ('data', 'map', 'nunique ms',
+                                    'quantile ms'))
+    s = symbol('s', 'var * int64')
+    for name, data in datasets(n, chunksize):
+        for pool_name, pmap in pools:
+            kwargs = {'map': pmap, 'chunksize': chunksize}
+            nunique_time, _ = timeit(
+                lambda: compute(s.nunique(), data, **kwargs))
+            quantile_time, _ = timeit(
+                lambda: compute(s.quantile(0.9), data, **kwargs))
+            print('%-8s %-10s %12.1f %12.1f' % (
+                name, pool_name, nunique_time * 1e3, quantile_time * 1e3))
+
+
+if __name__ == '__main__':
+    main()
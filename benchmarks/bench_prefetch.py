@@ -0,0 +1,75 @@
+""" Throughput of chunked computation with and without read-ahead
+
+Reports rows per second for a reduction over the example CSV and HDF5 files,
+repeated to a few hundred MB, for increasing ``prefetch_depth``.
+
+    $ python benchmarks/bench_prefetch.py
+"""
+from __future__ import absolute_import, division, print_function
+
+import os
+import shutil
+import tempfile
+from timeit import default_timer
+
+import pandas as pd
+from odo import odo
+
+from blaze import Data, compute
+from blaze.utils import example
+
+
+def timeit(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = default_timer()
+        result = func()
+        best = min(best, default_timer() - start)
+    return best, result
+
+
+def make_csv(dirname, copies):
+    """ The example HMDA file, repeated ``copies`` times """
+    source = example('hmda-small.csv')
+    path = os.path.join(dirname, 'hmda.csv')
+    with open(source) as f:
+        header, body = f.readline(), f.read()
+    with open(path, 'w') as f:
+        f.write(header)
+        for _ in range(copies):
+            f.write(body)
+    return path
+
+
+def make_hdf5(dirname, copies):
+    """ The example accounts table, repeated ``copies`` times """
+    df = odo(example('accounts.h5') + '::/accounts', pd.DataFrame)
+    df = pd.concat([df] * copies, ignore_index=True)
+    path = os.path.join(dirname, 'accounts.h5')
+    df.to_hdf(path, 'accounts', format='table')
+    return path
+
+
+def main(depths=(0, 1, 2, 4, 8)):
+    dirname = tempfile.mkdtemp()
+    try:
+        files = [
+            ('csv', Data(make_csv(dirname, 1000)), 'applicant_income_000s'),
+            ('hdf5', Data(make_hdf5(dirname, 2 * 10 ** 6)).accounts, 'amount'),
+        ]
+        print('%-6s %6s %10s %14s' % ('file', 'depth', 'ms', 'rows / s'))
+        for name, d, column in files:
+            expr = d[column].sum()
+            nrows = compute(d.nrows)
+            for depth in depths:
+                duration, _ = timeit(
+                    lambda: compute(expr, prefetch_depth=depth))
+                print('%-6s %6d %10.1f %14.0f' % (name, depth,
+                                                  duration * 1e3,
+                                                  nrows / duration))
+    finally:
+        shutil.rmtree(dirname)
+
+
+if __name__ == '__main__':
+    main()
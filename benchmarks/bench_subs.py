@@ -0,0 +1,88 @@
+""" Allocations made by ``compute`` and by substitution
+
+Counts the memory blocks allocated and the expression nodes constructed by a
+single call, after a warm up call so that caches are populated.
+
+    $ python benchmarks/bench_subs.py
+"""
+from __future__ import absolute_import, division, print_function
+
+import gc
+import tracemalloc
+from contextlib import contextmanager
+from timeit import default_timer
+
+import pandas as pd
+
+from blaze import symbol, compute, by, summary
+from blaze.expr.core import _Interned, subs
+
+
+@contextmanager
+def count_nodes():
+    """ Count the expression nodes constructed within the block """
+    counts = [0]
+    call = _Interned.__call__
+    # ``set_interning`` only installs ``__call__`` while interning is on
+    installed = '__call__' in vars(_Interned)
+
+    def counting_call(cls, *args, **kwargs):
+        counts[0] += 1
+        return call(cls, *args, **kwargs)
+
+    _Interned.__call__ = counting_call
+    try:
+        yield counts
+    finally:
+        if installed:
+            _Interned.__call__ = call
+        else:
+            del _Interned.__call__
+
+
+def measure(func, repeat=20):
+    func()  # warm up caches
+    gc.collect()
+    with count_nodes() as nodes:
+        func()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    func()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in
+                 after.compare_to(before, 'filename') if stat.count_diff > 0)
+    start = default_timer()
+    for _ in range(repeat):
+        func()
+    duration = (default_timer() - start) / repeat
+    return nodes[0], blocks, duration
+
+
+def main():
+    names = ['f%d' % i for i in range(50)]
+    t = symbol('t', 'var * {%s}' % ', '.join('%s: int64' % n for n in names))
+    s = symbol('s', t.dshape)
+    df = pd.DataFrame(dict((n, range(1000)) for n in names), columns=names)
+
+    wide = summary(**dict(('%s_sum' % n, t[n].sum()) for n in names))
+    cases = [
+        ('subs, nothing to replace',
+         lambda: subs(wide, {s: t})),
+        ('subs, rename one leaf',
+         lambda: subs(wide, {t: s})),
+        ('compute reduction',
+         lambda: compute(t[t.f0 > 500].f1.sum(), df)),
+        ('compute by',
+         lambda: compute(by(t.f0 % 10, total=t.f1.sum()), df)),
+        ('compute 50-way summary',
+         lambda: compute(wide, df)),
+    ]
+    print('%-28s %8s %10s %10s' % ('case', 'nodes', 'blocks', 'ms'))
+    for name, func in cases:
+        nodes, blocks, duration = measure(func)
+        print('%-28s %8d %10d %10.3f' % (name, nodes, blocks, duration * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+""" Building and optimizing expressions on a 10,000-column table
+
+The cost of selecting ``k`` columns should grow with ``k``, not with the
+width of the table.
+
+    $ python benchmarks/bench_wide.py
+"""
+from __future__ import absolute_import, division, print_function
+
+from timeit import default_timer
+
+from blaze import symbol
+from blaze.expr.optimize import lean_projection
+
+
+def timeit(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = default_timer()
+        func()
+        best = min(best, default_timer() - start)
+    return best
+
+
+def main(width=10000):
+    names = ['c%d' % i for i in range(width)]
+    t = symbol('t', 'var * {%s}' % ', '.join('%s: float64' % n
+                                             for n in names))
+
+    print('%d columns' % width)
+    print('%-44s %10s' % ('case', 'ms'))
+    for k in [10, 100, 1000]:
+        cols = names[::width // k]
+        cases = [
+            ('t[cols]', lambda: t[cols]),
+            ('p[col] for each col of p = t[cols]',
+             lambda: [p[c].dshape for p in [t[cols]] for c in cols]),
+            ('t[col] for each col', lambda: [t[c].dshape for c in cols]),
+            ('lean_projection(t[cols].sort(...))',
+             lambda: lean_projection(t[cols].sort(cols[0])[cols[-1]])),
+        ]
+        for name, func in cases:
+            print('%-44s %10.3f' % ('%s, k=%d' % (name, k),
+                                    timeit(func) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -26,7 +26,7 @@ from .expr.arrays import (tensordot, transpose)
 from .expr.functions import *
 from .index import create_index
 from .interactive import *
-from .compute.pmap import set_default_pmap
+from .compute.pmap import set_default_pmap, ProcessPool
 from .compute.csv import *
 from .compute.json import *
 from .compute.python import *
@@ -35,6 +35,7 @@ from .compute.numpy import *
 from .compute.core import *
 from .compute.core import compute
 from .cached import CachedDataset
+from .compute.column_cache import ColumnCache
 
 with ignoring(ImportError):
     from .server import *
@@ -50,6 +50,17 @@ except ImportError:
 from toolz.compatibility import map, zip, range, reduce
 
 
+def with_metaclass(meta, *bases):
+    """ Create a base class with a metaclass """
+    # This requires a bit of explanation: the basic idea is to make a dummy
+    # metaclass for one level of class instantiation that replaces itself with
+    # the actual metaclass.
+    class metaclass(meta):
+        def __new__(cls, name, this_bases, d):
+            return meta(name, bases, d)
+    return type.__new__(metaclass, 'temporary_class', (), {})
+
+
 if PY2:
     _inttypes = (int, long)
     unicode = builtins.unicode
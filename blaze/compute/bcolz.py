@@ -13,15 +13,20 @@ from ..expr import (
     Head,
     Projection,
     Slice,
+    Sort,
     Symbol,
     path,
     symbol,
 )
-from ..expr.optimize import lean_projection, simple_selections
-from ..expr.split import split
+from ..expr.optimize import (fuse_top_k, lean_projection, push_selections,
+                             simple_selections)
+from ..expr.split import split, combiner
 from ..partition import partitions
 from .core import compute
-from .pmap import get_default_pmap
+from .chunks import combine_parts, streams_head, stream_head
+from .external_sort import external_sort, rowwise
+from .pmap import get_default_pmap, is_serial
+from ..utils import prefetch
 
 from collections import Iterator, Iterable
 import datashape
@@ -70,7 +75,8 @@ def box(type_):
 
 @dispatch(Expr, (box(bcolz.ctable), box(bcolz.carray)))
 def optimize(expr, _):
-    return simple_selections(lean_projection(expr))
+    expr = lean_projection(push_selections(expr, elemwise=True))
+    return simple_selections(fuse_top_k(expr))
 
 
 @dispatch(Expr, (bcolz.ctable, bcolz.carray))
@@ -94,17 +100,26 @@ def discover(data):
 Cheap = (Head, ElemWise, Distinct, Symbol)
 
 
-@dispatch(Head, (box(bcolz.ctable), box(bcolz.carray)))
-def compute_down(expr, data, **kwargs):
+@dispatch((Head, Slice), (box(bcolz.ctable), box(bcolz.carray)))
+def compute_down(expr, data, chunksize=None, **kwargs):
     """ Cheap and simple computation in simple case
 
     If we're given a head and the entire expression is cheap to do (e.g.
     elemwises, selections, ...) then compute on data directly, without
-    parallelism"""
+    parallelism.  Otherwise heads and slices of selections are computed a
+    chunk at a time, reading no more chunks than needed."""
     leaf = expr._leaves()[0]
-    if all(isinstance(e, Cheap) for e in path(expr, leaf)):
+    if isinstance(expr, Head) and all(isinstance(e, Cheap)
+                                      for e in path(expr, leaf)):
         val = data.value
         return compute(expr, {leaf: into(Iterator, val)}, **kwargs)
+    elif not expr._child.isidentical(leaf) and streams_head(expr, leaf):
+        data = data.value
+        if chunksize is None:
+            chunksize = max(2**16, get_chunksize(data))
+        parts = (data[index]
+                 for index in partitions(data, chunksize=(chunksize,)))
+        return stream_head(expr, leaf, parts)
     else:
         raise MDNotImplementedError()
 
@@ -129,6 +144,10 @@ def compute_chunk(source, chunk, chunk_expr, data_index):
     return compute(chunk_expr, {chunk: part})
 
 
+def compute_read_chunk(chunk, chunk_expr, part):
+    return compute(chunk_expr, {chunk: part})
+
+
 def get_chunksize(data):
     if isinstance(data, bcolz.carray):
         return data.chunklen
@@ -140,7 +159,8 @@ def get_chunksize(data):
 
 
 @dispatch(Expr, (box(bcolz.carray), box(bcolz.ctable)))
-def compute_down(expr, data, chunksize=None, map=None, **kwargs):
+def compute_down(expr, data, chunksize=None, map=None, prefetch_depth=2,
+                 **kwargs):
     data = data.value
     if map is None:
         map = get_default_pmap()
@@ -165,22 +185,38 @@ def compute_down(expr, data, chunksize=None, map=None, **kwargs):
 
     data_parts = partitions(data, chunksize=(chunksize,))
 
-    parts = list(map(curry(compute_chunk, data, chunk, chunk_expr),
-                     data_parts))
-
-    if isinstance(parts[0], np.ndarray):
-        intermediate = np.concatenate(parts)
-    elif isinstance(parts[0], pd.DataFrame):
-        intermediate = pd.concat(parts)
-    elif isinstance(parts[0], Iterable):
-        intermediate = list(concat(parts))
+    if is_serial(map) and prefetch_depth:
+        # Decompress the next chunks while computing on this one
+        read = prefetch((data[index] for index in data_parts), prefetch_depth)
+        parts = map(curry(compute_read_chunk, chunk, chunk_expr), read)
     else:
-        raise TypeError("Don't know how to concatenate objects of type %r" %
-                        type(parts[0]).__name__)
+        # Parallel maps read their own chunks given partition keys
+        parts = map(curry(compute_chunk, data, chunk, chunk_expr), data_parts)
+    intermediate = combine_parts(parts, agg, combiner(leaf, expr, agg))
 
     return compute(agg_expr, {agg: intermediate})
 
 
+@dispatch(Sort, (box(bcolz.carray), box(bcolz.ctable)))
+def compute_down(expr, data, chunksize=None, map=None,
+                 comfortable_memory=None, prefetch_depth=2, **kwargs):
+    """ Sort the table a chunk at a time with an external merge sort """
+    data = data.value
+    leaf = expr._leaves()[0]
+    if not all(isinstance(e, rowwise) for e in path(expr._child, leaf)):
+        raise MDNotImplementedError()
+    if map is None:
+        map = get_default_pmap()
+    if chunksize is None:
+        chunksize = max(2**16, get_chunksize(data))
+
+    parts = prefetch((data[index]
+                      for index in partitions(data, chunksize=(chunksize,))),
+                     prefetch_depth)
+    return external_sort(expr, leaf, parts, map=map,
+                         comfortable_memory=comfortable_memory)
+
+
 def _asarray(a):
     if isinstance(a, (bcolz.carray, bcolz.ctable)):
         return a[:]
@@ -9,18 +9,33 @@ from datashape.dispatch import dispatch
 import pandas as pd
 import numpy as np
 
-from ..expr import Head, ElemWise, Distinct, Symbol, Expr, path
-from ..expr.split import split
-from .core import compute
+import datashape
+
+from ..compatibility import _inttypes
+from ..expr import (Head, ElemWise, Distinct, Symbol, Expr, Join, Slice, Sort,
+                    Reduction, Summary, path, symbol)
+from ..expr.optimize import fuse_top_k
+from ..expr.split import split, combiner
+from .core import compute, optimize
+from .external_sort import external_sort, rowwise
+from .hash_join import partitioned_join
 from .pmap import get_default_pmap
+from ..utils import prefetch
 
 
-__all__ = ['Cheap', 'compute_chunk', 'compute_down']
+__all__ = ['Cheap', 'compute_chunk', 'compute_down', 'compute_up',
+           'concat_parts', 'combine_parts', 'streams_head', 'stream_head',
+           'drop_unordered_sorts', 'optimize']
 
 
 Cheap = (Head, ElemWise, Distinct, Symbol)
 
 
+@dispatch(Expr, Chunks)
+def optimize(expr, data):
+    return fuse_top_k(expr)
+
+
 @dispatch(Head, Chunks)
 def pre_compute(expr, data, **kwargs):
     leaf = expr._leaves()[0]
@@ -34,33 +49,236 @@ def compute_chunk(chunk, chunk_expr, part):
     return compute(chunk_expr, {chunk: part})
 
 
+def concat_parts(parts):
+    """ Concatenate the results of computing on several chunks """
+    if isinstance(parts[0], np.ndarray):
+        return np.concatenate(parts)
+    elif isinstance(parts[0], pd.DataFrame):
+        return pd.concat(parts)
+    elif isinstance(parts[0], (Iterable, Iterator)):
+        return list(concat(parts))
+    else:
+        raise TypeError("Don't know how to concatenate objects of type %r" %
+                        type(parts[0]).__name__)
+
+
+def combine_parts(parts, agg, combine_expr, fanout=8):
+    """ Concatenate chunk results, combining them as they arrive
+
+    Results are combined in a tree: every ``fanout`` results at one level are
+    concatenated and reduced with ``combine_expr`` into a single result at the
+    next level.  At most ``fanout`` results are held per level, rather than
+    one per chunk.  Without a ``combine_expr`` all results are concatenated.
+
+    >>> from blaze import symbol
+    >>> agg = symbol('agg', 'var * int64')
+    >>> parts = iter([[1], [2], [3], [4], [5]])
+    >>> combine_parts(parts, agg, agg.sum(keepdims=True), fanout=2)
+    [10, 5]
+    """
+    if combine_expr is None:
+        return concat_parts(list(parts))
+    levels = [[]]
+    for part in parts:
+        levels[0].append(part)
+        for i, level in enumerate(levels):
+            if len(level) < fanout:
+                break
+            if i + 1 == len(levels):
+                levels.append([])
+            combined = compute(combine_expr, {agg: concat_parts(level)})
+            levels[i + 1].append(combined)
+            del level[:]
+    return concat_parts([p for level in reversed(levels) for p in level])
+
+
+def _head_stop(expr):
+    """ How many rows from the start of its child ``expr`` needs, if it is a
+    ``Head`` or a slice from the start of a collection
+
+    >>> t = symbol('t', 'var * {name: string, amount: int}')
+    >>> _head_stop(t.head(5)), _head_stop(t[2:7]), _head_stop(t[3])
+    (5, 7, 4)
+    >>> _head_stop(t[-3:]) is None
+    True
+    """
+    if isinstance(expr, Head):
+        return expr.n
+    if not isinstance(expr, Slice):
+        return None
+    index = expr.index
+    if isinstance(index, tuple):
+        if len(index) != 1:
+            return None
+        index, = index
+    if isinstance(index, slice):
+        if ((index.start or 0) < 0 or (index.step or 1) < 0 or
+                index.stop is None or index.stop < 0):
+            return None
+        return index.stop
+    if isinstance(index, _inttypes) and index >= 0:
+        return index + 1
+    return None
+
+
+def streams_head(expr, leaf):
+    """ Whether ``stream_head`` can compute ``expr`` on chunks of ``leaf``
+
+    That is ``expr`` is a ``Head`` or ``Slice`` of a one dimensional
+    pipeline of selections and element-wise operations.
+
+    >>> t = symbol('t', 'var * {name: string, amount: int}')
+    >>> streams_head(t[t.amount > 0].name.head(5), t)
+    True
+    >>> streams_head(t.name.distinct().head(5), t)
+    False
+    """
+    return (_head_stop(expr) is not None and expr._child.ndim == 1 and
+            all(isinstance(e, rowwise) for e in path(expr._child, leaf)))
+
+
+def stream_head(expr, leaf, parts):
+    """ Compute ``expr``, a ``Head`` or ``Slice``, on chunks of ``leaf``
+
+    The child of ``expr`` is computed on one chunk at a time, and no more
+    chunks are read once it has produced enough rows.
+
+    >>> t = symbol('t', 'var * {name: string, amount: int}')
+    >>> parts = iter([[('Alice', 100)], [('Bob', -50), ('Charlie', 20)],
+    ...               [('Dan', 300)], [('Edith', 10)]])
+    >>> stream_head(t[t.amount > 0].head(2), t, parts)
+    (('Alice', 100), ('Charlie', 20))
+    >>> next(parts)
+    ('Dan', 300)
+    """
+    stop = _head_stop(expr)
+    chunk = symbol('chunk', datashape.var * leaf.dshape.measure)
+    chunk_expr = expr._child._subs({leaf: chunk})
+
+    pieces, nrows = [], 0
+    for part in parts:
+        piece = compute(chunk_expr, {chunk: part})
+        if isinstance(piece, Iterator):
+            piece = list(piece)
+        pieces.append(piece)
+        nrows += len(piece)
+        if nrows >= stop:
+            break
+
+    agg = symbol('aggregate', datashape.var * expr._child.dshape.measure)
+    if not pieces:
+        return compute(expr._subs({expr._child: agg}), {agg: []})
+    return compute(expr._subs({expr._child: agg}),
+                   {agg: concat_parts(pieces)})
+
+
+def _sorts_rows(expr, leaf):
+    """ Whether ``expr`` is a sort that can be computed chunk by chunk """
+    return (isinstance(expr, Sort) and
+            all(isinstance(e, rowwise) for e in path(expr._child, leaf)))
+
+
+def _order_matters(expr, sort):
+    """ Whether the order of the rows of ``sort`` shows in ``expr``
+
+    It does unless the sorted rows only go through row by row operations
+    into a reduction.
+
+    >>> t = symbol('t', 'var * {a: int, b: int}')
+    >>> s = t.sort('a')
+    >>> _order_matters(s.b.sum(), s)
+    False
+    >>> _order_matters(s.b.head(5).sum(), s)
+    True
+    """
+    for e in reversed(list(path(expr, sort))[:-1]):
+        if isinstance(e, (Reduction, Summary)):
+            return False
+        if not isinstance(e, rowwise):
+            return True
+    return True
+
+
+def drop_unordered_sorts(expr, leaf):
+    """ Remove the sorts whose order does not show in ``expr``, e.g. in
+    ``t.sort('a').b.sum()``
+
+    >>> t = symbol('t', 'var * {a: int, b: int}')
+    >>> drop_unordered_sorts(t.sort('a').b.sum(), t)
+    sum(t.b)
+    """
+    for sort in [e for e in path(expr, leaf) if isinstance(e, Sort)]:
+        if not _order_matters(expr, sort):
+            expr = expr._subs({sort: sort._child})
+    return expr
+
+
 @dispatch(Expr, Chunks)
-def compute_down(expr, data, map=None, **kwargs):
+def compute_down(expr, data, map=None, prefetch_depth=2, **kwargs):
+    """ Compute on each chunk with ``split``, reading up to
+    ``prefetch_depth`` chunks ahead on a background thread """
     if map is None:
         map = get_default_pmap()
 
     leaf = expr._leaves()[0]
+    expr = drop_unordered_sorts(expr, leaf)
+
+    # Sort in chunks first, then compute the rest on the sorted rows
+    sorts = [e for e in path(expr, leaf) if _sorts_rows(e, leaf)]
+    if sorts:
+        sort = sorts[-1]
+        rows = compute_down(sort, data, map=map,
+                            prefetch_depth=prefetch_depth, **kwargs)
+        sorted_ = symbol('sorted', sort.dshape)
+        return compute(expr._subs({sort: sorted_}), {sorted_: rows})
 
     (chunk, chunk_expr), (agg, agg_expr) = split(leaf, expr)
 
-    parts = list(map(curry(compute_chunk, chunk, chunk_expr), data))
-
-    if isinstance(parts[0], np.ndarray):
-        intermediate = np.concatenate(parts)
-    elif isinstance(parts[0], pd.DataFrame):
-        intermediate = pd.concat(parts)
-    elif isinstance(parts[0], (Iterable, Iterator)):
-        intermediate = list(concat(parts))
+    parts = map(curry(compute_chunk, chunk, chunk_expr),
+                prefetch(data, prefetch_depth))
+    intermediate = combine_parts(parts, agg, combiner(leaf, expr, agg))
 
     return compute(agg_expr, {agg: intermediate})
 
 
 Cheap = (Head, ElemWise, Distinct, Symbol)
 
-@dispatch(Head, Chunks)
+@dispatch((Head, Slice), Chunks)
 def compute_down(expr, data, **kwargs):
     leaf = expr._leaves()[0]
-    if all(isinstance(e, Cheap) for e in path(expr, leaf)):
+    if isinstance(expr, Head) and all(isinstance(e, Cheap)
+                                      for e in path(expr, leaf)):
         return compute(expr, {leaf: into(Iterator, data)}, **kwargs)
+    elif streams_head(expr, leaf):
+        return stream_head(expr, leaf, data)
     else:
         raise MDNotImplementedError()
+
+
+@dispatch(Sort, Chunks)
+def compute_down(expr, data, map=None, comfortable_memory=None,
+                 prefetch_depth=2, **kwargs):
+    """ Sort chunks with an external merge sort, see ``external_sort`` """
+    leaf = expr._leaves()[0]
+    if not _sorts_rows(expr, leaf):
+        raise MDNotImplementedError()
+    if map is None:
+        map = get_default_pmap()
+    return external_sort(expr, leaf, prefetch(data, prefetch_depth), map=map,
+                         comfortable_memory=comfortable_memory)
+
+
+@dispatch(Join, Chunks, Chunks)
+def compute_up(expr, lhs, rhs, npartitions=16, **kwargs):
+    """ Join chunks with a partitioned hash join, see ``partitioned_join`` """
+    return partitioned_join(expr, lhs, rhs, npartitions=npartitions)
+
+
+@dispatch(Join, Chunks, pd.DataFrame)
+def compute_up(expr, lhs, rhs, npartitions=16, **kwargs):
+    return partitioned_join(expr, lhs, [rhs], npartitions=npartitions)
+
+
+@dispatch(Join, pd.DataFrame, Chunks)
+def compute_up(expr, lhs, rhs, npartitions=16, **kwargs):
+    return partitioned_join(expr, [lhs], rhs, npartitions=npartitions)
@@ -0,0 +1,424 @@
+"""
+A columnar cache of CSV files
+
+Parsing text is the slow part of computing on a CSV file, and it happens on
+every query.  ``ColumnCache`` wraps a CSV file and, on first use, parses it
+once more in the background into a directory next to it:
+
+*   one ``.npy`` file per column, which later queries memory map, reading
+    only the columns they use
+*   ``meta.json`` with the datashape of the file and the modification time
+    and size of the file when it was parsed
+
+Text columns are dictionary encoded: their ``.npy`` file holds integer codes
+into a second file of distinct values, ``-1`` for missing values.
+
+The cache is used while the modification time and size of the file match
+``meta.json``.  Otherwise queries parse the file as usual and the cache is
+rebuilt in the background.
+"""
+from __future__ import absolute_import, division, print_function
+
+from collections import OrderedDict
+import json
+import os
+import shutil
+import tempfile
+import threading
+import warnings
+
+import datashape
+from datashape import discover
+import numpy as np
+import pandas as pd
+from odo import into
+from odo.chunks import chunks
+from odo.backends.csv import CSV
+
+from ..compatibility import _strtypes
+from ..dispatch import dispatch
+from ..expr import Expr, Join, Symbol
+from ..utils import available_memory
+from .core import compute, compute_up
+from .csv import _read_csv, _usecols, optimize
+
+
+__all__ = ['ColumnCache', 'pre_compute', 'compute_down', 'compute_up',
+           'discover']
+
+
+class _ColumnWriter(object):
+    """ Append chunks of a column to a file, written out as ``.npy`` on
+    ``close`` once the number of rows is known """
+    def __init__(self, dirname, i, text=False):
+        self.dirname = dirname
+        self.name = '%d.npy' % i
+        self.file = open(os.path.join(dirname, self.name + '.tmp'), 'wb')
+        self.text = text
+        self.dtype = None
+        self.codes = None
+        self.nrows = 0
+
+    def append(self, values):
+        values = np.asarray(values)
+        if self.dtype is None:
+            # A chunk of missing text parses as floats, so trust the datashape
+            if self.text or values.dtype == object:
+                self.codes = OrderedDict()
+                self.dtype = np.dtype('i8')
+            else:
+                self.dtype = values.dtype
+        elif self.codes is None and values.dtype != self.dtype:
+            self.promote(values.dtype)
+        if self.codes is not None:
+            values = self.encode(values)
+        self.file.write(np.ascontiguousarray(values, dtype=self.dtype)
+                        .tobytes())
+        self.nrows += len(values)
+
+    def promote(self, dtype):
+        """ Rewrite the values written so far to a type that holds ``dtype``
+        too, e.g. floats once a missing value turns up in a column that
+        started out as integers
+
+        Without a common type, e.g. when the missing values of a column of
+        booleans parse as objects, values are encoded like text.
+        """
+        try:
+            dtype = np.result_type(self.dtype, dtype)
+        except TypeError:
+            dtype = np.dtype(object)
+        if dtype == self.dtype:
+            return
+        self.file.close()
+        written = np.fromfile(self.file.name, dtype=self.dtype)
+        if dtype == object:
+            self.codes = OrderedDict()
+            written = self.encode(written)
+            dtype = np.dtype('i8')
+        self.dtype = dtype
+        self.file = open(self.file.name, 'wb')
+        self.file.write(np.ascontiguousarray(written, dtype=dtype).tobytes())
+
+    def encode(self, values):
+        """ Integer codes of text values, -1 where they are missing """
+        present = ~pd.isnull(values)
+        for value in pd.unique(values[present]):
+            if value not in self.codes:
+                self.codes[value] = len(self.codes)
+        codes = np.empty(len(values), dtype='i8')
+        codes.fill(-1)
+        codes[present] = [self.codes[v] for v in values[present]]
+        return codes
+
+    def close(self):
+        """ Write the ``.npy`` file, returns the metadata of the column """
+        self.file.close()
+        tmp = os.path.join(self.dirname, self.name + '.tmp')
+        header = {'descr': np.lib.format.dtype_to_descr(self.dtype),
+                  'fortran_order': False, 'shape': (self.nrows,)}
+        with open(os.path.join(self.dirname, self.name), 'wb') as f:
+            np.lib.format.write_array_header_1_0(f, header)
+            with open(tmp, 'rb') as src:
+                shutil.copyfileobj(src, f)
+        os.remove(tmp)
+        meta = {'file': self.name, 'values': None, 'pickled': False}
+        if self.codes is not None:
+            values = np.array(list(self.codes))
+            meta['values'] = self.name.replace('.npy', '.values.npy')
+            meta['pickled'] = bool(values.dtype == object)
+            np.save(os.path.join(self.dirname, meta['values']), values)
+        return meta
+
+
+def _load_values(dirname, column):
+    """ The distinct values of a text column written by ``_ColumnWriter``,
+    followed by a missing value for code -1 """
+    path = os.path.join(dirname, column['values'])
+    if column['pickled']:
+        text = np.load(path, allow_pickle=True)
+    else:
+        text = np.load(path, mmap_mode='r')
+    return np.append(text.astype(object), [np.nan])
+
+
+def _read_column(dirname, column, start=None, stop=None, values=None):
+    """ Read rows ``start:stop`` of a column written by ``_ColumnWriter``
+
+    The distinct ``values`` of a text column are loaded if not given.
+    """
+    codes = np.load(os.path.join(dirname, column['file']), mmap_mode='r')
+    codes = codes[start:stop]
+    if column['values'] is None:
+        return codes
+    if values is None:
+        values = _load_values(dirname, column)
+    return values[codes]
+
+
+def _istext(ds):
+    """ Whether a column of type ``ds`` holds text
+
+    >>> _istext(datashape.dshape('?string'))
+    True
+    >>> _istext(datashape.dshape('int64'))
+    False
+    """
+    measure = getattr(ds, 'measure', ds)
+    return isinstance(getattr(measure, 'ty', measure), datashape.String)
+
+
+# Directories with a build running in the background
+_building = dict()
+_lock = threading.Lock()
+
+
+class ColumnCache(object):
+
+    """ A CSV file with a columnar cache of its contents next to it
+
+    Parameters
+    ----------
+
+    data : str or CSV
+        The CSV file, or a path to it
+    dirname : str, optional
+        The directory of the cache, ``<path>.columns`` by default
+    chunksize : int, optional
+        The number of rows parsed at a time when building the cache
+    kwargs :
+        Passed on to ``CSV`` when ``data`` is a path
+
+    Examples
+    --------
+
+    >>> from blaze import Data
+    >>> cache = ColumnCache('accounts.csv')  # doctest: +SKIP
+    >>> d = Data(cache)  # doctest: +SKIP
+    >>> d.amount.sum()  # doctest: +SKIP
+
+    The first query starts to build the cache in the background.  Call
+    ``refresh().join()`` to wait for it.
+
+    >>> cache.refresh().join()  # doctest: +SKIP
+    """
+
+    def __init__(self, data, dirname=None, chunksize=2**18, **kwargs):
+        if isinstance(data, _strtypes):
+            data = CSV(data, **kwargs)
+        self.csv = data
+        self.dirname = dirname or data.path + '.columns'
+        self.chunksize = chunksize
+
+    @property
+    def path(self):
+        return self.csv.path
+
+    def metadata(self):
+        """ The metadata of the cache, or ``None`` if it is missing or out of
+        date """
+        try:
+            with open(os.path.join(self.dirname, 'meta.json')) as f:
+                meta = json.load(f)
+            stat = os.stat(self.path)
+        except (IOError, OSError, ValueError):
+            return None
+        if meta['mtime'] != stat.st_mtime or meta['size'] != stat.st_size:
+            return None
+        return meta
+
+    def build(self):
+        """ Parse the CSV file into the cache, replacing any old one """
+        stat = os.stat(self.path)
+        ds = discover(self.csv)
+        parent = os.path.dirname(os.path.abspath(self.dirname))
+        tmp = tempfile.mkdtemp(dir=parent,
+                               prefix=os.path.basename(self.dirname) + '.')
+        try:
+            names = ds.measure.names
+            writers = [_ColumnWriter(tmp, i, _istext(t))
+                       for i, t in enumerate(ds.measure.types)]
+            parts = into(chunks(pd.DataFrame), self.csv, dshape=ds,
+                         chunksize=self.chunksize)
+            for df in parts:
+                for writer, name in zip(writers, names):
+                    writer.append(df[name].values)
+            empty = into(pd.DataFrame, [], dshape=ds)
+            for writer, name in zip(writers, names):
+                if writer.dtype is None:
+                    writer.append(empty[name].values)
+            columns = [writer.close() for writer in writers]
+            for column, name in zip(columns, names):
+                column['name'] = name
+            meta = {'dshape': str(ds), 'mtime': stat.st_mtime,
+                    'size': stat.st_size,
+                    'nrows': writers[0].nrows if writers else 0,
+                    'columns': columns}
+            with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+                json.dump(meta, f)
+            # Move the old cache aside rather than removing it first, so that
+            # there is always a complete cache in place
+            old = tmp + '.old'
+            if os.path.exists(self.dirname):
+                os.rename(self.dirname, old)
+            try:
+                os.rename(tmp, self.dirname)
+            except:
+                if os.path.exists(old):
+                    os.rename(old, self.dirname)
+                raise
+            shutil.rmtree(old, ignore_errors=True)
+        except:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    def _build_in_background(self):
+        try:
+            self.build()
+        except Exception as e:
+            warnings.warn('Could not cache the columns of %s: %s'
+                          % (self.path, e))
+
+    def refresh(self):
+        """ Rebuild the cache in a background thread, unless a build of it is
+        already running
+
+        Returns the thread of the build.
+        """
+        with _lock:
+            thread = _building.get(self.dirname)
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(target=self._build_in_background)
+                thread.daemon = True
+                thread.start()
+                _building[self.dirname] = thread
+        return thread
+
+    def read(self, columns=None, start=None, stop=None, meta=None,
+             values=None):
+        """ Rows ``start:stop`` of some columns of the cache as a DataFrame
+
+        ``values`` maps the names of text columns to their distinct values,
+        see ``text_values``, so that reading many chunks loads them once.
+        """
+        meta = meta or self.metadata()
+        if meta is None:
+            raise ValueError('The column cache of %s is out of date'
+                             % self.path)
+        values = values or {}
+        cols = [c for c in meta['columns']
+                if columns is None or c['name'] in columns]
+        return pd.DataFrame(OrderedDict(
+            (c['name'], _read_column(self.dirname, c, start, stop,
+                                     values.get(c['name'])))
+            for c in cols), columns=[c['name'] for c in cols])
+
+    def text_values(self, columns=None, meta=None):
+        """ The distinct values of the text columns among ``columns``, by
+        name """
+        meta = meta or self.metadata()
+        return dict((c['name'], _load_values(self.dirname, c))
+                    for c in meta['columns']
+                    if c['values'] is not None and
+                    (columns is None or c['name'] in columns))
+
+    def __repr__(self):
+        return 'ColumnCache(%r)' % self.path
+
+
+@dispatch(ColumnCache)
+def discover(data, **kwargs):
+    meta = data.metadata()
+    if meta is None:
+        data.refresh()
+        return discover(data.csv, **kwargs)
+    return datashape.dshape(meta['dshape'])
+
+
+def _read(expr, data, comfortable_memory=None, chunksize=2**18, **kwargs):
+    """ Read the columns that ``expr`` uses from the cache
+
+    Columns larger than ``comfortable_memory`` are read in chunks of
+    ``chunksize`` rows.  Without an up to date cache the CSV file is parsed
+    as usual while the cache is rebuilt.
+    """
+    meta = data.metadata()
+    if meta is None:
+        data.refresh()
+        return _read_csv(expr, data.csv,
+                         comfortable_memory=comfortable_memory,
+                         chunksize=chunksize, **kwargs)
+    comfortable_memory = comfortable_memory or min(1e9, available_memory() / 4)
+
+    oexpr = optimize(expr, data.csv)
+    leaf = oexpr._leaves()[0]
+    usecols = _usecols(oexpr, leaf)
+    columns = [c for c in meta['columns']
+               if usecols is None or c['name'] in usecols]
+    names = [c['name'] for c in columns]
+
+    nrows = meta['nrows']
+    nbytes = sum(np.load(os.path.join(data.dirname, c['file']),
+                         mmap_mode='r').itemsize for c in columns) * nrows
+    if nbytes <= comfortable_memory:
+        return data.read(names, meta=meta)
+
+    def read_chunks():
+        values = data.text_values(names, meta=meta)
+        for i in range(0, max(nrows, 1), chunksize):
+            yield data.read(names, i, i + chunksize, meta=meta,
+                            values=values)
+    return chunks(pd.DataFrame)(read_chunks)
+
+
+@dispatch(Expr, ColumnCache)
+def pre_compute(expr, data, **kwargs):
+    """ Read the columns that ``expr`` uses from the cache, see ``_read``
+
+    ``compute`` passes only the leaf of the expression here, which is left
+    as it is for ``compute_down`` to read the columns that the whole
+    expression uses.
+    """
+    if isinstance(expr, Symbol):
+        return data
+    return _read(expr, data, **kwargs)
+
+
+@dispatch(Expr, ColumnCache)
+def compute_down(expr, data, **kwargs):
+    """ Read the columns that ``expr`` uses, then compute on them """
+    leaf = expr._leaves()[0]
+    return compute(expr, {leaf: _read(expr, data, **kwargs)}, **kwargs)
+
+
+@dispatch(Expr, ColumnCache)
+def compute_up(expr, data, **kwargs):
+    """ Compute a node of an expression with several leaves, e.g. a column
+    of one side of a join """
+    return compute_up(expr, _read(expr, data, **kwargs), **kwargs)
+
+
+@dispatch(Join, ColumnCache, ColumnCache)
+def compute_up(expr, lhs, rhs, **kwargs):
+    return compute_up(expr, _read(expr.lhs, lhs, **kwargs),
+                      _read(expr.rhs, rhs, **kwargs), **kwargs)
+
+
+@dispatch(Join, ColumnCache, object)
+def compute_up(expr, lhs, rhs, **kwargs):
+    return compute_up(expr, _read(expr.lhs, lhs, **kwargs), rhs, **kwargs)
+
+
+@dispatch(Join, object, ColumnCache)
+def compute_up(expr, lhs, rhs, **kwargs):
+    return compute_up(expr, lhs, _read(expr.rhs, rhs, **kwargs), **kwargs)
+
+
+@dispatch(Join, ColumnCache, CSV)
+def compute_up(expr, lhs, rhs, **kwargs):
+    return compute_up(expr, _read(expr.lhs, lhs, **kwargs), rhs, **kwargs)
+
+
+@dispatch(Join, CSV, ColumnCache)
+def compute_up(expr, lhs, rhs, **kwargs):
+    return compute_up(expr, lhs, _read(expr.rhs, rhs, **kwargs), **kwargs)
@@ -1,24 +1,265 @@
 from __future__ import absolute_import, division, print_function
 
-from collections import defaultdict, Iterator
+from collections import defaultdict, Iterator, OrderedDict, namedtuple
 from datetime import date, datetime
 import itertools
 import numbers
+import threading
 
 import toolz
 from toolz import first, unique, assoc
 import pandas as pd
 from odo import odo
+from multipledispatch import Dispatcher, MDNotImplementedError
 
 from ..compatibility import basestring
-from ..expr import Expr, Field, Symbol, symbol, Join
+from ..expr import Expr, Field, Symbol, symbol, Join, shared_subterms
+from ..expr.core import _same
+from ..expr.optimize import simplify
 from ..dispatch import dispatch
+from .trace import Trace, traced
 
-__all__ = ['compute', 'compute_up']
+__all__ = ['compute', 'compute_up', 'compute_shared', 'ComputeContext',
+           'PlanCache']
 
 base = numbers.Number, basestring, date, datetime
 
 
+PlanCacheInfo = namedtuple('PlanCacheInfo', 'hits misses maxsize currsize')
+
+
+class PlanCache(object):
+    """ A bounded cache of execution plans for ``compute``
+
+    While interpreting an expression ``compute`` searches for a strategy: it
+    probes ``compute_down``, falls back to ``compute_up`` from the leaves and
+    re-optimizes whenever the type of the data changes.  A plan records the
+    outcome of each of these decisions.  When the same expression is computed
+    again against the same types of data the plan is replayed, calling the
+    implementations that succeeded last time directly and skipping the ones
+    that failed.
+
+    Plans are keyed on the expression, the types of the data in scope and the
+    keyword arguments passed to ``compute``; calls with unhashable keyword
+    arguments are not cached.  The least recently used plan is evicted once
+    more than ``maxsize`` plans are held.  A plan whose recorded decisions stop applying (for example because
+    an implementation now raises ``NotImplementedError``) is abandoned midway
+    and re-recorded.  Plans do not notice new implementations registered after
+    they were recorded; call ``clear`` after registering them.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        The maximum number of plans to hold.
+
+    Examples
+    --------
+    >>> cache = PlanCache(maxsize=32)
+    >>> t = symbol('t', 'var * {name: string, amount: int}')
+    >>> data = [('Alice', 100), ('Bob', -50)]
+    >>> compute(t.amount.sum(), data, plan_cache=cache)
+    50
+    >>> compute(t.amount.sum(), data, plan_cache=cache)
+    50
+    >>> cache.info()
+    PlanCacheInfo(hits=1, misses=1, maxsize=32, currsize=1)
+
+    See Also
+    --------
+    blaze.compute.core.compute
+    """
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """ The plan stored under ``key`` or ``None``, counting hits and
+        misses
+        """
+        with self._lock:
+            try:
+                plan = self._plans.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self._plans[key] = plan  # mark as most recently used
+            self.hits += 1
+            return plan
+
+    def put(self, key, plan):
+        with self._lock:
+            self._plans.pop(key, None)
+            self._plans[key] = plan
+            while len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        return PlanCacheInfo(self.hits, self.misses, self.maxsize,
+                             len(self._plans))
+
+    def __len__(self):
+        return len(self._plans)
+
+
+default_plan_cache = PlanCache()
+
+_missing = object()
+
+
+class PlanRecorder(object):
+    """ Record the decisions made while computing one expression
+
+    Each decision is stored as a ``(key, outcome)`` pair in the order it is
+    made.  If a previously recorded plan is given then its outcomes are offered
+    back through ``replay`` for as long as the keys of new decisions match the
+    recorded ones.
+    """
+    __slots__ = 'steps', '_replay', '_index', 'diverged'
+
+    def __init__(self, replay=None):
+        self.steps = []
+        self._replay = replay
+        self._index = 0
+        self.diverged = replay is None
+
+    def replay(self, key):
+        """ The recorded outcome of the next decision
+
+        Returns ``_missing`` once the computation has strayed from the plan.
+        """
+        if not self.diverged:
+            i = self._index
+            self._index += 1
+            if i < len(self._replay) and _same_step(self._replay[i][0], key):
+                return self._replay[i][1]
+            self.diverged = True
+        return _missing
+
+    def record(self, key, outcome):
+        self.steps.append((key, outcome))
+
+
+def _same_step(a, b):
+    """ Whether the keys of two decisions are for the same call
+
+    Keys hold the expression the decision is about.  They are compared by
+    hash first, then structurally, so that expressions whose hashes collide
+    do not replay each other's decisions.
+    """
+    return hash(a) == hash(b) and _same(a, b)
+
+
+def _search(dispatcher, args, kwargs):
+    """ Call ``dispatcher`` on ``args``, returning the implementation that
+    succeeded along with its result
+
+    This follows ``Dispatcher.__call__``, moving on to the next most specific
+    implementation whenever one raises ``MDNotImplementedError``.  Plain
+    functions are simply called.
+    """
+    if not isinstance(dispatcher, Dispatcher):
+        return dispatcher, dispatcher(*args, **kwargs)
+
+    types = tuple(map(type, args))
+    func = dispatcher.dispatch(*types)
+    if func is None:
+        raise NotImplementedError('Could not find signature for %s: <%s>' %
+                                  (dispatcher.name,
+                                   ', '.join(t.__name__ for t in types)))
+    try:
+        return func, func(*args, **kwargs)
+    except MDNotImplementedError:
+        funcs = dispatcher.dispatch_iter(*types)
+        next(funcs)  # burn first
+        for func in funcs:
+            try:
+                return func, func(*args, **kwargs)
+            except MDNotImplementedError:
+                pass
+        raise NotImplementedError('Matching functions for %s: <%s> found, '
+                                  'but none completed successfully' %
+                                  (dispatcher.name,
+                                   ', '.join(t.__name__ for t in types)))
+
+
+def _planned_dispatch(plan, dispatcher, args, kwargs):
+    if plan is None:
+        return _search(dispatcher, args, kwargs)
+
+    key = (dispatcher.name, args[0], tuple(map(type, args)))
+    func = plan.replay(key)
+    if func is None:
+        plan.record(key, None)
+        raise NotImplementedError('%s previously failed on %s' %
+                                  (dispatcher.name, args[0]))
+    if func is not _missing:
+        try:
+            result = func(*args, **kwargs)
+        except NotImplementedError:
+            plan.diverged = True
+        else:
+            plan.record(key, func)
+            return func, result
+
+    try:
+        func, result = _search(dispatcher, args, kwargs)
+    except NotImplementedError:
+        plan.record(key, None)
+        raise
+    plan.record(key, func)
+    return func, result
+
+
+def planned_call(plan, dispatcher, *args, **kwargs):
+    """ Call ``dispatcher`` on ``args`` following ``plan``
+
+    Without a plan this is just ``dispatcher(*args, **kwargs)``.  Otherwise a
+    previously successful implementation is called directly and a previously
+    failing call raises ``NotImplementedError`` without being attempted.  The
+    choice made is recorded on ``plan``.
+    """
+    if plan is None:
+        return dispatcher(*args, **kwargs)
+    return _planned_dispatch(plan, dispatcher, args, kwargs)[1]
+
+
+def traced_call(trace, plan, dispatcher, *args, **kwargs):
+    """ ``planned_call`` that also records a ``TraceEvent`` on ``trace`` """
+    if trace is None:
+        return planned_call(plan, dispatcher, *args, **kwargs)
+    with trace.event(dispatcher.__name__, args[0], args[1:]) as event:
+        func, result = _planned_dispatch(plan, dispatcher, args, kwargs)
+        event.finish(result, implementation=func, dispatcher=dispatcher,
+                     types=tuple(map(type, args)))
+    return result
+
+
+def planned_optimize(plan, optimize_, expr, data):
+    """ Call ``optimize_(expr, *data)``, reusing the result from ``plan`` """
+    if plan is None:
+        return optimize_(expr, *data)
+
+    key = ('optimize', expr, tuple(map(type, data)))
+    result = plan.replay(key)
+    if result is _missing:
+        try:
+            result = optimize_(expr, *data)
+        except NotImplementedError:
+            result = None
+    plan.record(key, result)
+    if result is None:
+        raise NotImplementedError()
+    return result
+
+
 @dispatch(Expr, object)
 def pre_compute(leaf, data, scope=None, **kwargs):
     """ Transform data prior to calling ``compute`` """
@@ -117,7 +358,7 @@ def type_change(old, new):
     return not all(map(issubtype, new_types, old_types))
 
 
-def top_then_bottom_then_top_again_etc(expr, scope, **kwargs):
+def top_then_bottom_then_top_again_etc(expr, scope, context=None, **kwargs):
     """ Compute expression against scope
 
     Does the following interpreter strategy:
@@ -128,6 +369,10 @@ def top_then_bottom_then_top_again_etc(expr, scope, **kwargs):
     3.  Re-optimize expression and re-pre-compute data
     4.  Go to step 1
 
+    Leaf names, the execution plan and the trace of the computation are kept
+    on ``context``, a ``ComputeContext``.  A fresh one is used if none is
+    given.
+
     Examples
     --------
 
@@ -155,31 +400,45 @@ def top_then_bottom_then_top_again_etc(expr, scope, **kwargs):
     if not hasattr(expr, '_leaves'):
         return expr
 
+    if context is None:
+        context = ComputeContext()
+    plan, trace = context.plan, context.trace
+
     leaf_exprs = list(expr._leaves())
     leaf_data = [scope.get(leaf) for leaf in leaf_exprs]
 
     # 1. See if we have a direct computation path with compute_down
     try:
-        return compute_down(expr, *leaf_data, **kwargs)
+        return traced_call(trace, plan, compute_down, expr, *leaf_data,
+                           **kwargs)
     except NotImplementedError:
         pass
 
     # 2. Compute from the bottom until there is a data type change
-    expr2, scope2 = bottom_up_until_type_break(expr, scope, **kwargs)
+    #    Repeated subexpressions are computed once (see the ``memo`` argument
+    #    of ``bottom_up_until_type_break``)
+    with traced(trace, 'bottom_up_until_type_break', expr,
+                leaf_data) as event:
+        expr2, scope2 = bottom_up_until_type_break(expr, scope,
+                                                   context=context, memo={},
+                                                   **kwargs)
+        event.finish(expr2)
 
     # 3. Re-optimize data and expressions
     optimize_ = kwargs.get('optimize', optimize)
     pre_compute_ = kwargs.get('pre_compute', pre_compute)
     if pre_compute_:
-        scope3 = dict((e, pre_compute_(e, datum,
-                                       **assoc(kwargs, 'scope', scope2)))
+        scope3 = dict((e, traced_call(trace, None, pre_compute_, e, datum,
+                                      **assoc(kwargs, 'scope', scope2)))
                       for e, datum in scope2.items())
     else:
         scope3 = scope2
     if optimize_:
         try:
-            expr3 = optimize_(expr2, *[scope3[leaf]
-                                       for leaf in expr2._leaves()])
+            data = [scope3[leaf] for leaf in expr2._leaves()]
+            with traced(trace, 'optimize', expr2, data) as event:
+                expr3 = planned_optimize(plan, optimize_, expr2, data)
+                event.finish(expr3)
             _d = dict(zip(expr2._leaves(), expr3._leaves()))
             scope4 = dict((e._subs(_d), d) for e, d in scope3.items())
         except NotImplementedError:
@@ -195,23 +454,89 @@ def top_then_bottom_then_top_again_etc(expr, scope, **kwargs):
                                   "expr: %s\n"
                                   "data: %s" % (expr3, scope4))
     else:
-        return top_then_bottom_then_top_again_etc(expr3, scope4, **kwargs)
+        return top_then_bottom_then_top_again_etc(expr3, scope4,
+                                                  context=context, **kwargs)
 
 
-_names = ('leaf_%d' % i for i in itertools.count(1))
+class ComputeContext(object):
+    """ State of a single call to ``compute``
 
-_leaf_cache = {}
-_used_tokens = defaultdict(set)
+    Every call to ``compute`` gets a context of its own that is passed down
+    through the interpreter.  Concurrent calls from several threads, or calls
+    to ``compute`` made from within a ``compute_up`` implementation, do not
+    see each other's leaf names.
+
+    Parameters
+    ----------
+    plan : PlanRecorder, optional
+        Records and replays the implementations dispatched to
+    trace : blaze.compute.trace.Trace, optional
+        Records every step taken
+
+    Examples
+    --------
+
+    >>> context = ComputeContext()
+    >>> t = symbol('t', '{x: int, y: int, z: int}')
+    >>> context.makeleaf(t.x + 1)
+    x
+    >>> context.makeleaf(t.x).isidentical(context.makeleaf(t.x + 1))
+    False
+    """
+    __slots__ = 'plan', 'trace', '_leaf_cache', '_used_tokens'
+
+    def __init__(self, plan=None, trace=None):
+        self.plan = plan
+        self.trace = trace
+        self._leaf_cache = {}
+        self._used_tokens = defaultdict(set)
+
+    def makeleaf(self, expr):
+        """ Leaf replacement for ``expr``, unique within this context
+
+        See Also
+        --------
+        makeleaf
+        """
+        leaf_cache = self._leaf_cache
+        if expr in leaf_cache:
+            return leaf_cache[expr]
+        name = expr._name or '_'
+        used_for_name = self._used_tokens[name]
+        if isinstance(expr, Symbol):  # Idempotent on symbols
+            used_for_name.add(expr._token)
+            leaf_cache[expr] = expr
+            return expr
+        for token in itertools.count():
+            if token not in used_for_name:
+                break
+        result = symbol(name, expr.dshape, token)
+        used_for_name.add(token)
+        leaf_cache[expr] = result
+        return result
+
+
+_local = threading.local()
+
+
+def _default_context():
+    try:
+        return _local.context
+    except AttributeError:
+        context = _local.context = ComputeContext()
+        return context
 
 
 def _reset_leaves():
-    _leaf_cache.clear()
-    _used_tokens.clear()
+    _local.context = ComputeContext()
 
 
-def makeleaf(expr):
+def makeleaf(expr, context=None):
     """ Name of a new leaf replacement for this expression
 
+    Leaf names are unique within ``context``.  Without one, the leaf names
+    are kept per thread until ``_reset_leaves`` is called.
+
     >>> _reset_leaves()
 
     >>> t = symbol('t', '{x: int, y: int, z: int}')
@@ -234,28 +559,15 @@ def makeleaf(expr):
     >>> makeleaf(t) is t  # makeleaf passes on Symbols
     True
     """
-    name = expr._name or '_'
-    if expr in _leaf_cache:
-        return _leaf_cache[expr]
-    if isinstance(expr, Symbol):  # Idempotent on symbols
-        _used_tokens[name].add(expr._token)
-        _leaf_cache[expr] = expr
-        return expr
-    used_for_name = _used_tokens[name]
-    for token in itertools.count():
-        if token not in used_for_name:
-            break
-    result = symbol(name, expr.dshape, token)
-    used_for_name.add(token)
-    _leaf_cache[expr] = result
-    return result
+    return (context or _default_context()).makeleaf(expr)
 
 
 def data_leaves(expr, scope):
     return [scope[leaf] for leaf in expr._leaves()]
 
 
-def bottom_up_until_type_break(expr, scope, **kwargs):
+def bottom_up_until_type_break(expr, scope, context=None, memo=None,
+                               **kwargs):
     """ Traverse bottom up until data changes significantly
 
     Parameters
@@ -265,6 +577,13 @@ def bottom_up_until_type_break(expr, scope, **kwargs):
         Expression to compute
     scope: dict
         namespace matching leaves of expression to data
+    context: ComputeContext, optional
+        state of the enclosing call to ``compute``
+    memo: dict, optional
+        fully computed subexpressions of this traversal.  Structurally
+        identical subtrees found elsewhere in the expression are looked up
+        here rather than computed again.  Lazy results (iterators) are never
+        shared.
 
     Returns
     -------
@@ -297,16 +616,24 @@ def bottom_up_until_type_break(expr, scope, **kwargs):
     >>> bottom_up_until_type_break(e, {s: data})
     (amount_sum + 1, {amount_sum: 600})
     """
+    if context is None:
+        context = ComputeContext()
+    plan, trace = context.plan, context.trace
+
     # 0. Base case.  Return if expression is in scope
     if expr in scope:
-        leaf = makeleaf(expr)
+        leaf = context.makeleaf(expr)
         return leaf, {leaf: scope[expr]}
+    if memo is not None and expr in memo:
+        return memo[expr]
 
     inputs = list(unique(expr._inputs))
 
     # 1. Recurse down the tree, calling this function on children
     #    (this is the bottom part of bottom up)
-    exprs, new_scopes = zip(*[bottom_up_until_type_break(i, scope, **kwargs)
+    exprs, new_scopes = zip(*[bottom_up_until_type_break(i, scope,
+                                                         context=context,
+                                                         memo=memo, **kwargs)
                               for i in inputs])
 
     # 2. Form new (much shallower) expression and new (more computed) scope
@@ -325,15 +652,18 @@ def bottom_up_until_type_break(expr, scope, **kwargs):
         return new_expr, new_scope
     # 4. Otherwise try to do some actual work
     try:
-        leaf = makeleaf(expr)
+        leaf = context.makeleaf(expr)
         _data = [new_scope[i] for i in new_expr._inputs]
     except KeyError:
         return new_expr, new_scope
     try:
-        return leaf, {leaf: compute_up(new_expr, *_data, scope=new_scope,
-                                       **kwargs)}
+        data = traced_call(trace, plan, compute_up, new_expr, *_data,
+                           scope=new_scope, **kwargs)
     except NotImplementedError:
         return new_expr, new_scope
+    if memo is not None and not isinstance(data, Iterator):
+        memo[expr] = leaf, {leaf: data}
+    return leaf, {leaf: data}
 
 
 def swap_resources_into_scope(expr, scope):
@@ -366,8 +696,37 @@ def swap_resources_into_scope(expr, scope):
     return expr, new_scope
 
 
+def _plan_key(expr, scope, kwargs):
+    """ The key of the plan for a call to ``compute``, or ``None`` if a
+    keyword argument is unhashable and the plan can not be cached
+
+    Keyword arguments such as ``optimize=``, ``chunksize=`` or ``map=`` change
+    the plan, so their values are part of the key.  Functions and bound
+    methods hash by identity.
+
+    >>> t = symbol('t', 'var * int')
+    >>> _plan_key(t, {t: [1]}, {'chunksize': 1}) == _plan_key(t, {t: [2]},
+    ...                                                     {'chunksize': 1})
+    True
+    >>> _plan_key(t, {t: [1]}, {'chunksize': 1}) == _plan_key(t, {t: [1]},
+    ...                                                     {'chunksize': 2})
+    False
+    >>> _plan_key(t, {t: [1]}, {'columns': ['a']}) is None
+    True
+    """
+    key = (expr,
+           frozenset((e, type(v)) for e, v in scope.items()),
+           tuple((k, type(v), v) for k, v in sorted(kwargs.items(),
+                                                     key=lambda kv: kv[0])))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
 @dispatch(Expr, dict)
-def compute(expr, d, **kwargs):
+def compute(expr, d, plan_cache=None, trace=None, **kwargs):
     """ Compute expression against data sources
 
     >>> t = symbol('t', 'var * {name: string, balance: int}')
@@ -376,40 +735,118 @@ def compute(expr, d, **kwargs):
     >>> data = [['Alice', 100], ['Bob', -50], ['Charlie', -20]]
     >>> list(compute(deadbeats, {t: data}))
     ['Bob', 'Charlie']
+
+    Pass ``plan_cache=True`` to record the execution plan in the shared
+    ``blaze.compute.core.default_plan_cache`` and replay it on later calls
+    with the same expression and types of data, or pass a ``PlanCache`` to use
+    instead.
+
+    >>> list(compute(deadbeats, {t: data}, plan_cache=True))
+    ['Bob', 'Charlie']
+
+    Pass ``trace=True`` to also get back a ``blaze.compute.trace.Trace`` of
+    every step taken, or pass a ``Trace`` to record into.
+
+    >>> result, trace = compute(deadbeats, {t: data}, trace=True)
+    >>> [event.kind for event in trace][:3]
+    ['compute', 'pre_compute', 'optimize']
+
+    Before anything else the expression is simplified with
+    ``blaze.expr.optimize.simplify``, e.g. ``t.balance * 1 + 0`` is computed
+    as ``t.balance``.  Pass ``simplify=False`` to turn this off.
     """
-    _reset_leaves()
     optimize_ = kwargs.get('optimize', optimize)
     pre_compute_ = kwargs.get('pre_compute', pre_compute)
     post_compute_ = kwargs.get('post_compute', post_compute)
+    simplify_ = kwargs.get('simplify', simplify)
     expr2, d2 = swap_resources_into_scope(expr, d)
-    if pre_compute_:
-        d3 = dict(
-            (e, pre_compute_(e, dat, **kwargs))
-            for e, dat in d2.items()
-            if e in expr2
-        )
+    if simplify_:
+        simplified = simplify_(expr2)
+        # keep subexpressions whose values were passed in the scope
+        if all(e in simplified for e in d2 if e in expr2):
+            expr2 = simplified
+
+    if plan_cache is True:
+        plan_cache = default_plan_cache
+    key = None
+    if plan_cache is not None and plan_cache is not False:
+        key = _plan_key(expr2, d2, kwargs)
+    if key is None:
+        plan = None
     else:
-        d3 = d2
-
-    if optimize_:
-        try:
-            expr3 = optimize_(expr2, *[v for e, v in d3.items() if e in expr2])
-            _d = dict(zip(expr2._leaves(), expr3._leaves()))
-            d4 = dict((e._subs(_d), d) for e, d in d3.items())
-        except NotImplementedError:
+        plan = PlanRecorder(plan_cache.get(key))
+
+    return_trace = trace is True
+    if return_trace:
+        trace = Trace()
+    elif trace is False:
+        trace = None
+
+    context = ComputeContext(plan=plan, trace=trace)
+
+    with traced(trace, 'compute', expr2, list(d2.values())) as event:
+        if pre_compute_:
+            d3 = dict(
+                (e, traced_call(trace, None, pre_compute_, e, dat, **kwargs))
+                for e, dat in d2.items()
+                if e in expr2
+            )
+        else:
+            d3 = d2
+
+        if optimize_:
+            try:
+                data = [v for e, v in d3.items() if e in expr2]
+                with traced(trace, 'optimize', expr2, data) as opt_event:
+                    expr3 = planned_optimize(plan, optimize_, expr2, data)
+                    opt_event.finish(expr3)
+                _d = dict(zip(expr2._leaves(), expr3._leaves()))
+                d4 = dict((e._subs(_d), d) for e, d in d3.items())
+            except NotImplementedError:
+                expr3 = expr2
+                d4 = d3
+        else:
             expr3 = expr2
             d4 = d3
-    else:
-        expr3 = expr2
-        d4 = d3
-
-    result = top_then_bottom_then_top_again_etc(expr3, d4, **kwargs)
-    if post_compute_:
-        result = post_compute_(expr3, result, scope=d4)
 
+        result = top_then_bottom_then_top_again_etc(expr3, d4,
+                                                    context=context, **kwargs)
+        if post_compute_:
+            result = traced_call(trace, None, post_compute_, expr3, result,
+                                 scope=d4)
+        event.finish(result)
+
+    if plan is not None and plan.diverged:
+        plan_cache.put(key, tuple(plan.steps))
+    if return_trace:
+        return result, trace
     return result
 
 
+def compute_shared(exprs, scope, **kwargs):
+    """ Compute several expressions against the same data
+
+    Subexpressions shared between the expressions are computed once and put
+    into the scope of the others.
+
+    >>> t = symbol('t', 'var * {name: string, amount: int}')
+    >>> data = [('Alice', 100), ('Bob', -50)]
+    >>> compute_shared([t.amount.sum(), t.amount.sum() / t.amount.count()],
+    ...                {t: data})
+    [50, 25.0]
+
+    See Also
+    --------
+    blaze.expr.core.shared_subterms
+    """
+    scope = dict(scope)
+    for expr in shared_subterms(*exprs):
+        result = compute(expr, scope, **kwargs)
+        if not isinstance(result, Iterator):  # iterators can only be used once
+            scope[expr] = result
+    return [compute(expr, scope, **kwargs) for expr in exprs]
+
+
 @dispatch(Field, dict)
 def compute_up(expr, data, **kwargs):
     return data[expr._name]
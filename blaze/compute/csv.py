@@ -2,36 +2,372 @@ from __future__ import absolute_import, division, print_function
 
 import pandas
 import os
+from io import BytesIO
+from multiprocessing.pool import ThreadPool
 from toolz import curry, concat
 import pandas as pd
 import numpy as np
+import psutil
 from collections import Iterator, Iterable
 from odo import into, Temp
 from odo.chunks import chunks
-from odo.backends.csv import CSV
+from odo.backends.csv import CSV, dshape_to_pandas
 from odo.backends.url import URL
+from datashape import discover
 from multipledispatch import MDNotImplementedError
 
+from ..compatibility import map
 from ..dispatch import dispatch
-from ..expr import Expr, Head, ElemWise, Distinct, Symbol, Projection, Field
+from ..expr import (Expr, Head, ElemWise, Distinct, Symbol, Projection, Field,
+                    Slice, Sort, Selection, symbol)
 from ..expr.core import path
-from ..utils import available_memory
-from ..expr.split import split
+from ..utils import available_memory, keywords, prefetch
+from ..expr.split import split, combiner
 from .core import compute
-from ..expr.optimize import lean_projection
-from .pmap import get_default_pmap
+from .chunks import (combine_parts, streams_head, drop_unordered_sorts,
+                     _sorts_rows)
+from .external_sort import external_sort, rowwise
+from ..expr.optimize import lean_projection, push_selections, fuse_top_k
+from .pmap import get_default_pmap, is_serial
 
 
-__all__ = ['optimize', 'pre_compute', 'compute_chunk', 'compute_down']
+__all__ = ['optimize', 'pre_compute', 'post_compute', 'compute_chunk',
+           'compute_down', 'compute_up', 'SelectedChunks', 'ByteRanges', 'byte_ranges']
 
 
 @dispatch(Expr, CSV)
 def optimize(expr, _):
-    return lean_projection(expr)  # This is handled in pre_compute
+    # This is handled in pre_compute
+    return lean_projection(push_selections(expr, elemwise=True))
 
 
-@dispatch(Expr, CSV)
-def pre_compute(expr, data, comfortable_memory=None, chunksize=2**18, **kwargs):
+def _usecols(expr, leaf):
+    """ The columns of ``leaf`` that ``expr`` reads
+
+    Returns ``None`` unless every use of ``leaf`` is a projection, e.g. when
+    ``leaf`` is projected differently on the two sides of a self join.
+    """
+    users = [node for node in expr._subterms()
+             if isinstance(node, Expr) and
+             any(i.isidentical(leaf) for i in node._inputs)]
+    if not users or not all(isinstance(u, (Projection, Field))
+                            for u in users):
+        return None
+    used = set(concat(u.fields for u in users))
+    return [f for f in leaf.fields if f in used]
+
+
+def _leaf_of(expr, data, scope=None):
+    """ The leaf of ``expr`` that stands for ``data``
+
+    With several leaves, e.g. in a join of two files, the leaf is looked up
+    in ``scope``.  Returns ``None`` if it can not be told apart.
+
+    >>> from blaze import symbol, join
+    >>> a = symbol('a', 'var * {id: int, x: int}')
+    >>> b = symbol('b', 'var * {id: int, y: int}')
+    >>> _leaf_of(join(a, b), 'b.csv', {a: 'a.csv', b: 'b.csv'})
+    b
+    >>> _leaf_of(join(a, b), 'b.csv') is None
+    True
+    """
+    leaves = expr._leaves()
+    if len(leaves) == 1:
+        return leaves[0]
+    matches = [leaf for leaf in leaves
+               if scope is not None and scope.get(leaf) is data]
+    return matches[0] if len(matches) == 1 else None
+
+
+def byte_ranges(path, blocksize, start=0):
+    """ Split a file from byte ``start`` into ranges of about ``blocksize``
+    bytes that end at the ends of lines
+
+    >>> from blaze.utils import filetext
+    >>> with filetext('a,b\\n1,2\\n3,4\\n5,6\\n') as fn:
+    ...     byte_ranges(fn, 5, start=4)
+    [(4, 12), (12, 16)]
+    """
+    size = os.path.getsize(path)
+    offsets = [start]
+    with open(path, 'rb') as f:
+        while offsets[-1] + blocksize < size:
+            f.seek(offsets[-1] + blocksize)
+            f.readline()
+            if f.tell() >= size:
+                break
+            offsets.append(f.tell())
+    offsets.append(size)
+    return list(zip(offsets[:-1], offsets[1:]))
+
+
+def _pushable_selection(expr, leaf):
+    """ A selection on ``leaf`` that every use of ``leaf`` in ``expr`` goes
+    through, if its predicate works row by row
+
+    Such a selection can be applied to each chunk as it is read.
+
+    >>> from blaze import symbol
+    >>> t = symbol('t', 'var * {a: int64, b: float64}')
+    >>> _pushable_selection(t[t.a > 0].b.sum(), t)
+    t[t.a > 0]
+    >>> _pushable_selection(t[t.a > t.a.mean()].b.sum(), t) is None
+    True
+    """
+    for node in expr._subterms():
+        if not isinstance(node, Selection):
+            continue
+        child = node._child
+        if isinstance(child, (Projection, Field)):
+            child = child._child
+        if not child.isidentical(leaf):
+            continue
+        predicate = node.predicate
+        if (predicate._leaves() != [leaf] or
+                not all(isinstance(e, (ElemWise, Symbol))
+                        for e in predicate._subterms()
+                        if isinstance(e, Expr))):
+            continue
+        selected = symbol('_selected', node.dshape)
+        if leaf not in expr._subs({node: selected})._leaves():
+            return node
+    return None
+
+
+class SelectedChunks(chunks(pd.DataFrame)):
+
+    """ Chunks of DataFrames read from a CSV file, keeping only the rows of
+    ``selection`` as each chunk is parsed
+
+    The predicate of ``selection`` runs on each chunk as soon as it is read.
+    Kept rows are reindexed and gathered into chunks of at least
+    ``chunksize`` rows, and columns read only by the predicate are dropped,
+    so that later stages see only the selected data.
+
+    The selection is chosen from the whole expression by ``_read_csv``, or
+    in ``compute_down`` for chunks read without one, see ``_select_rows``.
+    """
+
+    def __init__(self, data, leaf=None, selection=None, keep=None,
+                 chunksize=2**18):
+        self.leaf = leaf
+        self.selection = selection
+        self.keep = keep
+        self.chunksize = chunksize
+        super(SelectedChunks, self).__init__(data)
+
+    def selecting(self, leaf, selection, keep, usecols=None):
+        """ A copy that keeps the rows of ``selection`` and the columns
+        ``keep`` """
+        return SelectedChunks(self.data, leaf=leaf, selection=selection,
+                              keep=keep, chunksize=self.chunksize)
+
+    def select(self, df):
+        """ The rows of one chunk that satisfy the selection """
+        if self.selection is None:
+            return df
+        mask = compute(self.selection.predicate, {self.leaf: df})
+        df = df[np.asarray(mask, dtype=bool)].reset_index(drop=True)
+        return df[self.keep] if self.keep else df
+
+    def __iter__(self):
+        if self.selection is None:
+            for df in super(SelectedChunks, self).__iter__():
+                yield df
+            return
+        pieces, nrows, empty, yielded = [], 0, None, False
+        for df in super(SelectedChunks, self).__iter__():
+            df = self.select(df)
+            if not len(df):
+                empty = df
+                continue
+            pieces.append(df)
+            nrows += len(df)
+            if nrows >= self.chunksize:
+                yield pd.concat(pieces, ignore_index=True)
+                pieces, nrows, yielded = [], 0, True
+        if pieces:
+            yield pd.concat(pieces, ignore_index=True)
+        elif not yielded and empty is not None:
+            # keep the columns of the result
+            yield empty
+
+
+def _select_rows(expr, data):
+    """ ``expr``, and a copy of ``data`` that keeps the rows of a selection on
+    its leaf as each chunk is parsed, see ``_pushable_selection``
+
+    The selection is removed from ``expr`` unless it is all there is to
+    compute, and ``expr`` is rewritten onto a leaf with just the columns that
+    are kept.  Byte ranges parse only the columns that ``expr`` uses.
+    Returns ``None`` if there is no selection to push, or ``data`` already
+    has one.
+
+    >>> t = symbol('t', 'var * {a: int64, b: float64, c: string}')
+    >>> data = SelectedChunks([])
+    >>> expr, data = _select_rows(t[t.a > 0].b.sum(), data)
+    >>> expr
+    sum(t.b)
+    >>> expr._leaves()[0].dshape
+    dshape("var * {b: float64}")
+    >>> data.selection, data.keep
+    (t[t.a > 0], ['b'])
+    """
+    if data.selection is not None:
+        return None
+    leaf = expr._leaves()[0]
+    selection = _pushable_selection(expr, leaf)
+    if selection is None:
+        return None
+    unselected = expr._subs({selection: selection._child})
+    if isinstance(unselected, Symbol):
+        unselected = expr
+    keep = _usecols(unselected, leaf)
+    data = data.selecting(leaf, selection, keep, usecols=_usecols(expr, leaf))
+    if keep is not None:
+        kept = symbol(leaf._name, leaf[keep].dshape)
+        unselected = unselected._subs({leaf: kept})
+    return unselected, data
+
+
+@dispatch(Expr, SelectedChunks)
+def optimize(expr, data):
+    """ The rows of ``data.selection`` are already selected
+
+    The selection stays when it is all there is to compute, so that the
+    result is still gathered from the chunks.
+    """
+    expr = lean_projection(push_selections(expr, elemwise=True))
+    if data.selection is not None:
+        unselected = expr._subs({data.selection: data.selection._child})
+        if not isinstance(unselected, Symbol):
+            expr = unselected
+    return fuse_top_k(expr)
+
+
+class ByteRanges(SelectedChunks):
+
+    """ Chunks of a CSV file given by ranges of bytes that end at the ends of
+    lines, each parsed into a DataFrame on demand
+
+    Ranges can be parsed independently, so reductions and other splittable
+    expressions parse and compute on them in parallel, see
+    ``compute_down(Expr, ByteRanges)``.  Iterating parses them in order like
+    any other chunks of DataFrames.  Rows of ``selection`` are kept as each
+    range is parsed, see ``SelectedChunks``.
+
+    Lines are found by looking for newlines, so quoted fields may not
+    contain newlines.  Other keyword arguments, e.g. ``sep``, ``quotechar``
+    or ``na_values``, are passed on to ``pd.read_csv``, see
+    ``_read_csv_options``.
+    """
+
+    def __init__(self, path, ranges, dshape, usecols=None, encoding='utf-8',
+                 leaf=None, selection=None, keep=None, **kwargs):
+        self.path = path
+        self.ranges = ranges
+        self.dshape = dshape
+        self.usecols = usecols
+        self.encoding = encoding
+        self.kwargs = kwargs
+        super(ByteRanges, self).__init__(lambda: map(self.parse, self.ranges),
+                                         leaf=leaf, selection=selection,
+                                         keep=keep)
+
+    def selecting(self, leaf, selection, keep, usecols=None):
+        """ A copy that keeps the rows of ``selection`` and the columns
+        ``keep``, parsing only ``usecols`` if it does not parse fewer """
+        return ByteRanges(self.path, self.ranges, self.dshape,
+                          usecols=self.usecols or usecols,
+                          encoding=self.encoding, leaf=leaf,
+                          selection=selection, keep=keep, **self.kwargs)
+
+    def parse(self, byterange):
+        """ Parse the lines in one range of bytes """
+        start, stop = byterange
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            raw = f.read(stop - start)
+        if not raw.strip():
+            df = into(pd.DataFrame, [], dshape=self.dshape)
+            return df[self.usecols] if self.usecols else df
+        dtypes, parse_dates = dshape_to_pandas(self.dshape)
+        if self.usecols:
+            dtypes = dict((k, v) for k, v in dtypes.items()
+                          if k in self.usecols)
+            parse_dates = [c for c in parse_dates if c in self.usecols]
+        return pd.read_csv(BytesIO(raw), header=None,
+                           names=self.dshape.measure.names,
+                           usecols=self.usecols, dtype=dtypes,
+                           parse_dates=parse_dates, encoding=self.encoding,
+                           **self.kwargs)
+
+    def read(self, byterange):
+        """ Parse one range of bytes and keep the selected rows """
+        return self.select(self.parse(byterange))
+
+
+# The parts of a CSV dialect that ``pd.read_csv`` understands
+_dialect_terms = ['delimiter', 'quotechar', 'escapechar', 'doublequote',
+                  'skipinitialspace']
+
+# Options of ``pd.read_csv`` that ``ByteRanges`` sets itself
+_byte_range_terms = ['filepath_or_buffer', 'header', 'names', 'usecols',
+                     'dtype', 'parse_dates', 'encoding', 'sep', 'chunksize',
+                     'iterator', 'compression', 'skiprows', 'nrows']
+
+
+def _read_csv_options(data):
+    """ The options of ``pd.read_csv`` to parse ranges of bytes of ``data``
+    as the rest of the file would be parsed: its dialect and the keyword
+    arguments it was made with, e.g. ``na_values``
+
+    >>> from blaze.utils import filetext
+    >>> with filetext("a;b\n'x;y';2\n") as fn:
+    ...     options = _read_csv_options(CSV(fn, delimiter=';', quotechar="'",
+    ...                                     na_values=['-']))
+    >>> options['delimiter'], options['quotechar'], options['na_values']
+    (';', "'", ['-'])
+    """
+    readable = keywords(pd.read_csv)
+    options = dict((k, v) for k, v in getattr(data, '_kwargs', {}).items()
+                   if k in readable and k not in _byte_range_terms)
+    options.update((k, data.dialect[k]) for k in _dialect_terms
+                   if data.dialect.get(k) is not None)
+    return options
+
+
+def _splits_by_bytes(data):
+    """ Whether lines of ``data`` can be found by looking for newline bytes """
+    if os.path.splitext(data.path)[1] in ('.gz', '.bz2'):
+        return False
+    try:
+        return u'\n'.encode(data.encoding) == b'\n'
+    except LookupError:
+        return False
+
+
+def _header_end(data):
+    """ The byte offset just past the header, if any """
+    if not data.has_header:
+        return 0
+    with open(data.path, 'rb') as f:
+        f.readline()
+        return f.tell()
+
+
+def _read_csv(expr, data, comfortable_memory=None, chunksize=2**18,
+              blocksize=2**26, scope=None, select_rows=True, **kwargs):
+    """ Read the columns of a CSV file that ``expr`` uses into a DataFrame, or
+    into chunks if it is large
+
+    Large files are split into ``ByteRanges`` of about ``blocksize`` bytes
+    that are parsed in parallel, unless they are compressed or their lines
+    can not be found byte by byte.  Those are read ``chunksize`` rows at a
+    time instead.  Either way, unless ``select_rows`` is false, a selection
+    with an element-wise predicate that every use of the data goes through
+    is applied to each chunk as it is parsed, see ``SelectedChunks``.
+    """
     comfortable_memory = comfortable_memory or min(1e9, available_memory() / 4)
 
     kwargs = dict()
@@ -44,29 +380,128 @@ def pre_compute(expr, data, comfortable_memory=None, chunksize=2**18, **kwargs):
 
     # Insert projection into read_csv
     oexpr = optimize(expr, data)
-    leaf = oexpr._leaves()[0]
-    pth = list(path(oexpr, leaf))
-    if len(pth) >= 2 and isinstance(pth[-2], (Projection, Field)):
-        kwargs['usecols'] = pth[-2].fields
+    leaf = _leaf_of(oexpr, data, scope)
+    if leaf is None:
+        leaf = symbol('_', discover(data))
+    usecols = _usecols(oexpr, leaf)
+    if usecols is not None:
+        kwargs['usecols'] = usecols
 
-    if chunksize:
-        return into(chunks(pd.DataFrame), data, dshape=leaf.dshape, **kwargs)
+    # Filter chunks as they are read
+    selection = keep = None
+    if chunksize and select_rows:
+        selection = _pushable_selection(oexpr, leaf)
+    if selection is not None:
+        keep = _usecols(oexpr._subs({selection: selection._child}), leaf)
+
+    if chunksize and _splits_by_bytes(data):
+        start = _header_end(data)
+        return ByteRanges(data.path, byte_ranges(data.path, blocksize, start),
+                          leaf.dshape, usecols=usecols,
+                          encoding=data.encoding, leaf=leaf,
+                          selection=selection, keep=keep,
+                          **_read_csv_options(data))
+    elif chunksize:
+        return SelectedChunks(into(chunks(pd.DataFrame), data,
+                                   dshape=leaf.dshape, **kwargs),
+                              leaf=leaf, selection=selection, keep=keep,
+                              chunksize=chunksize)
     else:
         return into(pd.DataFrame, data, dshape=leaf.dshape, **kwargs)
 
 
-@dispatch((Expr, Head), URL(CSV))
+@dispatch(Expr, CSV)
+def pre_compute(expr, data, **kwargs):
+    """ Read the columns of a CSV file that ``expr`` uses, see ``_read_csv``
+
+    ``compute`` passes only the leaf of the expression here, which is left
+    as it is for ``compute_down`` to read what the whole expression uses.
+    """
+    if isinstance(expr, Symbol):
+        return data
+    return _read_csv(expr, data, **kwargs)
+
+
+@dispatch(Expr, CSV)
+def post_compute(expr, data, scope=None):
+    """ Read the whole file when it is all there is to compute """
+    return _read_csv(expr, data, scope=scope)
+
+
+@dispatch(Expr, CSV)
+def compute_down(expr, data, **kwargs):
+    """ Read the columns and rows that ``expr`` uses, then compute on them """
+    leaf = expr._leaves()[0]
+    return compute(expr, {leaf: _read_csv(expr, data, **kwargs)}, **kwargs)
+
+
+@dispatch(Expr, CSV, CSV)
+def compute_down(expr, lhs, rhs, **kwargs):
+    """ Read the columns of each file that ``expr`` uses, e.g. only the key
+    and the projected columns of each side of a join, then compute on them
+
+    Rows are filtered as chunks are parsed only for expressions on one file.
+    """
+    scope = dict(zip(expr._leaves(), [lhs, rhs]))
+    data = dict((leaf, _read_csv(expr, d, scope=scope, select_rows=False,
+                                 **kwargs) if isinstance(d, CSV) else d)
+                for leaf, d in scope.items())
+    return compute(expr, data, **kwargs)
+
+
+@dispatch(Expr, CSV, object)
+def compute_down(expr, lhs, rhs, **kwargs):
+    return compute_down.dispatch(Expr, CSV, CSV)(expr, lhs, rhs, **kwargs)
+
+
+@dispatch(Expr, object, CSV)
+def compute_down(expr, lhs, rhs, **kwargs):
+    return compute_down.dispatch(Expr, CSV, CSV)(expr, lhs, rhs, **kwargs)
+
+
+@dispatch(Expr, CSV)
+def compute_up(expr, data, **kwargs):
+    """ Compute a node of an expression with more leaves than ``compute_down``
+    takes, e.g. a column of one of three joined files """
+    return compute_up(expr, _read_csv(expr, data, **kwargs), **kwargs)
+
+
+@dispatch(Expr, CSV, CSV)
+def compute_up(expr, lhs, rhs, scope=None, **kwargs):
+    lhs, rhs = [_read_csv(expr, d, scope=scope, select_rows=False, **kwargs)
+                if isinstance(d, CSV) else d for d in (lhs, rhs)]
+    return compute_up(expr, lhs, rhs, scope=scope, **kwargs)
+
+
+@dispatch(Expr, CSV, object)
+def compute_up(expr, lhs, rhs, **kwargs):
+    return compute_up.dispatch(Expr, CSV, CSV)(expr, lhs, rhs, **kwargs)
+
+
+@dispatch(Expr, object, CSV)
+def compute_up(expr, lhs, rhs, **kwargs):
+    return compute_up.dispatch(Expr, CSV, CSV)(expr, lhs, rhs, **kwargs)
+
+
+@dispatch((Expr, Head, Slice), URL(CSV))
 def pre_compute(expr, data, **kwargs):
     return pre_compute(expr, into(Temp(CSV), data, **kwargs), **kwargs)
 
 
 Cheap = (Head, ElemWise, Distinct, Symbol)
 
-@dispatch(Head, CSV)
-def pre_compute(expr, data, **kwargs):
-    leaf = expr._leaves()[0]
-    if all(isinstance(e, Cheap) for e in path(expr, leaf)):
+@dispatch((Head, Slice), CSV)
+def pre_compute(expr, data, chunksize=2**18, **kwargs):
+    leaf = _leaf_of(expr, data, kwargs.get('scope'))
+    if leaf is None:
+        raise MDNotImplementedError()
+    if isinstance(expr, Head) and all(isinstance(e, Cheap)
+                                      for e in path(expr, leaf)):
         return into(Iterator, data, chunksize=10000, dshape=leaf.dshape)
+    elif streams_head(expr, leaf):
+        # Read chunk by chunk, see compute_down(Head, Chunks)
+        return into(chunks(pd.DataFrame), data, chunksize=chunksize,
+                    dshape=leaf.dshape)
     else:
         raise MDNotImplementedError()
 
@@ -76,20 +511,89 @@ def compute_chunk(chunk, chunk_expr, part):
 
 
 @dispatch(Expr, pandas.io.parsers.TextFileReader)
-def compute_down(expr, data, map=None, **kwargs):
+def compute_down(expr, data, map=None, prefetch_depth=2, **kwargs):
     if map is None:
         map = get_default_pmap()
     leaf = expr._leaves()[0]
 
     (chunk, chunk_expr), (agg, agg_expr) = split(leaf, expr)
 
-    parts = list(map(curry(compute_chunk, chunk, chunk_expr), data))
+    # Parse the next chunks while computing on this one
+    parts = map(curry(compute_chunk, chunk, chunk_expr),
+                prefetch(data, prefetch_depth))
+    intermediate = combine_parts(parts, agg, combiner(leaf, expr, agg))
+
+    return compute(agg_expr, {agg: intermediate})
+
+
+@dispatch(Sort, pandas.io.parsers.TextFileReader)
+def compute_down(expr, data, map=None, comfortable_memory=None,
+                 prefetch_depth=2, **kwargs):
+    leaf = expr._leaves()[0]
+    if not all(isinstance(e, rowwise) for e in path(expr._child, leaf)):
+        raise MDNotImplementedError()
+    if map is None:
+        map = get_default_pmap()
+    return external_sort(expr, leaf, prefetch(data, prefetch_depth), map=map,
+                         comfortable_memory=comfortable_memory)
 
-    if isinstance(parts[0], np.ndarray):
-        intermediate = np.concatenate(parts)
-    elif isinstance(parts[0], pd.DataFrame):
-        intermediate = pd.concat(parts)
-    elif isinstance(parts[0], (Iterable, Iterator)):
-        intermediate = concat(parts)
+
+def compute_byte_range(data, chunk, chunk_expr, byterange):
+    return compute(chunk_expr, {chunk: data.read(byterange)})
+
+
+@dispatch(Expr, ByteRanges)
+def compute_down(expr, data, map=None, **kwargs):
+    """ Parse and compute on each range of bytes in parallel
+
+    Without a parallel ``map``, ranges are parsed by a pool of threads that
+    lives as long as the computation.  Results are combined in the order of
+    the ranges as they arrive, so the rows of element-wise expressions keep
+    the order of the file.
+    """
+    selected = _select_rows(expr, data)
+    if selected is not None:
+        return compute_down(*selected, map=map, **kwargs)
+
+    leaf = expr._leaves()[0]
+    expr = drop_unordered_sorts(expr, leaf)
+    if any(_sorts_rows(e, leaf) for e in path(expr, leaf)):
+        return compute_down(expr, chunks(pd.DataFrame)(data), map=map,
+                            **kwargs)
+    (chunk, chunk_expr), (agg, agg_expr) = split(leaf, expr)
+
+    pool = None
+    if map is None:
+        map = get_default_pmap()
+        if is_serial(map):
+            pool = ThreadPool(psutil.cpu_count())
+            map = pool.imap
+    try:
+        parts = map(curry(compute_byte_range, data, chunk, chunk_expr),
+                    data.ranges)
+        intermediate = combine_parts(parts, agg, combiner(leaf, expr, agg))
+    finally:
+        if pool is not None:
+            pool.terminate()
 
     return compute(agg_expr, {agg: intermediate})
+
+
+@dispatch((Head, Slice, Sort), ByteRanges)
+def compute_down(expr, data, **kwargs):
+    """ Heads read only the first ranges and sorts merge sorted runs, so parse
+    the ranges in order like other chunks """
+    selected = _select_rows(expr, data)
+    if selected is not None:
+        expr, data = selected
+    return compute_down(expr, chunks(pd.DataFrame)(data), **kwargs)
+
+
+@dispatch((Expr, Head, Slice, Sort), SelectedChunks)
+def compute_down(expr, data, **kwargs):
+    """ Keep the rows of a selection as each chunk is parsed, then compute on
+    the chunks as usual """
+    selected = _select_rows(expr, data)
+    if selected is None:
+        raise MDNotImplementedError()
+    return compute_down(*selected, **kwargs)
@@ -0,0 +1,248 @@
+"""
+External merge sort for data that comes in chunks
+
+``split`` can not break up a full sort, so sorting chunked data (``Chunks``,
+large CSV files, bcolz tables) is done here instead:
+
+1.  Each chunk is sorted with the backend that holds it, giving a sorted run
+2.  Runs are kept in memory until together they outgrow a memory budget,
+    after which they are merged into one run that is spilled to a temporary
+    file
+3.  Whenever ``fanin`` spilled runs pile up they are merged into one, so
+    that few files are open at once
+4.  The remaining runs are merged k-way into a single sorted stream of rows
+
+Only the runs being merged are read back, a batch of rows at a time, so the
+full sorted result never needs to fit in memory.
+"""
+from __future__ import absolute_import, division, print_function
+
+import heapq
+import sys
+import tempfile
+
+import datashape
+import numpy as np
+import psutil
+from odo import into
+from toolz import curry, partition_all
+from collections import Iterator
+
+from ..compatibility import pickle, map
+from ..expr import ElemWise, Selection, Symbol, path, symbol
+from ..utils import available_memory
+from .core import compute
+from .pmap import is_serial
+from .python import sort_key
+
+
+__all__ = ['external_sort', 'rowwise']
+
+
+# Expressions that may sit between a ``Sort`` and its leaf so that each chunk
+# can be sorted on its own
+rowwise = (ElemWise, Selection, Symbol)
+
+
+class _Descending(object):
+    """ Reverse the ordering of a sort key so that ``heapq.merge`` can merge
+    runs sorted in descending order
+
+    >>> _Descending(1) < _Descending(0)
+    True
+    """
+    __slots__ = 'value',
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def _nbytes(data):
+    """ Approximate size in memory of a sorted run
+
+    >>> _nbytes(np.zeros(10, dtype='i8'))
+    80
+    """
+    usage = getattr(data, 'memory_usage', None)
+    if usage is not None:
+        return int(np.sum(usage(index=True)))
+    nbytes = getattr(data, 'nbytes', None)
+    if nbytes is not None:
+        return nbytes
+    return sys.getsizeof(data)
+
+
+def _rows(run):
+    if isinstance(run, (list, tuple, Iterator)):
+        return iter(run)
+    return into(Iterator, run)
+
+
+def _spill(rows, batchsize):
+    """ Write rows to a temporary file, a batch at a time """
+    f = tempfile.TemporaryFile()
+    for batch in partition_all(batchsize, rows):
+        pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+    f.seek(0)
+    return f
+
+
+def _unspill(f):
+    """ Read back the rows written by ``_spill`` """
+    try:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            for row in batch:
+                yield row
+    finally:
+        f.close()
+
+
+def _merge_key(key, ascending):
+    """ The key that ``_merge`` orders rows by
+
+    Missing values compare unequal to everything, which breaks the ordering
+    of the heap, so they are ordered last whatever the direction, as pandas
+    sorts them.
+
+    >>> k = _merge_key(None, True)
+    >>> sorted([2.0, float('nan'), 1.0], key=k)
+    [1.0, 2.0, nan]
+    >>> k = _merge_key(None, False)
+    >>> sorted([2.0, float('nan'), 1.0], key=k)
+    [2.0, 1.0, nan]
+    """
+    wrap = (lambda x: x) if ascending else _Descending
+    key = key or (lambda x: x)
+
+    def nulls_last(value):
+        missing = value is None or value != value
+        return missing, None if missing else wrap(value)
+
+    def merge_key(row):
+        value = key(row)
+        if isinstance(value, tuple):
+            return tuple(map(nulls_last, value))
+        return nulls_last(value)
+    return merge_key
+
+
+def _merge(runs, key, ascending):
+    """ Merge sorted iterators of rows into one sorted iterator
+
+    Ties are broken by the position of the run, then of the row within it,
+    so that the merge is as stable as the sort of each run.
+
+    >>> list(_merge([[1, 4], [2, 3]], None, True))
+    [1, 2, 3, 4]
+    >>> list(_merge([[4, 1], [3, 2]], None, False))
+    [4, 3, 2, 1]
+    """
+    key = _merge_key(key, ascending)
+    streams = [((key(row), i, j, row) for j, row in enumerate(rows))
+               for i, rows in enumerate(runs)]
+    return (item[-1] for item in heapq.merge(*streams))
+
+
+def _sort_chunk(chunk, chunk_expr, part):
+    return compute(chunk_expr, {chunk: part})
+
+
+def _add_spilled(levels, f, merge, fanin, batchsize):
+    """ Add the spilled run ``f`` to ``levels``, lists of spilled runs that
+    each come from merging ``fanin`` runs of the level below
+
+    A level that reaches ``fanin`` runs is merged into one run of the next,
+    so at most ``fanin`` runs per level are ever open.  Runs of higher levels
+    hold earlier chunks.
+    """
+    for level in levels:
+        level.append(f)
+        if len(level) < fanin:
+            return
+        f = _spill(merge([_unspill(g) for g in level]), batchsize)
+        del level[:]
+    levels.append([f])
+
+
+def external_sort(expr, leaf, parts, map=map, comfortable_memory=None,
+                  batchsize=2**14, fanin=64):
+    """ Sort chunked data with an external merge sort
+
+    Parameters
+    ----------
+
+    expr : Sort
+        The sort to compute.  Every expression between it and ``leaf`` must
+        work row by row, see ``rowwise``.
+    leaf : Symbol
+        The leaf of ``expr`` that ``parts`` are chunks of
+    parts : Iterable
+        The chunks of data
+    map : callable, optional
+        The map used to sort the chunks, e.g. a parallel map.  A parallel map
+        is given one chunk per core at a time.
+    comfortable_memory : int, optional
+        The number of bytes of sorted runs to hold in memory before they are
+        spilled to disk.  Defaults to a quarter of the available memory, up
+        to 1GB.
+    batchsize : int, optional
+        The number of rows written to and read from disk at a time
+    fanin : int, optional
+        The largest number of spilled runs merged at once
+
+    Returns
+    -------
+
+    An iterator over the sorted rows
+
+    >>> t = symbol('t', 'var * {name: string, amount: int}')
+    >>> parts = [[('Alice', 100), ('Bob', 300)], [('Charlie', 200)]]
+    >>> list(external_sort(t.sort('amount'), t, parts))
+    [('Alice', 100), ('Charlie', 200), ('Bob', 300)]
+    """
+    if not all(isinstance(e, rowwise) for e in path(expr._child, leaf)):
+        raise ValueError("Can not sort %s in chunks" % expr)
+    if comfortable_memory is None:
+        comfortable_memory = min(1e9, available_memory() / 4)
+
+    chunk = symbol('chunk', datashape.var * leaf.dshape.measure)
+    chunk_expr = expr._subs({leaf: chunk})
+
+    # Sort as many chunks at a time as ``map`` runs in parallel, so that the
+    # runs not yet counted against the budget stay few
+    width = 1 if is_serial(map) else psutil.cpu_count()
+    sort_chunk = curry(_sort_chunk, chunk, chunk_expr)
+    sorted_runs = (run for batch in partition_all(width, parts)
+                   for run in map(sort_chunk, batch))
+
+    key = sort_key(chunk_expr, [])
+
+    def merge(runs):
+        return _merge(runs, key, expr.ascending)
+
+    levels, in_memory, used = [], [], 0
+    for run in sorted_runs:
+        in_memory.append(run)
+        used += _nbytes(run)
+        if used > comfortable_memory:
+            f = _spill(merge([_rows(r) for r in in_memory]), batchsize)
+            _add_spilled(levels, f, merge, fanin, batchsize)
+            in_memory, used = [], 0
+
+    # Keep the runs in the order of their chunks
+    spilled = [f for level in reversed(levels) for f in level]
+    while len(spilled) > fanin:
+        spilled = [_spill(merge([_unspill(f) for f in group]), batchsize)
+                   for group in partition_all(fanin, spilled)]
+    runs = [_unspill(f) for f in spilled] + [_rows(r) for r in in_memory]
+    return merge(runs)
@@ -3,7 +3,7 @@ from __future__ import absolute_import, division, print_function
 import numpy as np
 import h5py
 from multipledispatch import MDNotImplementedError
-from datashape import DataShape, to_numpy
+from datashape import DataShape, to_numpy, var
 from toolz import curry
 
 import psutil
@@ -12,11 +12,13 @@ from multiprocessing.pool import ThreadPool
 
 from ..partition import partitions
 from ..expr import Reduction, Field, symbol
-from ..expr import Expr, Slice, ElemWise
+from ..expr import Expr, Slice, ElemWise, Head, TopK
 from ..expr import nelements
 from ..expr import path, shape, Symbol
+from ..expr.optimize import fuse_top_k
 from ..expr.split import split
 
+from .chunks import streams_head, stream_head
 from .core import compute
 from ..dispatch import dispatch
 from ..utils import available_memory
@@ -69,6 +71,12 @@ def optimize(expr, data):
         return expr._subs({expr._inputs[0]: child})
 
 
+@dispatch(Head, h5py.Dataset)
+def optimize(expr, data):
+    child = optimize(expr._child, data)
+    return fuse_top_k(expr._subs({expr._child: child}))
+
+
 @dispatch(Slice, (h5py.File, h5py.Group, h5py.Dataset))
 def optimize(expr, data):
     child = expr._inputs[0]
@@ -124,12 +132,9 @@ def compute_down(expr, data, **kwargs):
     return compute_down(expr2, data, **kwargs)
 
 
-def compute_chunk(source, target, chunk, chunk_expr, parts):
-    """ Pull out a part, compute it, insert it into the target """
-    source_part, target_part = parts
-    part = source[source_part]
-    result = compute(chunk_expr, {chunk: part})
-    target[target_part] = result
+def compute_part(source, chunk, chunk_expr, part):
+    """ Pull out a part and compute on it """
+    return compute(chunk_expr, {chunk: source[part]})
 
 
 thread_pool = None
@@ -145,6 +150,18 @@ def _get_map(map):
         return map
 
 
+@dispatch((Head, Slice), h5py.Dataset)
+def compute_down(expr, data, **kwargs):
+    """ Compute heads and slices of selections a chunk at a time, reading no
+    more chunks than needed """
+    leaf = expr._leaves()[0]
+    if expr._child.isidentical(leaf) or not streams_head(expr, leaf):
+        raise MDNotImplementedError()
+    chunksize = kwargs.get('chunksize', data.chunks)
+    parts = (data[index] for index in partitions(data, chunksize=chunksize))
+    return stream_head(expr, leaf, parts)
+
+
 @dispatch(Expr, h5py.Dataset)
 def compute_down(expr, data, map=None, **kwargs):
     """ Compute expressions on H5Py datasets by operating on chunks
@@ -158,13 +175,15 @@ def compute_down(expr, data, map=None, **kwargs):
     numpy array.  It then performs a second operation (again given by
     blaze.expr.split) on this intermediate aggregate
 
-    The expression must contain some sort of Reduction.  Both the intermediate
-    result and the final result are assumed to fit into memory
+    The expression must contain some sort of Reduction or a ``TopK``.  Both
+    the intermediate result and the final result are assumed to fit into
+    memory
     """
     map = _get_map(map)
 
     leaf = expr._leaves()[0]
-    if not any(isinstance(node, Reduction) for node in path(expr, leaf)):
+    nodes = list(path(expr, leaf))
+    if not any(isinstance(node, (Reduction, TopK)) for node in nodes):
         raise MDNotImplementedError()
 
     # Compute chunksize (this should be improved)
@@ -175,6 +194,15 @@ def compute_down(expr, data, map=None, **kwargs):
     (chunk, chunk_expr), (agg, agg_expr) = \
             split(leaf, expr, chunk=chunk)
 
+    if (any(isinstance(node, TopK) for node in nodes) or
+            var in chunk_expr.shape):
+        # Chunks may have fewer than n elements, or sketches of any size, so
+        # the size of the intermediate isn't known up front; concatenate the
+        # parts instead
+        parts = map(curry(compute_part, data, chunk, chunk_expr),
+                    partitions(data, chunksize=chunksize))
+        return compute(agg_expr, {agg: np.concatenate(list(parts))})
+
     # Create numpy array to hold intermediate aggregate
     shape, dtype = to_numpy(agg.dshape)
     intermediate = np.empty(shape=shape, dtype=dtype)
@@ -184,10 +212,11 @@ def compute_down(expr, data, map=None, **kwargs):
     target_parts = list(partitions(intermediate, chunksize=chunk_expr.shape,
                                    keepdims=True))
 
-    list(map(
-        curry(compute_chunk, data, intermediate, chunk, chunk_expr),
-        zip(source_parts, target_parts)
-    ))
+    # Insert the results here rather than in ``map`` so that they come back
+    # from worker processes too, see ``blaze.compute.pmap.ProcessPool``
+    results = map(curry(compute_part, data, chunk, chunk_expr), source_parts)
+    for target_part, result in zip(target_parts, results):
+        intermediate[target_part] = result
 
     # Compute on the aggregate
     return compute(agg_expr, {agg: intermediate})
@@ -0,0 +1,178 @@
+"""
+Partitioned hash join for data that comes in chunks
+
+Joins can not be split into chunks like reductions can, and joining two
+in-memory pandas DataFrames needs both inputs to fit in memory.  Instead we
+do a Grace hash join:
+
+1.  Stream the chunks of each side, hashing the join keys of every row into
+    one of ``npartitions`` partitions, and spill each partition to its own
+    temporary file
+2.  Rows with equal keys land in the same partition on both sides, so the
+    join is the union of the joins of each pair of partitions.  Each pair is
+    read back and joined in memory with pandas.
+
+The joined partitions stream back as chunks of DataFrames.
+"""
+from __future__ import absolute_import, division, print_function
+
+from distutils.version import LooseVersion
+import tempfile
+
+import numpy as np
+import pandas as pd
+from odo import into
+from odo.chunks import chunks
+
+from ..compatibility import pickle
+from ..utils import listpack
+from .core import compute_up
+
+
+__all__ = ['partitioned_join']
+
+
+def _hash_partitions(df, on, npartitions):
+    """ The partition of each row of ``df``, given by its join keys
+
+    Numeric keys are hashed as floats so that e.g. an integer key on one side
+    and a float key on the other put equal values in the same partition.
+
+    >>> df = pd.DataFrame({'a': [1, 2, 1], 'b': [1., 2., 1.]})
+    >>> p = _hash_partitions(df, ['a'], 4)
+    >>> p[0] == p[2]
+    True
+    >>> (p == _hash_partitions(df, ['b'], 4)).all()
+    True
+    """
+    keys = pd.DataFrame(dict(
+        (i, df[c].astype('f8') if df[c].dtype.kind in 'biuf' else df[c])
+        for i, c in enumerate(on)))
+    return _hash_rows(keys) % npartitions
+
+
+def _hash_tuples(keys):
+    """ Hashes of the rows of ``keys``, as hashes of tuples of their values
+
+    Missing values all hash as ``None``.
+
+    >>> df = pd.DataFrame({0: [1., np.nan, 1.], 1: ['a', 'b', 'a']})
+    >>> h = _hash_tuples(df)
+    >>> h[0] == h[2]
+    True
+    >>> (_hash_tuples(df.iloc[[1]]) == h[1]).all()
+    True
+    """
+    return np.array([hash(tuple(None if v is None or v != v else v
+                                for v in row))
+                     for row in keys.itertuples(index=False)], dtype='i8')
+
+
+# hash_pandas_object is new in pandas 0.20
+if LooseVersion(pd.__version__) >= '0.20.0':
+    def _hash_rows(keys):
+        return pd.util.hash_pandas_object(keys, index=False).values
+else:
+    _hash_rows = _hash_tuples
+
+
+def _spill(parts, dshape, on, npartitions):
+    """ Hash partition a stream of chunks into temporary files
+
+    Returns the files, one per partition, and an empty DataFrame with the
+    columns of the chunks.  The files are closed if spilling fails, otherwise
+    closing them is up to the caller.
+    """
+    files = [tempfile.TemporaryFile() for _ in range(npartitions)]
+    try:
+        empty = None
+        for part in parts:
+            df = into(pd.DataFrame, part, dshape=dshape)
+            if empty is None:
+                empty = df.iloc[:0]
+            if not len(df):
+                continue
+            for i, piece in df.groupby(_hash_partitions(df, on, npartitions)):
+                pickle.dump(piece, files[i], pickle.HIGHEST_PROTOCOL)
+        if empty is None:
+            empty = into(pd.DataFrame, [], dshape=dshape)
+    except:
+        _close(files)
+        raise
+    return files, empty
+
+
+def _close(files):
+    for f in files:
+        f.close()
+
+
+def _load(f, empty):
+    """ Read back the DataFrame of one partition written by ``_spill`` """
+    f.seek(0)
+    pieces = []
+    while True:
+        try:
+            pieces.append(pickle.load(f))
+        except EOFError:
+            break
+    if not pieces:
+        return empty
+    return pd.concat(pieces, ignore_index=True)
+
+
+def partitioned_join(expr, lhs, rhs, npartitions=16):
+    """ Join two streams of chunks with a partitioned (Grace) hash join
+
+    Parameters
+    ----------
+
+    expr : Join
+        The join to compute, with any ``how``
+    lhs, rhs : Iterable
+        The chunks of data for ``expr.lhs`` and ``expr.rhs``, e.g. ``Chunks``
+        or a list of DataFrames
+    npartitions : int, optional
+        The number of partitions.  Each pair of partitions must fit in memory.
+
+    Returns
+    -------
+
+    Chunks of DataFrames, one per partition
+
+    >>> from blaze import symbol, join
+    >>> a = symbol('a', 'var * {id: int64, x: int64}')
+    >>> b = symbol('b', 'var * {id: int64, y: int64}')
+    >>> left = [pd.DataFrame({'id': [1, 2], 'x': [10, 20]}),
+    ...         pd.DataFrame({'id': [3], 'x': [30]})]
+    >>> right = [pd.DataFrame({'id': [3, 1], 'y': [300, 100]})]
+    >>> result = into(pd.DataFrame, partitioned_join(join(a, b), left, right))
+    >>> sorted(result.values.tolist())
+    [[1, 10, 100], [3, 30, 300]]
+
+    Both sides are spilled when the result is iterated, and the temporary
+    files are closed once it is exhausted or closed.
+    """
+    def joined():
+        lfiles, lempty = _spill(lhs, expr.lhs.dshape,
+                                listpack(expr.on_left), npartitions)
+        try:
+            rfiles, rempty = _spill(rhs, expr.rhs.dshape,
+                                    listpack(expr.on_right), npartitions)
+        except:
+            _close(lfiles)
+            raise
+        try:
+            empty = True
+            for lf, rf in zip(lfiles, rfiles):
+                ldf, rdf = _load(lf, lempty), _load(rf, rempty)
+                if len(ldf) or len(rdf):
+                    empty = False
+                    yield compute_up(expr, ldf, rdf)
+            if empty:
+                # keep the columns of the result
+                yield compute_up(expr, lempty, rempty)
+        finally:
+            _close(lfiles + rfiles)
+
+    return chunks(pd.DataFrame)(joined)
@@ -0,0 +1,139 @@
+"""
+HyperLogLog sketches for ``approx_nunique``
+
+A sketch of a collection is an array of ``2 ** precision`` small registers.
+Each value is hashed to 64 bits; the first ``precision`` bits pick a register
+and the register keeps the largest number of leading zeros (plus one) seen in
+the remaining bits.  Sketches of chunks of data merge with an element-wise
+maximum, and the number of distinct values is estimated from the registers
+(Flajolet et al., 2007).
+
+    >>> registers = sketch(np.arange(10000) % 3000, 12)
+    >>> abs(estimate(registers, 12) - 3000) < 100
+    True
+"""
+from __future__ import absolute_import, division, print_function
+
+from distutils.version import LooseVersion
+from math import log
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = ['sketch', 'merge', 'estimate']
+
+
+def _mix(z):
+    """ Spread the bits of 64 bit integers with the splitmix64 finalizer
+
+    >>> (_mix(np.arange(1, 4, dtype='u8')) > 2 ** 32).all()
+    True
+    """
+    z = np.asarray(z, dtype=np.uint64)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+    return z ^ (z >> np.uint64(31))
+
+
+def _hash_array(values):
+    """ 64 bit hashes of the elements of an array, for pandas < 0.20
+
+    Numbers and dates are hashed by their bits.  Other objects are hashed
+    with ``hash``, which for text is only the same within a process and the
+    processes forked from it.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in 'biumM':
+        bits = values.astype('i8').view('u8')
+    elif values.dtype.kind == 'f':
+        bits = values.astype('f8').view('u8')
+    else:
+        bits = np.array([hash(None if v is None or v != v else v)
+                         for v in values], dtype='i8').view('u8')
+    return _mix(bits)
+
+
+def _hash_pandas(data):
+    """ 64 bit hashes of the elements of a Series or the rows of a
+    DataFrame, for pandas < 0.20 """
+    if isinstance(data, pd.Series):
+        return _hash_array(data.values)
+    hashes = np.zeros(len(data), dtype=np.uint64)
+    for c in data.columns:
+        hashes = _mix(hashes ^ _hash_array(data[c].values))
+    return hashes
+
+
+# hash_pandas_object and hash_array are new in pandas 0.20
+if LooseVersion(pd.__version__) >= '0.20.0':
+    def hash_pandas(data):
+        return pd.util.hash_pandas_object(data, index=False).values
+    hash_array = pd.util.hash_array
+else:
+    hash_pandas, hash_array = _hash_pandas, _hash_array
+
+
+def hash_values(data):
+    """ 64 bit hashes of the non-null elements, or rows, of a collection """
+    if isinstance(data, pd.DataFrame):
+        return hash_pandas(data)
+    if isinstance(data, pd.Series):
+        return hash_pandas(data.dropna())
+    if not isinstance(data, np.ndarray):
+        data = list(data)
+        if data and isinstance(data[0], tuple):
+            return hash_values(pd.DataFrame.from_records(data))
+        data = np.asarray(data, dtype=object if data else None)
+    if data.dtype.names:
+        return hash_values(pd.DataFrame(data))
+    if data.dtype.kind in 'SU':
+        data = data.astype(object)
+    return hash_array(data[~pd.isnull(data)])
+
+
+def sketch(data, precision):
+    """ The HyperLogLog registers of a collection """
+    hashes = hash_values(data)
+    index = (hashes >> np.uint64(64 - precision)).astype(np.intp)
+    rest = hashes << np.uint64(precision)
+
+    # one plus the number of leading zeros of the bits after the index
+    rank = np.empty(len(hashes), dtype=np.uint8)
+    rank.fill(64 - precision + 1)
+    nonzero = rest != 0
+    highest = np.floor(np.log2(rest[nonzero].astype(np.float64)))
+    rank[nonzero] = 64 - highest.astype(np.uint8)
+
+    registers = np.zeros(2 ** precision, dtype=np.uint8)
+    np.maximum.at(registers, index, rank)
+    return registers
+
+
+def merge(registers, precision):
+    """ Merge the concatenated registers of several sketches into one
+
+    >>> merge(np.array([0, 3, 2, 1], dtype='u1'), 1)
+    array([2, 3], dtype=uint8)
+    """
+    m = 2 ** precision
+    if not len(registers):
+        return np.zeros(m, dtype=np.uint8)
+    return np.asarray(registers, dtype=np.uint8).reshape(-1, m).max(axis=0)
+
+
+_alpha = {16: 0.673, 32: 0.697, 64: 0.709}
+
+
+def estimate(registers, precision):
+    """ The number of distinct values in the sketches, given their
+    concatenated registers """
+    m = 2 ** precision
+    registers = merge(registers, precision)
+    alpha = _alpha.get(m, 0.7213 / (1 + 1.079 / m))
+    result = alpha * m * m / np.sum(2.0 ** -registers.astype(np.float64))
+    zeros = int(np.count_nonzero(registers == 0))
+    if result <= 2.5 * m and zeros:
+        # linear counting is more accurate for small cardinalities
+        result = m * log(m / zeros)
+    return int(round(result))
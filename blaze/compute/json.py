@@ -1,10 +1,13 @@
 from .core import pre_compute
+from .chunks import streams_head
 from ..dispatch import dispatch
-from ..expr import Expr
+from ..expr import Expr, Head, Slice
 from odo.backends.json import JSON, JSONLines
 from odo import into
+from odo.chunks import chunks
 from collections import Iterator
 from odo.utils import records_to_tuples
+from toolz import partition_all
 
 
 __all__ = ['pre_compute']
@@ -22,3 +25,14 @@ def pre_compute(expr, data, **kwargs):
     seq = into(Iterator, data, **kwargs)
     leaf = expr._leaves()[0]
     return records_to_tuples(leaf.dshape, seq)
+
+
+@dispatch((Head, Slice), JSONLines)
+def pre_compute(expr, data, chunksize=10000, **kwargs):
+    leaf = expr._leaves()[0]
+    seq = records_to_tuples(leaf.dshape, into(Iterator, data, **kwargs))
+    if streams_head(expr, leaf):
+        # Read chunk by chunk, see compute_down(Head, Chunks)
+        return chunks(list)(list(part)
+                            for part in partition_all(chunksize, seq))
+    return seq
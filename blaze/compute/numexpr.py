@@ -4,10 +4,12 @@ from ..expr import (Expr, Symbol, Field, Arithmetic, UnaryMath, Not, USub,
                     isnan, UnaryOp, BinOp)
 from toolz import curry
 import itertools
+from toolz.compatibility import map
 from ..expr.broadcast import broadcast_collect
 
 
-funcnames = ('func_%d' % i for i in itertools.count())
+# ``map`` rather than a generator, so that threads can share it
+funcnames = map('func_%d'.__mod__, itertools.count())
 
 
 def parenthesize(s):
@@ -1,6 +1,7 @@
 from __future__ import absolute_import, division, print_function
 
 import datetime
+from distutils.version import LooseVersion
 
 import numpy as np
 from pandas import DataFrame, Series
@@ -9,16 +10,21 @@ from numbers import Number
 
 from ..expr import (
     Reduction, Field, Projection, Broadcast, Selection, ndim,
-    Distinct, Sort, Tail, Head, Label, ReLabel, Expr, Slice, Join,
-    std, var, count, nunique, Summary, IsIn,
+    Distinct, Sort, TopK, Tail, Head, Label, ReLabel, Expr, Slice, Join,
+    std, var, count, nunique, approx_nunique, hll_sketch, hll_merge,
+    hll_count, quantile, tdigest_sketch, tdigest_merge, tdigest_quantile,
+    Summary, IsIn,
     BinOp, UnaryOp, USub, Not, nelements, Repeat, Concat, Interp,
     UTCFromTimestamp, DateTimeTruncate,
     Transpose, TensorDot, Coerce, isnan,
     greatest, least, BinaryMath, atan2,
 )
+from ..expr.optimize import fuse_top_k, push_selections
+from ..compatibility import _strtypes
 from ..utils import keywords
 
-from .core import base, compute
+from .core import base, compute, compute_shared, optimize
+from . import hyperloglog, tdigest
 from ..dispatch import dispatch
 from odo import into
 import pandas as pd
@@ -26,6 +32,11 @@ import pandas as pd
 __all__ = ['np']
 
 
+@dispatch(Expr, np.ndarray)
+def optimize(expr, data):
+    return fuse_top_k(push_selections(expr))
+
+
 @dispatch(Field, np.ndarray)
 def compute_up(c, x, **kwargs):
     if x.dtype.names and c._name in x.dtype.names:
@@ -198,6 +209,88 @@ def compute_up(t, x, **kwargs):
     return result
 
 
+@dispatch((approx_nunique, hll_count), np.ndarray)
+def compute_up(t, x, **kwargs):
+    assert t.axis == tuple(range(ndim(t._child)))
+    registers = x if isinstance(t, hll_count) else hyperloglog.sketch(
+        x, t.precision)
+    result = hyperloglog.estimate(registers, t.precision)
+    if t.keepdims:
+        result = np.array([result])
+    return result
+
+
+@dispatch(hll_sketch, np.ndarray)
+def compute_up(t, x, **kwargs):
+    return hyperloglog.sketch(x, t.precision)
+
+
+@dispatch(hll_merge, np.ndarray)
+def compute_up(t, x, **kwargs):
+    return hyperloglog.merge(x, t.precision)
+
+
+def _percentile(x, q, axis, keepdims=False, skipna=False):
+    """ ``np.percentile`` over a tuple of axes, skipping NaNs if ``skipna``,
+    for numpy < 1.9
+
+    >>> x = np.array([[1., 2., np.nan], [4., 5., 6.]])
+    >>> _percentile(x, 50, (1,), skipna=True).tolist()
+    [1.5, 5.0]
+    >>> _percentile(x, 50, (0, 1), keepdims=True, skipna=True).tolist()
+    [[4.0]]
+    """
+    rest = [a for a in range(x.ndim) if a not in axis]
+    size = int(np.prod([x.shape[a] for a in axis]))
+    flat = x.transpose(rest + list(axis)).reshape(
+        [x.shape[a] for a in rest] + [size])
+
+    def one(values):
+        if skipna:
+            values = values[~np.isnan(values)]
+        return np.percentile(values, q) if len(values) else np.nan
+
+    result = np.apply_along_axis(one, -1, flat) if rest else one(flat)
+    if keepdims:
+        result = np.reshape(result, [1 if a in axis else n
+                                     for a, n in enumerate(x.shape)])
+    return result
+
+
+# nanpercentile, and the keepdims and tuple axis arguments of percentile,
+# are new in numpy 1.9
+if LooseVersion(np.__version__) >= '1.9.0':
+    def percentile(x, q, axis, keepdims=False, skipna=False):
+        func = np.nanpercentile if skipna else np.percentile
+        return func(x, q, axis=axis, keepdims=keepdims)
+else:
+    percentile = _percentile
+
+
+@dispatch(quantile, np.ndarray)
+def compute_up(t, x, **kwargs):
+    return percentile(x, t.q * 100, t.axis, keepdims=t.keepdims,
+                      skipna=x.dtype.kind == 'f')
+
+
+@dispatch(tdigest_sketch, np.ndarray)
+def compute_up(t, x, **kwargs):
+    return tdigest.sketch(x, t.compression)
+
+
+@dispatch(tdigest_merge, np.ndarray)
+def compute_up(t, x, **kwargs):
+    return tdigest.merge(x, t.compression)
+
+
+@dispatch(tdigest_quantile, np.ndarray)
+def compute_up(t, x, **kwargs):
+    result = tdigest.quantile(x, t.q)
+    if t.keepdims:
+        result = np.array([result])
+    return result
+
+
 @dispatch(Reduction, np.ndarray)
 def compute_up(t, x, **kwargs):
     # can't use the method here, as they aren't Python functions
@@ -218,8 +311,12 @@ def axify(expr, axis, keepdims=False):
     >>> expr = s.sum()
     >>> axify(expr, axis=0)
     sum(s, axis=(0,))
+    >>> axify(s.quantile(0.9), axis=0)
+    quantile(s, axis=(0,), q=0.9)
     """
-    return type(expr)(expr._child, axis=axis, keepdims=keepdims)
+    kwargs = dict((slot, getattr(expr, slot)) for slot in expr.__slots__[2:]
+                  if slot not in ('axis', 'keepdims'))
+    return type(expr)(expr._child, axis=axis, keepdims=keepdims, **kwargs)
 
 
 @dispatch(Summary, np.ndarray)
@@ -227,11 +324,14 @@ def compute_up(expr, data, **kwargs):
     shape, dtype = to_numpy(expr.dshape)
     if shape:
         result = np.empty(shape=shape, dtype=dtype)
-        for n, v in zip(expr.names, expr.values):
-            result[n] = compute(axify(v, expr.axis, expr.keepdims), data)
+        values = [axify(v, expr.axis, expr.keepdims) for v in expr.values]
+        for n, v in zip(expr.names, compute_shared(values,
+                                                   {expr._child: data})):
+            result[n] = v
         return result
     else:
-        return tuple(compute(axify(v, expr.axis), data) for v in expr.values)
+        values = [axify(v, expr.axis) for v in expr.values]
+        return tuple(compute_shared(values, {expr._child: data}))
 
 
 @dispatch((std, var), np.ndarray)
@@ -273,6 +373,37 @@ def compute_up(t, x, **kwargs):
     return result
 
 
+@dispatch(TopK, np.ndarray)
+def compute_up(t, x, **kwargs):
+    """ Sort only the elements that can be among the first ``t.n``
+
+    ``np.partition`` finds the ``n``-th smallest (or largest) value of the
+    leading key in linear time.  Rows on the near side of it, ties included,
+    are then sorted as ``Sort`` would.
+    """
+    n = len(x)
+    if x.dtype.names is None:
+        keys = x
+    elif isinstance(t.key, _strtypes) and t.key in x.dtype.names:
+        keys = x[t.key]
+    elif isinstance(t.key, list) and all(k in x.dtype.names for k in t.key):
+        keys = x[t.key[0]]
+    else:
+        raise NotImplementedError("Sort key %s not supported" % t.key)
+
+    if (t.n < n and keys.dtype.kind in 'biufSU' and
+            not (keys.dtype.kind == 'f' and np.isnan(keys).any())):
+        if t.ascending:
+            kth = np.partition(keys, t.n - 1)[t.n - 1]
+            x = x[keys <= kth]
+        else:
+            kth = np.partition(keys, n - t.n)[n - t.n]
+            x = x[keys >= kth]
+
+    sort = Sort(t._child, t._key, t.ascending)
+    return compute_up(sort, x, **kwargs)[:t.n]
+
+
 @dispatch(Head, np.ndarray)
 def compute_up(t, x, **kwargs):
     return x[:t.n]
@@ -51,7 +51,8 @@ except ImportError:
 
 from ..dispatch import dispatch
 
-from .core import compute, compute_up, base
+from .core import compute, compute_up, compute_shared, optimize, base
+from . import hyperloglog, tdigest
 
 from ..expr import (Projection, Field, Sort, Head, Tail, Sample, Broadcast,
                     Selection, Reduction, Distinct, Join, By, Summary, Label,
@@ -59,15 +60,27 @@ from ..expr import (Projection, Field, Sort, Head, Tail, Sample, Broadcast,
                     ElemWise, DateTime, Millisecond, Expr, Symbol, IsIn,
                     UTCFromTimestamp, nelements, DateTimeTruncate, count,
                     UnaryStringFunction, nunique, Coerce, Concat, isnan,
-                    notnull, Shift)
+                    notnull, Shift, TopK, approx_nunique, hll_sketch,
+                    quantile, tdigest_sketch)
 from ..expr import UnaryOp, BinOp, Interp
 from ..expr import symbol, common_subexpression
+from ..expr.optimize import fuse_top_k, push_selections
 
 from ..compatibility import _inttypes
 
 __all__ = []
 
 
+@dispatch(Expr, NDFrame)
+def optimize(expr, data):
+    return fuse_top_k(push_selections(expr))
+
+
+@dispatch(Expr, NDFrame, NDFrame)
+def optimize(expr, lhs, rhs):
+    return fuse_top_k(push_selections(expr))
+
+
 @dispatch(Projection, (DataFrame, DaskDataFrame))
 def compute_up(t, df, **kwargs):
     return df[list(t.fields)]
@@ -255,6 +268,33 @@ def compute_up(expr, data, **kwargs):
     return compute_up(expr._child.distinct().count(), data, **kwargs)
 
 
+@dispatch(approx_nunique, (DataFrame, Series))
+def compute_up(expr, data, **kwargs):
+    result = hyperloglog.estimate(hyperloglog.sketch(data, expr.precision),
+                                  expr.precision)
+    if expr.keepdims:
+        result = Series([result], name=expr._name)
+    return result
+
+
+@dispatch(hll_sketch, (DataFrame, Series))
+def compute_up(expr, data, **kwargs):
+    return hyperloglog.sketch(data, expr.precision)
+
+
+@dispatch(quantile, (Series, SeriesGroupBy))
+def compute_up(t, s, **kwargs):
+    result = get_scalar(s.quantile(t.q))
+    if t.keepdims:
+        result = Series([result], name=t._name)
+    return result
+
+
+@dispatch(tdigest_sketch, Series)
+def compute_up(expr, data, **kwargs):
+    return tdigest.sketch(data, expr.compression)
+
+
 string_func_names = {
     'strlen': 'len',
 }
@@ -514,6 +554,39 @@ def compute_up(t, s, **kwargs):
         return s.order(ascending=t.ascending)
 
 
+# DataFrame.nlargest and nsmallest are new in pandas 0.17
+frame_nlargest = LooseVersion(pd.__version__) >= '0.17.0'
+
+
+def _selectable(s):
+    """ Whether ``nlargest`` and ``nsmallest`` give the same rows as a sort
+    on ``s`` """
+    return s.dtype.kind in 'iufmM' and not s.isnull().any()
+
+
+@dispatch(TopK, DataFrame)
+def compute_up(t, df, **kwargs):
+    key = t.key
+    if isinstance(key, list) and len(key) == 1:
+        key, = key
+    if (not frame_nlargest or isinstance(key, list) or
+            not _selectable(df[key])):
+        return pdsort(df, t.key, ascending=t.ascending).head(t.n)
+    # older pandas return every row tied with the n-th, so trim to n
+    if t.ascending:
+        return df.nsmallest(t.n, key).head(t.n)
+    return df.nlargest(t.n, key).head(t.n)
+
+
+@dispatch(TopK, Series)
+def compute_up(t, s, **kwargs):
+    if not _selectable(s):
+        return compute_up(Sort(t._child, t._key, t.ascending), s).head(t.n)
+    if t.ascending:
+        return s.nsmallest(t.n)
+    return s.nlargest(t.n)
+
+
 @dispatch(Sample, (Series, DataFrame, DaskDataFrame, DaskSeries))
 def compute_up(t, df, **kwargs):
     frac = t.frac if t.frac is not None else float(t.n) / len(df)
@@ -586,7 +659,7 @@ def compute_up(t, df, scope=None, **kwargs):
 
 @dispatch(Summary, (DataFrame, DaskDataFrame))
 def compute_up(expr, data, **kwargs):
-    values = [compute(val, {expr._child: data}) for val in expr.values]
+    values = compute_shared(expr.values, {expr._child: data})
     if expr.keepdims:
         return type(data)([values], columns=expr.fields)
     else:
@@ -595,7 +668,7 @@ def compute_up(expr, data, **kwargs):
 
 @dispatch(Summary, (Series, DaskSeries))
 def compute_up(expr, data, **kwargs):
-    result = tuple(compute(val, {expr._child: data}) for val in expr.values)
+    result = tuple(compute_shared(expr.values, {expr._child: data}))
     if expr.keepdims:
         result = [result]
     return result
@@ -1,5 +1,27 @@
 from __future__ import absolute_import, division, print_function
 
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+import psutil
+
+from ..compatibility import builtins, map as imap
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+__all__ = ['set_default_pmap', 'get_default_pmap', 'is_serial', 'ProcessPool']
+
+
 default_map = map
 
 
@@ -10,3 +32,226 @@ def set_default_pmap(func):
 
 def get_default_pmap():
     return default_map
+
+
+def is_serial(map):
+    """ Whether ``map`` computes one item at a time in the calling thread """
+    return map is builtins.map or map is imap
+
+
+# Arrays smaller than this are pickled rather than shared through a file
+share_threshold = 2 ** 16
+
+
+class Shared(object):
+    """ A NumPy array written to a file, to be memory mapped by another
+    process instead of pickled through a pipe """
+    def __init__(self, path):
+        self.path = path
+
+
+class SharedFrame(object):
+    """ A DataFrame or Series whose columns travel as ``Shared`` arrays where
+    they are large enough
+
+    Columns of objects, categoricals and small columns are pickled along with
+    it, as is the index unless it holds a large array of its own.
+    """
+    def __init__(self, kind, names, columns, index):
+        self.kind = kind
+        self.names = names
+        self.columns = columns
+        self.index = index
+
+
+def _share_array(data, dirname):
+    if (isinstance(data, np.ndarray) and not data.dtype.hasobject and
+            data.nbytes >= share_threshold):
+        fd, path = tempfile.mkstemp(suffix='.npy', dir=dirname)
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, data)
+        return Shared(path)
+    return data
+
+
+def _share_index(index, dirname):
+    # A RangeIndex pickles to its bounds
+    if isinstance(index, (pd.MultiIndex, getattr(pd, 'RangeIndex', ()))):
+        return index
+    return _share_array(index.values, dirname), index.name
+
+
+def _share(data, dirname):
+    """ Write large arrays, and the large columns of DataFrames and Series, to
+    files in ``dirname``, leave anything else as it is to be pickled """
+    if isinstance(data, pd.DataFrame):
+        columns = [_share_array(data.iloc[:, i].values, dirname)
+                   for i in range(len(data.columns))]
+        return SharedFrame(pd.DataFrame, list(data.columns), columns,
+                           _share_index(data.index, dirname))
+    if isinstance(data, pd.Series):
+        return SharedFrame(pd.Series, [data.name],
+                           [_share_array(data.values, dirname)],
+                           _share_index(data.index, dirname))
+    return _share_array(data, dirname)
+
+
+def _unshare_array(data):
+    if not isinstance(data, Shared):
+        return data
+    result = np.load(data.path, mmap_mode='r')
+    os.remove(data.path)
+    return result
+
+
+def _unshare(data):
+    """ Memory map the arrays written by ``_share``
+
+    Files are removed at once: the mapping keeps its pages alive until the
+    array is collected.
+    """
+    if not isinstance(data, SharedFrame):
+        return _unshare_array(data)
+    index = data.index
+    if isinstance(index, tuple):
+        values, name = index
+        index = pd.Index(_unshare_array(values), name=name)
+    columns = [_unshare_array(c) for c in data.columns]
+    if data.kind is pd.Series:
+        return pd.Series(columns[0], index=index, name=data.names[0])
+    result = pd.DataFrame(dict(enumerate(columns)), index=index,
+                          columns=list(range(len(columns))))
+    result.columns = data.names
+    return result
+
+
+def _shared_nbytes(data):
+    """ The size of the files ``_unshare`` maps for ``data`` """
+    if isinstance(data, Shared):
+        return os.path.getsize(data.path)
+    if isinstance(data, SharedFrame):
+        index = data.index if isinstance(data.index, tuple) else ()
+        return sum(map(_shared_nbytes, list(data.columns) + list(index)))
+    return 0
+
+
+_func = None
+_dirname = None
+_limit = None
+
+
+def _set_limit(limit):
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _initialize(func, dirname, memory):
+    global _func, _dirname, _limit
+    _func, _dirname = func, dirname
+    if memory is not None and resource is not None:
+        # Allow ``memory`` bytes on top of what the worker holds at start
+        _limit = psutil.Process().memory_info().vms + memory
+        _set_limit(_limit)
+
+
+def _run(item):
+    if _limit is not None:
+        # Mapping the input takes address space but is not an allocation
+        _set_limit(_limit + _shared_nbytes(item))
+    return _share(_func(_unshare(item)), _dirname)
+
+
+def _context():
+    """ A multiprocessing context that forks, so that workers inherit the
+    function they run and the data it closes over """
+    get_context = getattr(multiprocessing, 'get_context', None)
+    if get_context is None:
+        return multiprocessing
+    return get_context('fork')
+
+
+class ProcessPool(object):
+    """ A pool of worker processes to map over chunks in ``compute_down``
+
+    Each call to ``map`` forks a pool of workers that inherit the function to
+    run, so data sources bound to it such as bcolz tables or h5py datasets
+    are not pickled: workers read their own partitions given the partition
+    keys from ``blaze.partition``.  Large NumPy arrays, and the large columns
+    of DataFrames and Series, travel to and from the workers as memory mapped
+    files rather than through pipes.  Other data, e.g. lists of tuples or
+    columns of Python objects, is pickled as usual.
+
+    Parameters
+    ----------
+
+    processes : int, optional
+        The number of workers, defaults to the number of cores
+    memory : int, optional
+        The number of bytes each worker may allocate beyond what it holds
+        when it starts, on top of the memory mapped chunk it is given.
+        Larger allocations raise ``MemoryError``.  No limit by default, and
+        not enforced on Windows.
+    dirname : str, optional
+        Where to write shared arrays.  Defaults to ``/dev/shm`` where it
+        exists, so that arrays stay in memory, else to the temporary
+        directory.  Each call to ``map`` writes to a directory of its own in
+        there, removed when it returns or fails.
+
+    Up to twice as many items as there are workers are shared ahead of the
+    results that have been consumed, so a long sequence of chunks is not all
+    written out at once.  ``map`` yields results as they arrive rather than
+    collecting them in a list.
+
+    Workers must be forked, so ``ProcessPool`` is not available on Windows.
+
+    Examples
+    --------
+
+    >>> from blaze import compute, symbol
+    >>> from odo.chunks import chunks
+    >>> s = symbol('s', 'var * int64')
+    >>> data = chunks(np.ndarray)([np.arange(5), np.arange(5, 10)])
+    >>> compute(s.sum(), data, map=ProcessPool(2).map)
+    45
+
+    Use it for all chunked computations with ``set_default_pmap``
+
+    >>> set_default_pmap(ProcessPool().map)  # doctest: +SKIP
+    """
+    def __init__(self, processes=None, memory=None, dirname=None):
+        if not hasattr(os, 'fork'):
+            raise NotImplementedError('ProcessPool forks its workers, which '
+                                      'is not possible on %s' % sys.platform)
+        if dirname is None:
+            dirname = '/dev/shm' if os.path.isdir('/dev/shm') else None
+        self.processes = processes or psutil.cpu_count()
+        self.memory = memory
+        self.dirname = dirname
+
+    def map(self, func, seq):
+        dirname = tempfile.mkdtemp(prefix='blaze-', dir=self.dirname)
+        ahead = threading.Semaphore(2 * self.processes)
+        stopped = []
+
+        def items():
+            # Runs in the task thread of the pool, which blocks here until
+            # results have been consumed
+            for item in seq:
+                ahead.acquire()
+                if stopped:
+                    return
+                yield _share(item, dirname)
+
+        pool = _context().Pool(self.processes, initializer=_initialize,
+                               initargs=(func, dirname, self.memory))
+        try:
+            for r in pool.imap(_run, items()):
+                yield _unshare(r)
+                ahead.release()
+        finally:
+            stopped.append(True)
+            ahead.release()
+            pool.terminate()
+            shutil.rmtree(dirname, ignore_errors=True)
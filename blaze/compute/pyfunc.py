@@ -15,9 +15,11 @@ import fnmatch
 import math
 import toolz
 import itertools
+from toolz.compatibility import map
 
 
-funcnames = ('func_%d' % i for i in itertools.count())
+# ``map`` rather than a generator, so that threads can share it
+funcnames = map('func_%d'.__mod__, itertools.count())
 
 
 def parenthesize(s):
@@ -16,6 +16,7 @@ import numbers
 import fnmatch
 import operator
 import datetime
+import heapq
 import math
 import random
 
@@ -35,20 +36,23 @@ from datashape.predicates import isscalar, iscollection
 from ..dispatch import dispatch
 from ..expr import (Projection, Field, Broadcast, Map, Label, ReLabel,
                     Merge, Join, Selection, Reduction, Distinct,
-                    By, Sort, Head, Sample, Apply, Summary, Like, IsIn,
+                    By, Sort, Head, TopK, Sample, Apply, Summary, Like, IsIn,
                     DateTime, Date, Time, Millisecond, ElemWise,
                     Symbol, Slice, Expr, Arithmetic, ndim, DateTimeTruncate,
                     UTCFromTimestamp, notnull, UnaryMath, greatest, least)
 from ..expr import reductions
-from ..expr import count, nunique, mean, var, std
+from ..expr import count, nunique, approx_nunique, hll_sketch, mean, var, std
+from ..expr import quantile, tdigest_sketch
 from ..expr import BinOp, UnaryOp, USub, Not, nelements
 from ..compatibility import builtins, apply, unicode, _inttypes
-from .core import compute, compute_up, optimize, base
+from .core import compute, compute_up, compute_shared, optimize, base
 
 from ..utils import listpack
 from ..expr.broadcast import broadcast_collect
+from ..expr.optimize import fuse_top_k, push_selections
 from .pyfunc import lambdify
 from . import pydatetime
+from . import hyperloglog, tdigest
 
 # Dump exp, log, sin, ... into namespace
 from math import *
@@ -78,7 +82,12 @@ def pre_compute(expr, seq, scope=None, **kwargs):
 
 @dispatch(Expr, Sequence)
 def optimize(expr, seq):
-    return broadcast_collect(expr)
+    return broadcast_collect(fuse_top_k(push_selections(expr)))
+
+
+@dispatch(Expr, Sequence, Sequence)
+def optimize(expr, lhs, rhs):
+    return fuse_top_k(push_selections(expr))
 
 
 def child(x):
@@ -400,6 +409,21 @@ def _std(seq, unbiased):
     return math.sqrt(_var(seq, unbiased))
 
 
+def _quantile(seq, q):
+    """ The ``q`` quantile of the non-null items, interpolating linearly
+
+    >>> _quantile([4, 1, None, 2], 0.75)
+    3.0
+    """
+    values = sorted(item for item in seq if item is not None and item == item)
+    if not values:
+        return float('nan')
+    position = q * (len(values) - 1)
+    lower = int(math.floor(position))
+    upper = builtins.min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
 @dispatch(count, Sequence)
 def compute_up_1d(t, seq, **kwargs):
     return toolz.count(filter(None, seq))
@@ -428,6 +452,17 @@ def compute_up_1d(t, seq, **kwargs):
     return len(set(seq))
 
 
+@dispatch(approx_nunique, Sequence)
+def compute_up_1d(t, seq, **kwargs):
+    return hyperloglog.estimate(hyperloglog.sketch(seq, t.precision),
+                                t.precision)
+
+
+@dispatch(hll_sketch, Sequence)
+def compute_up(t, seq, **kwargs):
+    return hyperloglog.sketch(seq, t.precision)
+
+
 @dispatch(mean, Sequence)
 def compute_up_1d(t, seq, **kwargs):
     return _mean(seq)
@@ -443,6 +478,16 @@ def compute_up_1d(t, seq, **kwargs):
     return _std(seq, t.unbiased)
 
 
+@dispatch(quantile, Sequence)
+def compute_up_1d(t, seq, **kwargs):
+    return _quantile(seq, t.q)
+
+
+@dispatch(tdigest_sketch, Sequence)
+def compute_up(t, seq, **kwargs):
+    return tdigest.sketch(list(seq), t.compression)
+
+
 lesser = lambda x, y: x if x < y else y
 greater = lambda x, y: x if x > y else y
 countit = lambda acc, _: acc + 1
@@ -646,19 +691,30 @@ def compute_up(t, lhs, rhs, **kwargs):
     return map(assemble, pairs)
 
 
-@dispatch(Sort, Sequence)
-def compute_up(t, seq, **kwargs):
+def sort_key(t, seq):
+    """ The function that gives the sort key of an element for ``t``,
+    a ``Sort`` or ``TopK`` expression """
     if isscalar(t._child.dshape.measure) and t.key == t._child._name:
-        key = identity
+        return identity
     elif isinstance(t.key, (str, unicode, tuple, list)):
-        key = rowfunc(t._child[t.key])
+        return rowfunc(t._child[t.key])
     else:
-        key = rrowfunc(optimize(t.key, seq), t._child)
+        return rrowfunc(optimize(t.key, seq), t._child)
+
+
+@dispatch(Sort, Sequence)
+def compute_up(t, seq, **kwargs):
     return sorted(seq,
-                  key=key,
+                  key=sort_key(t, seq),
                   reverse=not t.ascending)
 
 
+@dispatch(TopK, Sequence)
+def compute_up(t, seq, **kwargs):
+    select = heapq.nsmallest if t.ascending else heapq.nlargest
+    return select(t.n, seq, key=sort_key(t, seq))
+
+
 @dispatch(Head, Sequence)
 def compute_up(t, seq, **kwargs):
     if t.n < 100:
@@ -692,8 +748,7 @@ def compute_up(expr, data, **kwargs):
         result = tuple(compute(val, {expr._child: data})
                        for val, data in zip(expr.values, datas))
     else:
-        result = tuple(compute(val, {expr._child: data})
-                       for val in expr.values)
+        result = tuple(compute_shared(expr.values, {expr._child: data}))
 
     if expr.keepdims:
         return (result,)
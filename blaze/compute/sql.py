@@ -58,7 +58,8 @@ from .core import compute_up, compute, base
 from ..expr import (
     Projection, Selection, Field, Broadcast, Expr, IsIn, Slice, BinOp, UnaryOp,
     Join, mean, var, std, Reduction, count, FloorDiv, UnaryStringFunction,
-    strlen, DateTime, Coerce, nunique, Distinct, By, Sort, Head, Tail, Sample,
+    strlen, DateTime, Coerce, nunique, approx_nunique, Distinct, By, Sort, Head,
+    Tail, Sample, quantile,
     Label, Concat, ReLabel, Merge, common_subexpression, Summary, Like,
     nelements, notnull, Shift, BinaryMath, Pow, DateTimeTruncate, Sub,
 )
@@ -395,7 +396,8 @@ def select(s):
     return s
 
 
-table_names = ('table_%d' % i for i in itertools.count(1))
+# ``map`` rather than a generator, so that threads can share it
+table_names = map('table_%d'.__mod__, itertools.count(1))
 
 
 def name(sel):
@@ -671,6 +673,94 @@ def compute_up(expr, data, **kwargs):
     return select(data).distinct().alias(next(aliases)).count()
 
 
+class approx_count_distinct(sa.sql.functions.FunctionElement):
+    """ ``count(DISTINCT x)``, estimated by databases that can """
+    name = 'approx_count_distinct'
+    type = sa.Integer()
+
+
+@compiles(approx_count_distinct)
+def compile_approx_count_distinct(element, compiler, **kwargs):
+    # Exact where there is no estimate
+    arg, = element.clauses
+    return compiler.process(sa.func.count(arg.distinct()), **kwargs)
+
+
+@compiles(approx_count_distinct, 'mssql')
+@compiles(approx_count_distinct, 'oracle')
+@compiles(approx_count_distinct, 'snowflake')
+@compiles(approx_count_distinct, 'bigquery')
+def compile_approx_count_distinct_function(element, compiler, **kwargs):
+    return 'APPROX_COUNT_DISTINCT(%s)' % compiler.process(element.clauses,
+                                                          **kwargs)
+
+
+@compiles(approx_count_distinct, 'presto')
+def compile_approx_distinct(element, compiler, **kwargs):
+    return 'approx_distinct(%s)' % compiler.process(element.clauses, **kwargs)
+
+
+@compiles(approx_count_distinct, 'redshift')
+def compile_approximate_count_distinct(element, compiler, **kwargs):
+    return 'APPROXIMATE COUNT(DISTINCT %s)' % compiler.process(
+        element.clauses, **kwargs)
+
+
+@dispatch(approx_nunique, ColumnElement)
+def compute_up(t, s, **kwargs):
+    if t.axis != (0,):
+        raise ValueError('axis not equal to 0 not defined for SQL reductions')
+    return approx_count_distinct(s)
+
+
+@dispatch(approx_nunique, Selectable)
+def compute_up(expr, data, **kwargs):
+    """ The number of distinct rows of a table
+
+    Databases only estimate the number of distinct values of a column, so
+    distinct rows are counted exactly, as ``nunique`` does.
+    """
+    return compute_up(nunique(expr._child), data, **kwargs)
+
+
+class percentile_cont(sa.sql.functions.FunctionElement):
+    """ The ``q`` quantile of a column, interpolating linearly """
+    name = 'percentile_cont'
+    type = sa.Float()
+
+    def __init__(self, q, *clauses, **kwargs):
+        self.q = q
+        super(percentile_cont, self).__init__(*clauses, **kwargs)
+
+
+@compiles(percentile_cont)
+def compile_percentile_cont(element, compiler, **kwargs):
+    return 'percentile_cont(%s) WITHIN GROUP (ORDER BY %s)' % (
+        float(element.q), compiler.process(element.clauses, **kwargs))
+
+
+@compiles(percentile_cont, 'presto')
+def compile_approx_percentile(element, compiler, **kwargs):
+    return 'approx_percentile(%s, %s)' % (
+        compiler.process(element.clauses, **kwargs), float(element.q))
+
+
+@compiles(percentile_cont, 'sqlite')
+@compiles(percentile_cont, 'mysql')
+@compiles(percentile_cont, 'mssql')
+def compile_no_percentile_cont(element, compiler, **kwargs):
+    # mssql only has percentile_cont as a window function
+    raise sa.exc.CompileError('%s has no aggregate percentile_cont' %
+                              compiler.dialect.name)
+
+
+@dispatch(quantile, ColumnElement)
+def compute_up(t, s, **kwargs):
+    if t.axis != (0,):
+        raise ValueError('axis not equal to 0 not defined for SQL reductions')
+    return percentile_cont(t.q, s).label(t._name)
+
+
 @dispatch(By, sa.Column)
 def compute_up(expr, data, scope=None, **kwargs):
     data = lower_column(data)
@@ -744,7 +834,8 @@ def lower_column(col):
     return old
 
 
-aliases = ('alias_%d' % i for i in itertools.count(1))
+# ``map`` rather than a generator, so that threads can share it
+aliases = map('alias_%d'.__mod__, itertools.count(1))
 
 
 @toolz.memoize
@@ -0,0 +1,86 @@
+"""
+t-digest sketches for ``quantile`` on chunked data
+
+A sketch is a sorted array of centroids, each a mean and the number of
+values it stands for.  Centroids near the median stand for many values and
+centroids near the extremes for few, so quantiles in the tails stay accurate
+(Dunning and Ertl, 2019).  Sketches of chunks of data merge by concatenating
+and compressing their centroids.
+
+    >>> x = np.arange(10001, dtype='f8')
+    >>> centroids = sketch(x, 100)
+    >>> len(centroids) < 100
+    True
+    >>> abs(quantile(centroids, 0.9) - 9000) < 50
+    True
+"""
+from __future__ import absolute_import, division, print_function
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = ['sketch', 'merge', 'quantile']
+
+
+dtype = np.dtype([('mean', 'f8'), ('weight', 'f8')])
+
+
+def sketch(data, compression):
+    """ The centroids of the non-null values of a collection """
+    values = np.asarray(pd.Series(np.ravel(data)).dropna(), dtype='f8')
+    centroids = np.empty(len(values), dtype=dtype)
+    centroids['mean'] = values
+    centroids['weight'] = 1
+    return merge(centroids, compression)
+
+
+def merge(centroids, compression):
+    """ Merge centroids into at most about ``compression / 2`` centroids
+
+    Centroids are grouped by the integer part of the scale function
+    ``k(q) = compression / (2 pi) * arcsin(2 q - 1)`` at their quantile ``q``.
+
+    >>> c = np.array([(1., 1.), (2., 1.), (3., 2.)], dtype=dtype)
+    >>> merge(c, 1000).tolist()
+    [(1.0, 1.0), (2.0, 1.0), (3.0, 2.0)]
+    >>> merge(c, 1).tolist()
+    [(1.5, 2.0), (3.0, 2.0)]
+    """
+    centroids = np.sort(np.asarray(centroids, dtype=dtype), order='mean')
+    weights = centroids['weight']
+    total = weights.sum()
+    if not len(centroids) or not total:
+        return centroids[:0]
+    q = (np.cumsum(weights) - weights / 2) / total
+    k = compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+    groups = np.floor(k)
+    # Groups are runs of consecutive centroids, as q increases with them
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    weight = np.add.reduceat(weights, starts)
+    result = np.empty(len(starts), dtype=dtype)
+    result['weight'] = weight
+    result['mean'] = np.add.reduceat(centroids['mean'] * weights,
+                                     starts) / weight
+    return result
+
+
+def quantile(centroids, q):
+    """ Estimate the ``q`` quantile from the concatenated centroids of one or
+    more sketches
+
+    Interpolates linearly between the centres of the centroids, which is
+    exact while each centroid stands for a single value.
+
+    >>> c = np.array([(1., 1.), (2., 1.), (4., 1.)], dtype=dtype)
+    >>> quantile(c, 0.75)
+    3.0
+    """
+    centroids = np.sort(np.asarray(centroids, dtype=dtype), order='mean')
+    weights = centroids['weight']
+    if not weights.sum():
+        return np.nan
+    # the 0-based rank at the middle of each centroid
+    centres = np.cumsum(weights) - (weights + 1) / 2
+    return float(np.interp(q * (weights.sum() - 1), centres,
+                           centroids['mean']))
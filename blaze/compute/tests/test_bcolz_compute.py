@@ -10,7 +10,7 @@ import numpy as np
 import pandas.util.testing as tm
 
 from odo import into
-from blaze import by
+from blaze import by, ProcessPool
 from blaze.expr import symbol
 from blaze.compute.core import compute, pre_compute
 from blaze.compute.bcolz import get_chunksize
@@ -170,3 +170,20 @@ def test_by_with_single_row():
     result = compute(expr, ct)
     expected = compute(expr, ct, optimize=False)
     tm.assert_frame_equal(result, expected)
+
+
+def test_sort_in_chunks():
+    ct = bcolz.ctable([[3, 1, 2, 1, 3], [1, 2, 3, 4, 5]], names=list('ab'))
+    t = symbol('t', discover(ct))
+    for expr in [t.sort('a'), t.sort(['a', 'b'], ascending=False), t.b.sort()]:
+        result = compute(expr, ct, chunksize=2, comfortable_memory=0)
+        assert into(list, result) == into(list, compute(expr, ct[:]))
+
+
+def test_process_pool():
+    ct = bcolz.ctable([np.arange(1000), np.arange(1000) % 7], names=['a', 'b'])
+    r = symbol('r', discover(ct))
+    pool = ProcessPool(2)
+    for expr in [r.a.sum(), r.b.nunique(), r.a.mean()]:
+        assert (compute(expr, ct, chunksize=100, map=pool.map) ==
+                compute(expr, ct, chunksize=100))
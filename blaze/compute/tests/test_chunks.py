@@ -36,3 +36,236 @@ def test_pmap_default():
     compute(s + 1, cL)
 
     assert flag[0] is True
+
+
+def test_chunks_top_k():
+    records = [(i % 7, i) for i in range(30)]
+    cR = chunks(list)([records[:10], records[10:20], records[20:]])
+    r = symbol('r', 'var * {a: int, b: int}')
+    for expr in [r.sort('a').head(4), r.sort('a', ascending=False).head(4),
+                 r.sort(['a', 'b'], ascending=False).head(12).b]:
+        assert (into(list, compute(expr, {r: cR})) ==
+                into(list, compute(expr, {r: records})))
+
+
+def test_chunks_sort():
+    records = [(i % 7, 30 - i) for i in range(30)]
+    cR = chunks(list)([records[:10], records[10:20], records[20:]])
+    r = symbol('r', 'var * {a: int, b: int}')
+    for expr in [r.sort('a'), r.sort(['a', 'b'], ascending=False),
+                 r[r.b > 5].sort('b').a, (r.b + 1).sort(), r.a.sort().sum()]:
+        expected = compute(expr, {r: records})
+        for memory in [None, 0]:
+            result = compute(expr, {r: cR}, comfortable_memory=memory)
+            if iscollection(expr.dshape):
+                assert into(list, result) == into(list, expected)
+            else:
+                assert result == expected
+
+
+def test_chunks_sort_under_reduction_is_dropped(monkeypatch):
+    import blaze.compute.chunks
+
+    def no_sort(*args, **kwargs):
+        raise AssertionError('sorted the chunks')
+    monkeypatch.setattr(blaze.compute.chunks, 'external_sort', no_sort)
+
+    records = [(i % 7, 30 - i) for i in range(30)]
+    cR = chunks(list)([records[:10], records[10:20], records[20:]])
+    r = symbol('r', 'var * {a: int, b: int}')
+    exprs = [r.a.sort().sum(), r.sort('a').b.max(),
+             r[r.a > 2].sort('b').a.count()]
+    for expr in exprs:
+        assert compute(expr, {r: cR}) == compute(expr, {r: records})
+
+
+def test_chunks_sort_with_parallel_map_and_missing_values():
+    from multiprocessing.pool import ThreadPool
+    records = [(float('nan') if i % 5 == 0 else float(i % 7), i)
+               for i in range(30)]
+    cR = chunks(list)([records[:10], records[10:20], records[20:]])
+    r = symbol('r', 'var * {a: ?float64, b: int}')
+    pool = ThreadPool(2)
+    try:
+        for ascending in [True, False]:
+            expr = r.sort('a', ascending=ascending)
+            result = into(list, compute(expr, {r: cR}, map=pool.map,
+                                        comfortable_memory=0))
+            present = [a for a, _ in result if a == a]
+            assert present == sorted(present, reverse=not ascending)
+            # missing values come last
+            assert all(a != a for a, _ in result[len(present):])
+            assert len(result) == 30
+    finally:
+        pool.close()
+
+
+def test_external_sort_merges_spilled_runs_a_few_at_a_time(monkeypatch):
+    import random
+    import tempfile
+    from blaze.compute import external_sort as module
+    opened = []
+
+    def temporary_file():
+        f = tempfile.TemporaryFile()
+        opened.append(f)
+        return f
+    monkeypatch.setattr(module.tempfile, 'TemporaryFile', temporary_file)
+
+    most = [0]
+    _spill = module._spill
+
+    def spill(rows, batchsize):
+        f = _spill(rows, batchsize)
+        most[0] = max(most[0], sum(not g.closed for g in opened))
+        return f
+    monkeypatch.setattr(module, '_spill', spill)
+
+    rng = random.Random(0)
+    records = [(rng.randint(0, 20), i) for i in range(200)]
+    parts = [records[i:i + 4] for i in range(0, 200, 4)]
+    r = symbol('r', 'var * {a: int, b: int}')
+    result = list(module.external_sort(r.sort('a'), r, parts,
+                                       comfortable_memory=0, batchsize=3,
+                                       fanin=3))
+    # the merge is stable
+    assert result == sorted(records, key=lambda row: row[0])
+    assert len(opened) > 50
+    assert most[0] < 20
+    assert all(f.closed for f in opened)
+
+
+def test_chunks_join():
+    import pandas as pd
+    from blaze import join
+    a = symbol('a', 'var * {id: int64, x: int64}')
+    b = symbol('b', 'var * {id: float64, y: int64}')
+    left = pd.DataFrame({'id': [1, 2, 3, 4, 5, 6], 'x': list(range(6))})
+    right = pd.DataFrame({'id': [2., 4., 4., 7.], 'y': [20, 40, 41, 70]})
+    cleft = chunks(pd.DataFrame)([left.iloc[:4], left.iloc[4:]])
+    cright = chunks(pd.DataFrame)([right.iloc[:1], right.iloc[1:]])
+    for how in ['inner', 'left', 'right', 'outer']:
+        expr = join(a, b, 'id', how=how)
+        expected = compute(expr, {a: left, b: right})
+        for data in [{a: cleft, b: cright}, {a: cleft, b: right}]:
+            result = compute(expr, data, npartitions=3)
+            result = into(pd.DataFrame, result)
+            assert (sorted(result.fillna(-1).values.tolist()) ==
+                    sorted(expected.fillna(-1).values.tolist()))
+
+
+def test_partitioned_join_without_hash_pandas_object(monkeypatch):
+    import pandas as pd
+    from blaze import join
+    from blaze.compute import hash_join
+    monkeypatch.setattr(hash_join, '_hash_rows', hash_join._hash_tuples)
+    a = symbol('a', 'var * {id: ?int64, x: int64}')
+    b = symbol('b', 'var * {id: ?float64, y: int64}')
+    left = pd.DataFrame({'id': [1, 2, None, 4], 'x': [0, 1, 2, 3]})
+    right = pd.DataFrame({'id': [2., 4., 4., 7.], 'y': [20, 40, 41, 70]})
+    expr = join(a, b, 'id')
+    result = into(pd.DataFrame,
+                  hash_join.partitioned_join(expr, [left.iloc[:2],
+                                                    left.iloc[2:]],
+                                             [right], npartitions=3))
+    expected = compute(expr, {a: left, b: right})
+    assert (sorted(result.values.tolist()) ==
+            sorted(expected.values.tolist()))
+
+
+def test_partitioned_join_closes_its_files(monkeypatch):
+    import tempfile
+    import pandas as pd
+    from blaze import join
+    from blaze.compute import hash_join
+    opened = []
+
+    def temporary_file():
+        f = tempfile.TemporaryFile()
+        opened.append(f)
+        return f
+    monkeypatch.setattr(hash_join.tempfile, 'TemporaryFile', temporary_file)
+    a = symbol('a', 'var * {id: int64, x: int64}')
+    b = symbol('b', 'var * {id: int64, y: int64}')
+    left = pd.DataFrame({'id': [1, 2, 3], 'x': [10, 20, 30]})
+    right = pd.DataFrame({'id': [1, 2, 3], 'y': [10, 20, 30]})
+    result = hash_join.partitioned_join(join(a, b), [left], [right],
+                                        npartitions=2)
+    assert len(into(pd.DataFrame, result)) == 3
+    assert len(opened) == 4
+    assert all(f.closed for f in opened)
+
+
+def test_chunks_combine_as_they_arrive():
+    from blaze import by
+    records = [(i % 5, i) for i in range(40)]
+    cR = chunks(list)([records[i:i + 3] for i in range(0, 40, 3)])
+    r = symbol('r', 'var * {a: int, b: int}')
+    for expr in [r.b.sum(), r.b.mean(), r.a.nunique(),
+                 by(r.a, total=r.b.sum(), avg=r.b.mean()),
+                 r.sort('b', ascending=False).head(3)]:
+        result = compute(expr, {r: cR})
+        expected = compute(expr, {r: records})
+        if iscollection(expr.dshape):
+            assert sorted(into(list, result)) == sorted(into(list, expected))
+        else:
+            assert result == expected
+
+
+def test_chunks_head_of_selection_stops_early():
+    records = [(i, i % 3) for i in range(30)]
+    pulled = []
+
+    def parts():
+        for i in range(0, 30, 5):
+            pulled.append(i)
+            yield records[i:i + 5]
+
+    r = symbol('r', 'var * {a: int, b: int}')
+    for expr in [r[r.b == 0].a.head(3), r[r.b == 0][1:3], r[r.b > 0].a[4]]:
+        del pulled[:]
+        result = compute(expr, {r: chunks(list)(parts)})
+        expected = compute(expr, {r: records})
+        if iscollection(expr.dshape):
+            assert into(list, result) == into(list, expected)
+        else:
+            assert result == expected
+        assert pulled == [0, 5]
+
+
+def test_chunks_approx_nunique():
+    import numpy as np
+    x = np.arange(20000) % 5000
+    cx = chunks(np.ndarray)([x[i:i + 3000] for i in range(0, 20000, 3000)])
+    s = symbol('s', 'var * int64')
+    result = compute(s.nunique(approx=True), {s: cx})
+    assert abs(result - 5000) < 5000 * 0.05
+    assert result == compute(s.nunique(approx=True), {s: x})
+
+
+def test_approx_nunique_without_pandas_hashing(monkeypatch):
+    import numpy as np
+    import pandas as pd
+    from blaze.compute import hyperloglog
+    monkeypatch.setattr(hyperloglog, 'hash_pandas', hyperloglog._hash_pandas)
+    monkeypatch.setattr(hyperloglog, 'hash_array', hyperloglog._hash_array)
+    x = np.arange(20000) % 5000
+    names = pd.Series(['name%d' % i for i in x] + [None])
+    records = pd.DataFrame({'x': x % 100, 'y': x % 50 // 10})
+    s = symbol('s', 'var * int64')
+    n = symbol('n', 'var * ?string')
+    r = symbol('r', 'var * {x: int64, y: int64}')
+    for expr, data, expected in [(s, x, 5000), (s, x.astype('f8'), 5000),
+                                 (n, names, 5000), (r, records, 100)]:
+        result = compute(expr.nunique(approx=True), {expr: data})
+        assert abs(result - expected) < expected * 0.05
+
+
+def test_chunks_quantile():
+    import numpy as np
+    x = np.random.RandomState(0).normal(size=20000)
+    cx = chunks(np.ndarray)([x[i:i + 3000] for i in range(0, 20000, 3000)])
+    s = symbol('s', 'var * float64')
+    for q in [0.01, 0.5, 0.9]:
+        result = compute(s.quantile(q), {s: cx})
+        assert abs(result - np.percentile(x, q * 100)) < 0.02
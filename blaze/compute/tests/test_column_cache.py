@@ -0,0 +1,164 @@
+from __future__ import absolute_import, division, print_function
+
+import os
+
+import pandas as pd
+import pandas.util.testing as tm
+import pytest
+from odo import odo
+from odo.chunks import Chunks
+
+from blaze import ColumnCache, Data, compute, discover, symbol
+from blaze.compute.column_cache import pre_compute
+
+
+text = """name,amount,when
+Alice,100,2000-01-01
+Bob,-200,2000-01-02
+,300,2000-01-03
+Alice,400,2000-01-04
+Edith,-500,2000-01-05
+"""
+
+
+@pytest.fixture
+def cache(tmpdir):
+    fn = tmpdir.join('accounts.csv')
+    fn.write(text)
+    return ColumnCache(str(fn), chunksize=2)
+
+
+def test_first_use_builds_the_cache(cache):
+    assert cache.metadata() is None
+    ds = discover(cache)
+    assert ds == discover(cache.csv)
+    cache.refresh().join()
+
+    meta = cache.metadata()
+    assert meta['nrows'] == 5
+    assert [c['name'] for c in meta['columns']] == ['name', 'amount', 'when']
+    assert all(os.path.exists(os.path.join(cache.dirname, c['file']))
+               for c in meta['columns'])
+    assert discover(cache) == ds
+
+
+def test_read(cache):
+    cache.build()
+    expected = odo(cache.csv, pd.DataFrame)
+    tm.assert_frame_equal(cache.read(), expected)
+    tm.assert_frame_equal(cache.read(['amount'], 1, 3),
+                          expected[['amount']][1:3].reset_index(drop=True))
+    assert pd.isnull(cache.read(['name']).name[2])
+
+
+def test_compute_reads_only_used_columns(cache):
+    cache.build()
+    s = symbol('s', discover(cache))
+    data = pre_compute(s.amount.sum(), cache)
+    assert list(data.columns) == ['amount']
+    assert compute(s.amount.sum(), cache) == 100
+
+    chunked = pre_compute(s.amount.sum(), cache, comfortable_memory=8,
+                          chunksize=2)
+    assert isinstance(chunked, Chunks)
+    assert [len(part) for part in chunked] == [2, 2, 1]
+    assert compute(s.amount.sum(), cache, comfortable_memory=8,
+                   chunksize=2) == 100
+
+    d = Data(cache)
+    assert compute(d[d.amount > 0].name.nunique()) == 1
+
+
+def test_compute_reads_only_the_columns_the_expression_uses(cache,
+                                                          monkeypatch):
+    from blaze.compute import column_cache
+    cache.build()
+    read, loaded = [], []
+    original_read, load_values = ColumnCache.read, column_cache._load_values
+
+    def recording_read(self, columns=None, *args, **kwargs):
+        read.append(list(columns))
+        return original_read(self, columns, *args, **kwargs)
+
+    def recording_load_values(dirname, column):
+        loaded.append(column['name'])
+        return load_values(dirname, column)
+    monkeypatch.setattr(ColumnCache, 'read', recording_read)
+    monkeypatch.setattr(column_cache, '_load_values', recording_load_values)
+
+    s = symbol('s', discover(cache))
+    assert compute(s.amount.sum(), cache) == 100
+    assert read == [['amount']]
+
+    del read[:]
+    expr = s[s.amount > 0].name.nunique()
+    assert compute(expr, cache, comfortable_memory=8, chunksize=2) == 1
+    assert read == [['name', 'amount']] * 3
+    # the values of the text column are loaded once for all chunks
+    assert loaded == ['name']
+
+    del read[:]
+    d = Data(cache)
+    assert compute(d.name.count()) == 4
+    assert read == [['name']]
+
+
+def test_changes_to_the_file_invalidate_the_cache(cache):
+    cache.build()
+    s = symbol('s', discover(cache))
+    with open(cache.path, 'a') as f:
+        f.write('Frank,600,2000-01-06\n')
+    assert cache.metadata() is None
+
+    # the file is parsed while the cache is rebuilt
+    assert compute(s.amount.sum(), cache) == 700
+    cache.refresh().join()
+    assert cache.metadata()['nrows'] == 6
+    assert compute(s.amount.sum(), cache) == 700
+
+
+def test_text_columns_that_start_out_missing(tmpdir):
+    fn = tmpdir.join('missing.csv')
+    fn.write('a,b\n1,\n2,\n3,x\n4,y\n')
+    cache = ColumnCache(str(fn), chunksize=2)
+    cache.build()
+    assert cache.read()['b'].tolist()[2:] == ['x', 'y']
+    assert pd.isnull(cache.read()['b'][:2]).all()
+
+
+def test_columns_are_promoted_when_later_chunks_need_it(tmpdir):
+    import numpy as np
+    from blaze.compute.column_cache import _ColumnWriter, _load_values
+    dirname = str(tmpdir)
+    # booleans with missing values parse as objects
+    chunks = [([1, 2], [True, False], [1, 2]),
+              ([3, np.nan], np.array([True, np.nan], dtype=object), [2.5, 3])]
+    writers = [_ColumnWriter(dirname, i) for i in range(3)]
+    for chunk in chunks:
+        for writer, values in zip(writers, chunk):
+            writer.append(values)
+    ints, bools, floats = [writer.close() for writer in writers]
+
+    def load(column):
+        return np.load(os.path.join(dirname, column['file']))
+
+    assert load(ints).dtype == np.float64
+    assert np.isnan(load(ints)[3])
+    assert load(ints)[:3].tolist() == [1, 2, 3]
+    assert load(floats).tolist() == [1, 2, 2.5, 3]
+    # missing booleans are encoded like text
+    values = _load_values(dirname, bools)
+    decoded = values[load(bools)]
+    assert decoded[:3].tolist() == [True, False, True]
+    assert pd.isnull(decoded[3])
+
+
+def test_rebuilding_replaces_the_cache(cache):
+    cache.build()
+    with open(cache.path, 'a') as f:
+        f.write('Frank,600,2000-01-06\n')
+    cache.build()
+    assert cache.metadata()['nrows'] == 6
+    parent = os.path.dirname(cache.dirname)
+    assert sorted(os.listdir(parent)) == ['accounts.csv',
+                                          'accounts.csv.columns']
@@ -7,8 +7,8 @@ from datashape import discover, dshape
 
 from blaze.compute.core import (compute_up, compute, bottom_up_until_type_break,
                                 top_then_bottom_then_top_again_etc,
-                                swap_resources_into_scope)
-from blaze.expr import by, symbol, Expr, Symbol
+                                swap_resources_into_scope, PlanCache)
+from blaze.expr import by, symbol, summary, Expr, Symbol, Add
 from blaze.dispatch import dispatch
 from blaze.compatibility import raises, reduce
 from blaze.utils import example
@@ -145,3 +145,154 @@ def test_simple_add(n):
     x = symbol('x', 'int')
     expr = reduce(operator.add, [x] * n)
     assert compute(expr, 1) == n
+
+
+def test_plan_cache_skips_failed_implementations():
+    class Foo(object):
+        def __init__(self, data):
+            self.data = data
+
+    calls = []
+
+    @dispatch(Expr, Foo)
+    def compute_down(expr, foo, **kwargs):
+        calls.append(expr)
+        raise NotImplementedError()
+
+    @dispatch(Add, Foo)
+    def compute_up(expr, foo, **kwargs):
+        return [x + expr.rhs for x in foo.data]
+
+    s = symbol('s', 'var * int')
+    expr = (s + 1).sum()
+    cache = PlanCache()
+
+    assert compute(expr, Foo([1, 2, 3]), plan_cache=cache) == 9
+    assert len(calls) == 1
+    assert cache.info() == (0, 1, cache.maxsize, 1)
+
+    assert compute(expr, Foo([4, 5, 6]), plan_cache=cache) == 18
+    assert len(calls) == 1
+    assert cache.info() == (1, 1, cache.maxsize, 1)
+
+    # the plan is keyed on the types of the data
+    assert compute(expr, [1, 2, 3], plan_cache=cache) == 9
+    assert cache.info() == (1, 2, cache.maxsize, 2)
+
+
+def test_plan_cache_eviction():
+    t = symbol('t', 'var * {name: string, amount: int}')
+    data = [('Alice', 100), ('Bob', -50)]
+    cache = PlanCache(maxsize=1)
+
+    assert compute(t.amount.sum(), data, plan_cache=cache) == 50
+    assert compute(t.amount.max(), data, plan_cache=cache) == 100
+    assert len(cache) == 1
+    assert compute(t.amount.sum(), data, plan_cache=cache) == 50
+    assert cache.info() == (0, 3, 1, 1)
+
+    cache.clear()
+    assert cache.info() == (0, 0, 1, 0)
+
+
+def test_plan_cache_falls_back_when_plan_does_not_apply():
+    t = symbol('t', 'var * {name: string, amount: int}')
+    df = pd.DataFrame([['Alice', 100], ['Bob', -50]],
+                      columns=['name', 'amount'])
+    cache = PlanCache()
+    expr = t[t.amount > 0].name
+
+    assert list(compute(expr, df, plan_cache=cache)) == ['Alice']
+    key, = cache._plans
+    cache._plans[key] = ()  # a stale plan is replaced rather than trusted
+    assert list(compute(expr, df, plan_cache=cache)) == ['Alice']
+    assert cache._plans[key]
+
+
+def test_plan_cache_checks_expressions_whose_hashes_collide():
+    t = symbol('t', 'var * {name: string, amount: int}')
+    data = [('Alice', 100), ('Bob', -50)]
+    cache = PlanCache()
+    total, most = t.amount.sum(), t.amount.max()
+    most._hash = hash(total)
+
+    assert compute(total, data, plan_cache=cache, simplify=False) == 50
+    assert compute(most, data, plan_cache=cache, simplify=False) == 100
+
+
+def test_plan_cache_is_keyed_on_keyword_arguments():
+    t = symbol('t', 'var * {name: string, amount: int}')
+    data = [('Alice', 100), ('Bob', -50)]
+    cache = PlanCache()
+
+    assert compute(t.amount.sum(), data, plan_cache=cache, optimize=None) == 50
+    assert compute(t.amount.sum(), data, plan_cache=cache) == 50
+    assert cache.info() == (0, 2, cache.maxsize, 2)
+
+    # unhashable arguments are not cached
+    assert compute(t.amount.sum(), data, plan_cache=cache, foo=[1]) == 50
+    assert len(cache) == 2
+
+
+def test_repeated_subexpressions_are_computed_once():
+    t = symbol('t', 'var * {name: string, amount: int}')
+    df = pd.DataFrame([['Alice', 100], ['Bob', -50]],
+                      columns=['name', 'amount'])
+    calls = []
+
+    def inc(x):
+        calls.append(x)
+        return x + 1
+
+    mapped = t.amount.map(inc, 'int64')
+    expr = mapped * mapped + mapped
+    assert list(compute(expr, df)) == [101 * 101 + 101, -49 * -49 - 49]
+    assert len(calls) == 2
+
+
+def test_summary_shares_subexpressions():
+    t = symbol('t', 'var * {name: string, amount: int}')
+    calls = []
+
+    def inc(x):
+        calls.append(x)
+        return x + 1
+
+    # ``mapped`` is shared by two values but is not the child of the summary
+    mapped = t.amount.map(inc, 'int64')
+    expr = summary(total=mapped.sum(), biggest=mapped.max(),
+                   n=t.name.count())
+    assert expr._child.isidentical(t)
+
+    df = pd.DataFrame([['Alice', 100], ['Bob', -50]],
+                      columns=['name', 'amount'])
+    assert [compute(v, df) for v in expr.values] == [101, 2, 52]
+    assert len(calls) == 4
+
+    del calls[:]
+    assert compute(expr, df) == (101, 2, 52)
+    assert len(calls) == 2
+
+
+def test_compute_simplifies_expression():
+    t = symbol('t', 'var * {x: int64, y: int64}')
+    df = pd.DataFrame({'x': [1, 2, 3], 'y': [4, 5, 6]})
+
+    expr = ((t.x * 1 + 0) + (t.y + 1 - 1))[(t.y > 4) & True].sum()
+    assert compute(expr, df) == compute(expr, df, simplify=False) == 19
+
+    seen = []
+
+    def spy(expr):
+        seen.append(expr)
+        return expr
+
+    compute(t.x * 1 + 0, df, optimize=spy)
+    assert seen[0].isidentical(t.x)
+
+
+def test_simplify_keeps_scope_keys():
+    t = symbol('t', 'var * {x: int64, y: int64}')
+    scaled = t.x * 1
+    result = compute(scaled + 0, {scaled: [10, 20]})
+    assert list(result) == [10, 20]
@@ -1,4 +1,5 @@
-from blaze.compute.csv import pre_compute, CSV
+from blaze.compute.csv import (pre_compute, CSV, ByteRanges, SelectedChunks,
+                               _read_csv)
 from blaze import compute, discover, dshape, into, resource, join, concat
 from blaze.utils import example, filetext, filetexts
 from blaze.expr import symbol
@@ -10,6 +11,7 @@ import pandas as pd
 from toolz import first
 from collections import Iterator
 from odo import odo
+from odo.utils import tmpfile
 from odo.chunks import chunks
 
 
@@ -107,6 +109,19 @@ def test_csv_join():
         )
 
 
+def test_pre_compute_with_join_reads_used_columns():
+    d = {'a.csv': 'a,b,c\n0,1,2\n3,4,5',
+         'b.csv': 'c,d,e\n2,3,4\n5,6,7'}
+
+    with filetexts(d):
+        resource_a = resource('a.csv')
+        a = symbol('a', discover(resource_a))
+        b = symbol('b', discover(resource('b.csv')))
+
+        result = pre_compute(join(a, b, 'c')[['b', 'e']], resource_a)
+        assert list(result.columns) == ['b', 'c']
+
+
 def test_concat():
     d = {'a.csv': 'a,b\n1,2\n3,4',
          'b.csv': 'a,b\n5,6\n7,8'}
@@ -127,3 +142,190 @@ def test_concat():
             pd.DataFrame(np.arange(1, 9, dtype='int64').reshape(4, 2),
                          columns=list('ab')),
         )
+
+
+def test_head_of_selection_on_csv_reads_in_chunks():
+    csv = CSV(example('iris.csv'))
+    s = symbol('s', discover(csv))
+    expr = s[s.species == 'Iris-versicolor'].sepal_length.head(3)
+    assert isinstance(pre_compute(expr, csv, chunksize=20),
+                      chunks(pd.DataFrame))
+    result = compute(expr, {s: csv}, chunksize=20)
+    expected = compute(expr, {s: into(DataFrame, csv)})
+    assert list(result) == list(expected)
+
+
+def test_large_csv_is_split_into_byte_ranges():
+    csv = CSV(example('iris.csv'))
+    s = symbol('s', discover(csv))
+    data = pre_compute(s.species, csv, comfortable_memory=10, blocksize=500)
+    assert isinstance(data, ByteRanges)
+    assert len(data.ranges) > 1
+    assert data.ranges[0][1] == data.ranges[1][0]
+
+    df = odo(csv, pd.DataFrame)
+    tm.assert_frame_equal(pd.concat(list(data), ignore_index=True),
+                          df[['species']])
+
+
+def test_compute_on_byte_ranges():
+    csv = CSV(example('iris.csv'))
+    s = symbol('s', discover(csv))
+    df = odo(csv, pd.DataFrame)
+    kwargs = dict(comfortable_memory=10, blocksize=500)
+
+    assert compute(s.sepal_length.max(), csv, **kwargs) == 7.9
+    assert compute(s.species.nunique(), csv, **kwargs) == 3
+    # rows keep the order of the file
+    result = compute(s[s.sepal_length > 5].petal_width, csv, **kwargs)
+    assert (into(list, result) ==
+            df[df.sepal_length > 5].petal_width.tolist())
+    result = compute(s.sort('sepal_length').sepal_length, csv, **kwargs)
+    assert into(list, result) == sorted(df.sepal_length)
+
+
+def test_byte_ranges_parse_like_the_rest_of_the_file():
+    lines = ["name;amount"] + ["'%s;%d';%s" % (n, i, '-' if i % 4 else i)
+                               for i, n in enumerate(['Alice', 'Bob'] * 20)]
+    with filetext('\n'.join(lines) + '\n', extension='.csv') as fn:
+        csv = CSV(fn, delimiter=';', quotechar="'", na_values=['-'])
+        s = symbol('s', discover(csv))
+        kwargs = dict(comfortable_memory=10, blocksize=50)
+        data = _read_csv(s, csv, **kwargs)
+        assert isinstance(data, ByteRanges)
+        assert len(data.ranges) > 1
+        expected = odo(csv, pd.DataFrame)
+        assert expected.name[1] == 'Bob;1'
+        tm.assert_frame_equal(pd.concat(list(data), ignore_index=True),
+                              expected)
+        assert compute(s.amount.count(), csv, **kwargs) == 10
+        assert (compute(s.name.nunique(), csv, **kwargs) ==
+                expected.name.nunique())
+
+
+def test_selections_filter_byte_ranges_as_they_are_parsed():
+    csv = CSV(example('iris.csv'))
+    s = symbol('s', discover(csv))
+    df = odo(csv, pd.DataFrame)
+    expr = s[s.sepal_length > 7].petal_width.sum()
+
+    data = pre_compute(expr, csv, comfortable_memory=10, blocksize=500)
+    assert isinstance(data, ByteRanges)
+    parts = list(data)
+    assert len(parts) == 1
+    # sepal_length is read only by the predicate
+    tm.assert_frame_equal(parts[0],
+                          df[df.sepal_length > 7][['petal_width']]
+                          .reset_index(drop=True))
+
+    kwargs = dict(comfortable_memory=10, blocksize=500)
+    assert (compute(expr, csv, **kwargs) ==
+            df[df.sepal_length > 7].petal_width.sum())
+    result = compute(s[s.species.like('*setosa')].sepal_width.max(), csv,
+                     **kwargs)
+    assert result == df[df.species.str.endswith('setosa')].sepal_width.max()
+    result = compute(s[s.sepal_length > 7], csv, **kwargs)
+    tm.assert_frame_equal(into(pd.DataFrame, result).reset_index(drop=True),
+                          df[df.sepal_length > 7].reset_index(drop=True))
+    assert len(compute(s[s.sepal_length > 100], csv, **kwargs)) == 0
+
+
+def test_selections_filter_compressed_chunks():
+    df = pd.DataFrame({'a': range(100), 'b': np.arange(100) * 1.0})
+    with tmpfile('.csv.gz') as fn:
+        df.to_csv(fn, index=False, compression='gzip')
+        csv = CSV(fn)
+        s = symbol('s', discover(csv))
+        expr = s[s.a % 10 == 0].b.sum()
+        data = pre_compute(expr, csv, comfortable_memory=10, chunksize=7)
+        assert isinstance(data, SelectedChunks)
+        assert all(len(part) >= 7 for part in list(data)[:-1])
+        assert compute(expr, csv, comfortable_memory=10, chunksize=7) == 450
+
+
+def test_compute_keeps_only_selected_rows_as_chunks_are_parsed(monkeypatch):
+    kept = []
+    select = SelectedChunks.select
+
+    def recording_select(self, df):
+        result = select(self, df)
+        kept.append((self.selection is not None, len(result)))
+        return result
+    monkeypatch.setattr(SelectedChunks, 'select', recording_select)
+
+    df = pd.DataFrame({'a': range(100), 'b': np.arange(100) * 1.0})
+    with tmpfile('.csv') as fn:
+        with tmpfile('.csv.gz') as gz:
+            df.to_csv(fn, index=False)
+            df.to_csv(gz, index=False, compression='gzip')
+            # split into byte ranges, or read in chunks of rows
+            for path, kwargs in [(fn, dict(blocksize=200)),
+                                 (gz, dict(chunksize=7))]:
+                csv = CSV(path)
+                s = symbol('s', discover(csv))
+                kwargs['comfortable_memory'] = 10
+                for expr, n in [(s[s.a % 10 == 0].b.sum(), 10),
+                                (s[s.a >= 95].b, 5),
+                                (s[s.a < 30], 30)]:
+                    del kept[:]
+                    result = compute(expr, csv, **kwargs)
+                    expected = compute(expr, df)
+                    if expr.ndim:
+                        result = into(list, result)
+                        expected = into(list, expected)
+                    assert result == expected
+                    assert len(kept) > 1
+                    assert all(selected for selected, _ in kept)
+                    assert sum(rows for _, rows in kept) == n
+
+                result = compute(s[s.a > 50].b.head(3), csv, **kwargs)
+                assert into(list, result) == [51.0, 52.0, 53.0]
+
+
+def test_selections_with_reductions_are_not_pushed_into_chunks():
+    csv = CSV(example('iris.csv'))
+    s = symbol('s', discover(csv))
+    expr = s[s.sepal_length > s.sepal_length.mean()].petal_width
+    data = pre_compute(expr, csv, comfortable_memory=10, blocksize=500)
+    assert data.selection is None
+
+
+def test_pre_compute_on_join_of_two_files_reads_each_side_columns():
+    d = {'a.csv': 'id,x,y\n1,10,100\n2,20,200\n',
+         'b.csv': 'id,z,w\n1,1.5,a\n2,2.5,b\n'}
+    with filetexts(d) as fns:
+        a, b = CSV('a.csv'), CSV('b.csv')
+        sa = symbol('sa', discover(a))
+        sb = symbol('sb', discover(b))
+        expr = join(sa, sb, 'id')[['x', 'z']]
+        scope = {sa: a, sb: b}
+        assert list(pre_compute(expr, a, scope=scope).columns) == ['id', 'x']
+        assert list(pre_compute(expr, b, scope=scope).columns) == ['id', 'z']
+        # without a scope the leaf of each file is unknown
+        assert list(pre_compute(expr, b).columns) == ['id', 'z', 'w']
+
+
+def test_compute_on_join_of_two_files_parses_only_used_columns(monkeypatch):
+    parsed = []
+    read_csv = pd.read_csv
+
+    def recording_read_csv(*args, **kwargs):
+        result = read_csv(*args, **kwargs)
+        parsed.append(list(result.columns))
+        return result
+
+    d = {'a.csv': 'id,x,y\n1,10,100\n2,20,200\n',
+         'b.csv': 'id,z,w\n1,1.5,a\n2,2.5,b\n'}
+    with filetexts(d):
+        a, b = CSV('a.csv'), CSV('b.csv')
+        sa = symbol('sa', discover(a))
+        sb = symbol('sb', discover(b))
+        monkeypatch.setattr(pd, 'read_csv', recording_read_csv)
+        expr = join(sa, sb, 'id')[['id', 'x']]
+        result = compute(expr, {sa: a, sb: b})
+        assert into(list, result) == [(1, 10), (2, 20)]
+        assert sorted(parsed) == [['id'], ['id', 'x']]
+
+        del parsed[:]
+        assert into(list, compute(sa, a)) == [(1, 10, 100), (2, 20, 200)]
+        assert parsed == [['id', 'x', 'y']]
@@ -208,3 +208,22 @@ def test_arithmetic_and_then_slicing(data):
 
     assert eq(compute((2*s + 1)[0], data, pre_compute=False),
               2*x[0] + 1)
+
+
+def test_top_k_on_chunks():
+    y = np.empty(shape=(100,), dtype=[('a', 'i4'), ('b', 'f8')])
+    y['a'] = np.arange(100) % 13
+    y['b'] = np.arange(100)
+    with tmpfile('.h5') as filename:
+        f = h5py.File(filename)
+        d = f.create_dataset('/y', data=y, chunks=(16,))
+        s = symbol('s', discover(d))
+        expr = s.sort('a', ascending=False).head(10)
+        result = compute(expr, d, chunksize=(16,), pre_compute=False)
+        expected = compute(expr, y, optimize=False)
+        assert eq(result, expected)
+        # a lazy map, as on Python 3
+        result = compute(expr, d, chunksize=(16,), pre_compute=False,
+                         map=lambda f, seq: (f(x) for x in seq))
+        assert eq(result, expected)
+        f.close()
@@ -6,6 +6,7 @@ import itertools
 
 import numpy as np
 import pandas as pd
+import pandas.util.testing as tm
 
 from datetime import datetime, date
 
@@ -83,6 +84,11 @@ def test_Reductions():
     assert compute(t['amount'].min(), x) == x['amount'].min()
     assert compute(t['amount'].max(), x) == x['amount'].max()
     assert compute(t['amount'].nunique(), x) == len(np.unique(x['amount']))
+    assert (compute(t['amount'].nunique(approx=True), x) ==
+            len(np.unique(x['amount'])))
+    assert compute(t['amount'].median(), x) == np.median(x['amount'])
+    assert (compute(t['amount'].quantile(0.9), x) ==
+            np.percentile(x['amount'], 90))
     assert compute(t['amount'].var(), x) == x['amount'].var()
     assert compute(t['amount'].std(), x) == x['amount'].std()
     assert compute(t['amount'].var(unbiased=True), x) == x['amount'].var(ddof=1)
@@ -93,6 +99,19 @@ def test_Reductions():
     assert compute(t['amount'][-1], x) == x['amount'][-1]
 
 
+def test_percentile_without_numpy_19():
+    from blaze.compute.numpy import _percentile
+    x = np.arange(24, dtype='f8').reshape(2, 3, 4)
+    x[0, 1, 2] = np.nan
+    for axis in [(0,), (1,), (2,), (0, 2), (0, 1, 2)]:
+        for keepdims in [False, True]:
+            result = _percentile(x, 90, axis, keepdims=keepdims, skipna=True)
+            expected = np.nanpercentile(x, 90, axis=axis, keepdims=keepdims)
+            assert np.shape(result) == np.shape(expected)
+            assert np.allclose(result, expected)
+    assert np.isnan(_percentile(x, 90, (0, 1, 2)))
+
+
 def test_count_string():
     s = symbol('name', 'var * ?string')
     x = np.array(['Alice', np.nan, 'Bob', 'Denis', 'Edith'], dtype='object')
@@ -194,6 +213,22 @@ def test_sort():
               np.sort(x['amount']))
 
 
+@pytest.mark.parametrize('ascending', [True, False])
+def test_sort_head_selects_top_k(ascending):
+    y = np.array([(i % 7, str(i % 5), i % 3) for i in range(50)],
+                 dtype=[('a', 'i8'), ('b', 'U2'), ('c', 'f8')])
+    y['c'][3] = np.nan
+    s = symbol('s', discover(y))
+    for expr in [s.sort('a', ascending=ascending).head(5),
+                 s.sort('b', ascending=ascending).head(5),
+                 s.sort(['a', 'b'], ascending=ascending).head(12),
+                 s.sort('c', ascending=ascending).head(5),
+                 s.a.sort(ascending=ascending).head(4),
+                 s.sort('a', ascending=ascending).head(100)]:
+        tm.assert_frame_equal(pd.DataFrame(compute(expr, y)),
+                              pd.DataFrame(compute(expr, y, optimize=False)))
+
+
 def test_head():
     assert eq(compute(t.head(2), x),
               x[:2])
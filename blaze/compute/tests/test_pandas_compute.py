@@ -163,6 +163,13 @@ def test_reductions():
     assert compute(max(t['amount']), df) == 200
     assert compute(nunique(t['amount']), df) == 3
     assert compute(nunique(t['name']), df) == 2
+    assert compute(t['amount'].nunique(approx=True), df) == 3
+    assert compute(t['name'].nunique(approx=True), df) == 2
+    assert compute(t['amount'].median(), df) == 100
+    assert compute(t['amount'].quantile(0.75), df) == 150
+    result = compute(t['amount'].quantile(0.75, keepdims=True), df)
+    assert result.name == 'amount_quantile'
+    assert result.tolist() == [150]
     assert compute(any(t['amount'] > 150), df) is True
     assert compute(any(t['amount'] > 250), df) is False
     assert compute(var(t['amount']), df) == df.amount.var(ddof=0)
@@ -328,6 +335,49 @@ def test_join_promotion():
     tm.assert_frame_equal(result, expected)
 
 
+@pytest.mark.parametrize('how', ['inner', 'left', 'right', 'outer'])
+def test_selection_on_join(how):
+    a_data = pd.DataFrame([[1, 10], [2, 20], [3, 30]], columns=['id', 'x'])
+    b_data = pd.DataFrame([[1, -1], [3, -3], [4, -4]], columns=['id', 'y'])
+    a = symbol('a', discover(a_data))
+    b = symbol('b', discover(b_data))
+
+    j = join(a, b, 'id', how=how)
+    expr = j[(j.x > 10) & (j.y < 0) & (j.id > 1)]
+
+    merged = pd.merge(a_data, b_data, on='id', how=how)
+    expected = merged[(merged.x > 10) & (merged.y < 0) & (merged.id > 1)]
+    result = compute(expr, {a: a_data, b: b_data})
+    assert (sorted(map(tuple, result.values.tolist())) ==
+            sorted(map(tuple, expected.values.tolist())))
+
+
+@pytest.mark.parametrize('ascending', [True, False])
+def test_sort_head_selects_top_k(ascending):
+    df = DataFrame({'a': np.arange(50) % 7, 'b': list(map(str, range(50))),
+                    'c': np.arange(50.0) % 3})
+    df.loc[3, 'c'] = np.nan
+    s = symbol('s', discover(df))
+    for key in ['a', 'b', ['a', 'b'], 'c']:
+        expr = s.sort(key, ascending=ascending).head(5)
+        result = compute(expr, df)
+        expected = compute(expr, df, optimize=False)
+        assert (result[key].values.tolist() ==
+                expected[key].values.tolist())
+
+    expr = s.a.sort(ascending=ascending).head(5)
+    assert list(compute(expr, df)) == list(compute(expr, df, optimize=False))
+
+
+def test_top_k_without_frame_nlargest(monkeypatch):
+    import blaze.compute.pandas
+    monkeypatch.setattr(blaze.compute.pandas, 'frame_nlargest', False)
+    df = DataFrame({'a': np.arange(20) % 7, 'b': np.arange(20)})
+    s = symbol('s', discover(df))
+    expr = s.sort('a', ascending=False).head(3)
+    assert compute(expr, df).a.tolist() == [6, 6, 5]
+
+
 def test_sort():
     tm.assert_frame_equal(compute(t.sort('amount'), df),
                           pdsort(df, 'amount'))
@@ -897,3 +947,14 @@ def test_selection_inner_inputs():
 def test_by_with_reduction_on_df():
     expr = by(tbig.name, id_sum=tbig.id.sum(), count=tbig.count())
     compute(expr, dfbig)
+
+
+def test_selections_on_a_column_filter_only_that_column():
+    from blaze.expr import Selection
+    from blaze.compute.pandas import optimize
+    expr = t.amount[t.amount > 100].sum()
+    optimized = optimize(expr, df)
+    selection, = [e for e in optimized._subterms()
+                  if isinstance(e, Selection)]
+    assert selection._child.isidentical(t.amount)
+    assert compute(expr, df) == 200
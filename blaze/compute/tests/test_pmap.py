@@ -17,3 +17,116 @@ def test_map_called_on_resource_star():
     b = compute(s.count(), r, map=mymap)
     assert a == b
     assert flag[0]
+
+
+def test_process_pool_chunks():
+    import numpy as np
+    from odo.chunks import chunks
+    from blaze import ProcessPool
+    x = np.arange(300000)
+    data = chunks(np.ndarray)([x[:100000], x[100000:200000], x[200000:]])
+    s = symbol('s', 'var * int64')
+    pool = ProcessPool(2)
+    assert compute(s.sum(), data, map=pool.map) == x.sum()
+    assert (compute(s + 1, data, map=pool.map) == x + 1).all()
+
+
+def test_share_large_arrays():
+    import numpy as np
+    from blaze.compute.pmap import Shared, _share, _unshare
+    x = np.arange(100000)
+    shared = _share(x, None)
+    assert isinstance(shared, Shared)
+    assert (_unshare(shared) == x).all()
+
+    small = np.arange(3)
+    assert _share(small, None) is small
+    assert _share([1, 2], None) == [1, 2]
+
+
+def test_share_large_columns_of_frames():
+    import numpy as np
+    import pandas as pd
+    import pandas.util.testing as tm
+    from blaze.compute.pmap import Shared, SharedFrame, _share, _unshare
+    df = pd.DataFrame({'a': np.arange(100000),
+                       'b': np.arange(100000) / 2.0,
+                       'c': ['x'] * 100000},
+                      columns=['a', 'b', 'c'],
+                      index=np.arange(100000) * 2)
+    df.index.name = 'i'
+    shared = _share(df, None)
+    assert isinstance(shared, SharedFrame)
+    assert [isinstance(c, Shared) for c in shared.columns] == [True, True,
+                                                                False]
+    tm.assert_frame_equal(_unshare(shared), df)
+
+    s = df.b.iloc[::-1]
+    tm.assert_series_equal(_unshare(_share(s, None)), s)
+
+
+def test_process_pool_yields_results_as_they_arrive(tmpdir):
+    import numpy as np
+    from blaze import ProcessPool
+
+    given = [0]
+
+    def seq():
+        for i in range(100):
+            given[0] += 1
+            yield np.arange(100000) + i
+
+    pool = ProcessPool(2, dirname=str(tmpdir))
+    results = pool.map(lambda x: x + 1, seq())
+    assert next(results)[0] == 1
+    assert given[0] < 100
+    results.close()
+
+
+def test_process_pool_shares_a_bounded_number_of_chunks(tmpdir):
+    import os
+    import numpy as np
+    from blaze import ProcessPool
+
+    def files():
+        return sum(len(names) for _, _, names in os.walk(str(tmpdir)))
+
+    most = [0]
+
+    def seq():
+        for i in range(20):
+            most[0] = max(most[0], files())
+            yield np.arange(100000) + i
+
+    pool = ProcessPool(2, dirname=str(tmpdir))
+    result = pool.map(lambda x: x + 1, seq())
+    assert [r[0] for r in result] == list(range(1, 21))
+    # inputs shared ahead plus results not yet read
+    assert most[0] <= 4 * pool.processes
+    assert not os.listdir(str(tmpdir))
+
+
+def test_process_pool_removes_its_files_on_error(tmpdir):
+    import os
+    import numpy as np
+    import pytest
+    from blaze import ProcessPool
+
+    def fail(x):
+        if x[0] == 3:
+            raise ValueError(x[0])
+        return x
+
+    pool = ProcessPool(2, dirname=str(tmpdir))
+    with pytest.raises(ValueError):
+        list(pool.map(fail, [np.arange(100000) + i for i in range(10)]))
+    assert not os.listdir(str(tmpdir))
+
+
+def test_process_pool_needs_fork(monkeypatch):
+    import os
+    import pytest
+    from blaze import ProcessPool
+    monkeypatch.delattr(os, 'fork')
+    with pytest.raises(NotImplementedError):
+        ProcessPool(2)
@@ -99,6 +99,10 @@ def test_reductions():
     assert compute(max(t['amount']), data) == 200
     assert compute(nunique(t['amount']), data) == 3
     assert compute(nunique(t['name']), data) == 2
+    assert compute(t['amount'].nunique(approx=True), data) == 3
+    assert compute(t['name'].nunique(approx=True), data) == 2
+    assert compute(t['amount'].median(), data) == 100
+    assert compute(t['amount'].quantile(0.75), data) == 150
     assert compute(count(t['amount']), data) == 3
     assert compute(any(t['amount'] > 150), data) is True
     assert compute(any(t['amount'] > 250), data) is False
@@ -220,6 +224,18 @@ def test_join():
     assert result == expected
 
 
+def test_selection_on_join():
+    left = [['Alice', 100], ['Bob', 200], ['Charlie', 300]]
+    right = [['Alice', 1], ['Bob', 2], ['Dan', 3]]
+
+    L = symbol('L', 'var * {name: string, amount: int}')
+    R = symbol('R', 'var * {name: string, id: int}')
+    joined = join(L, R, 'name')
+    expr = joined[(joined.amount > 100) & (joined.id < 3)].sort('id')
+
+    assert list(compute(expr, {L: left, R: right})) == [('Bob', 200, 2)]
+
+
 def test_outer_join():
     left = [(1, 'Alice', 100),
             (2, 'Bob', 200),
@@ -318,6 +334,19 @@ def test_fancy_sort():
             list(compute(t.sort('amount'), data))[::-1]
 
 
+def test_sort_head_selects_top_k():
+    data = [(i % 7, str(i), i % 3) for i in range(50)]
+    s = symbol('s', 'var * {a: int, b: string, c: int}')
+    for expr in [s.sort('a').head(5),
+                 s.sort('a', ascending=False).head(5),
+                 s.sort(['c', 'a'], ascending=False).head(7),
+                 s.sort(-s.a).head(3),
+                 s.a.sort().head(4),
+                 s.sort('a').head(100)]:
+        assert (list(compute(expr, data)) ==
+                list(compute(expr, data, optimize=False)))
+
+
 def test_sort_on_column():
     assert list(compute(t.name.distinct().sort('name'), data)) == \
             ['Alice', 'Bob']
@@ -377,6 +377,31 @@ def test_nunique():
     assert 'amount' in result.lower()
 
 
+def test_approx_nunique():
+    from sqlalchemy.dialects import mssql
+    expr = t['amount'].nunique(approx=True)
+    result = str(computefull(expr, s)).lower()
+    assert 'count(distinct' in result and 'amount' in result
+
+    result = str(computefull(expr, s).compile(dialect=mssql.dialect()))
+    assert 'APPROX_COUNT_DISTINCT(' in result
+
+    # distinct rows are counted exactly
+    result = str(computefull(t.nunique(approx=True), s)
+                 .compile(dialect=mssql.dialect()))
+    assert 'DISTINCT' in result and 'APPROX' not in result
+
+
+def test_quantile():
+    from sqlalchemy.dialects import postgresql, sqlite
+    expr = t['amount'].quantile(0.9)
+    result = str(computefull(expr, s).compile(dialect=postgresql.dialect()))
+    assert 'percentile_cont(0.9) WITHIN GROUP (ORDER BY' in result
+
+    with pytest.raises(sa.exc.CompileError):
+        computefull(t['amount'].median(), s).compile(dialect=sqlite.dialect())
+
+
 def test_nunique_table():
     result = normalize(str(computefull(t.nunique(), s)))
     expected = normalize("""SELECT count(alias.id) AS tbl_row_count
@@ -0,0 +1,76 @@
+from __future__ import absolute_import, division, print_function
+
+import random
+import threading
+
+import pytest
+sa = pytest.importorskip('sqlalchemy')
+
+import pandas as pd
+
+from odo import odo, resource
+
+from blaze import by, compute, symbol
+from blaze.utils import tmpfile
+
+
+t = symbol('t', 'var * {name: string, amount: int64, id: int64}')
+data = [('Alice', 100, 1), ('Bob', -200, 2), ('Charlie', 300, 3),
+        ('Dennis', 400, 4), ('Edith', -500, 5), ('Alice', 600, 6)]
+df = pd.DataFrame(data, columns=['name', 'amount', 'id'])
+
+exprs = [
+    (t.amount.sum() + t.amount.max()) / t.amount.count(),
+    t[t.amount > 0].amount.sum() - t[t.amount < 0].amount.min(),
+    t.amount.mean() + t.id.nunique(),
+    t[t.amount > 0].id.sum() + t.name.nunique(),
+    t.amount.max() * t.id.sum() - (t.amount + 1).min(),
+]
+by_name = by(t.name, total=t.amount.sum(), n=t.id.count())
+
+
+def run_concurrently(func, nthreads=8, iterations=20):
+    errors = []
+
+    def work(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(iterations):
+                func(rng)
+        except Exception as e:  # pragma: no cover
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(i,))
+               for i in range(nthreads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+
+
+def check(source, post=lambda x: x):
+    expected = [post(compute(expr, source)) for expr in exprs]
+    grouped = sorted(odo(compute(by_name, source), list))
+
+    def func(rng):
+        i = rng.randrange(len(exprs))
+        assert post(compute(exprs[i], source)) == expected[i]
+        if rng.random() < 0.2:
+            assert sorted(odo(compute(by_name, source), list)) == grouped
+
+    run_concurrently(func)
+
+
+def test_concurrent_compute_python():
+    check(data)
+
+
+def test_concurrent_compute_pandas():
+    check(df)
+
+
+def test_concurrent_compute_sql():
+    with tmpfile('.db') as fn:
+        sql = odo(data, 'sqlite:///%s::accounts' % fn, dshape=t.dshape)
+        check(sql, post=lambda x: odo(x, float))
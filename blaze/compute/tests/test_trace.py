@@ -0,0 +1,104 @@
+from __future__ import absolute_import, division, print_function
+
+import json
+
+import pandas as pd
+import pytest
+
+from blaze import symbol
+from blaze.compute.core import compute, PlanCache
+from blaze.compute.trace import Trace, nbytes, nrows
+
+
+t = symbol('t', 'var * {name: string, amount: int64}')
+df = pd.DataFrame([['Alice', 100], ['Bob', -200], ['Charlie', 300]],
+                  columns=['name', 'amount'])
+
+
+def test_trace_returns_result_and_trace():
+    result, trace = compute(t[t.amount > 0].amount.sum(), df, trace=True)
+    assert result == 400
+    assert isinstance(trace, Trace)
+
+    root = trace.root
+    assert root.kind == 'compute'
+    assert root.input_types == ['DataFrame']
+    assert root.status == 'ok'
+    assert root.duration >= sum(child.duration for child in root.children)
+
+
+def test_trace_records_each_node():
+    expr = t[t.amount > 0].name
+    _, trace = compute(expr, df, trace=True)
+
+    ups = [event for event in trace if event.kind == 'compute_up']
+    assert ups
+    for event in ups:
+        assert event.implementation.startswith('blaze.compute.pandas.')
+        assert event.duration >= 0
+
+    last = ups[-1]
+    assert last.output_type == 'Series'
+    assert last.rows == 2
+    assert last.nbytes == nbytes(compute(expr, df))
+
+
+def test_trace_records_failed_compute_down():
+    _, trace = compute(t.amount.sum(), df, trace=True)
+    down = [event for event in trace if event.kind == 'compute_down'][0]
+    assert down.status == 'not implemented'
+    assert down.implementation is None
+
+
+def test_trace_into_existing_trace():
+    trace = Trace()
+    assert compute(t.amount.sum(), df, trace=trace) == 200
+    assert trace.root.kind == 'compute'
+
+
+def test_trace_records_errors():
+    trace = Trace()
+    with pytest.raises(ZeroDivisionError):
+        compute(t.amount.map(lambda x: 1 // 0, 'int64').sum(),
+                [('Alice', 1)], trace=trace)
+    assert trace.root.status == 'error'
+    assert any(event.status == 'error' for event in trace.root.children)
+
+
+def test_trace_to_json():
+    _, trace = compute(t.amount.sum(), df, trace=True)
+    d = json.loads(trace.to_json())
+    assert d['kind'] == 'compute'
+    assert d['output_type'] == trace.root.output_type
+    assert [c['kind'] for c in d['children']] == [
+        e.kind for e in trace.root.children
+    ]
+
+
+def test_trace_render():
+    _, trace = compute(t.amount.sum(), df, trace=True)
+    lines = trace.render().splitlines()
+    assert len(lines) == len(list(trace))
+    assert lines[0].startswith('compute sum(t.amount)')
+    assert lines[0].endswith(' ms')
+    assert all(line.startswith('  ') for line in lines[1:])
+
+
+def test_trace_with_plan_cache():
+    cache = PlanCache()
+    expr = t.amount.sum()
+    _, first = compute(expr, df, trace=True, plan_cache=cache)
+    _, second = compute(expr, df, trace=True, plan_cache=cache)
+    assert cache.hits == 1
+    assert ([(e.kind, e.implementation) for e in first] ==
+            [(e.kind, e.implementation) for e in second])
+
+
+def test_nrows_and_nbytes():
+    assert nrows(df) == 3
+    assert nrows(df.amount) == 3
+    assert nrows(df.amount.values) == 3
+    assert nrows(1) is None
+    assert nbytes(df.amount.values) == 24
+    assert nbytes(df) > 0
+    assert nbytes(1.0) is None
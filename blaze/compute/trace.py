@@ -0,0 +1,295 @@
+""" Per-node tracing of ``compute``
+
+Pass ``trace=True`` to ``compute`` to get back a ``Trace`` alongside the
+result.  The trace records every step the interpreter takes: pre-computing and
+optimizing the inputs, the ``compute_down`` and ``compute_up`` calls made on
+each expression node and the final ``post_compute``.
+
+>>> from blaze import symbol, compute
+>>> t = symbol('t', 'var * {name: string, amount: int}')
+>>> result, trace = compute(t.amount.sum(), [('Alice', 1), ('Bob', 2)],
+...                         trace=True)
+>>> result
+3
+>>> print(trace.render(durations=False))  # doctest: +ELLIPSIS
+compute sum(t.amount) [list -> int]
+  pre_compute t [list -> list] ...pre_compute<Expr, list> (2 rows)
+  optimize sum(t.amount) [list -> sum]
+  compute_down sum(t.amount) [list] not implemented
+  bottom_up_until_type_break sum(t.amount) [list -> Symbol]
+    compute_up t.amount [list -> map] ...compute_up<ElemWise, list>
+    compute_up sum(amount) [map -> int] ...compute_up<Reduction, Iterator>
+  pre_compute amount_sum [int -> int] ...pre_compute<Expr, object>
+  optimize amount_sum [int -> Symbol]
+  post_compute sum(t.amount) [int -> int] ...post_compute<Expr, object>
+
+Traces can be dumped to JSON with ``trace.to_json()``.
+"""
+from __future__ import absolute_import, division, print_function
+
+import json
+import sys
+from timeit import default_timer
+
+import numpy as np
+import pandas as pd
+
+from ..compatibility import _strtypes
+from ..dispatch import dispatch
+
+
+__all__ = ['Trace', 'TraceEvent', 'nbytes', 'nrows']
+
+
+@dispatch(object)
+def nrows(data):
+    """ Number of rows in ``data`` or ``None`` if it is not cheap to tell
+
+    >>> nrows([1, 2, 3])
+    3
+    >>> nrows(iter([1, 2, 3]))
+    >>> nrows('hello')
+    """
+    return None
+
+
+@dispatch((list, tuple, set, frozenset, dict, pd.DataFrame, pd.Series))
+def nrows(data):
+    return len(data)
+
+
+@dispatch(np.ndarray)
+def nrows(data):
+    return len(data) if data.ndim else None
+
+
+@dispatch(object)
+def nbytes(data):
+    """ Approximate size of ``data`` in bytes or ``None`` if unknown
+
+    Python containers report their shallow size.
+
+    >>> nbytes(np.zeros(10, dtype='i4'))
+    40
+    >>> nbytes(iter([1, 2, 3]))
+    """
+    return None
+
+
+@dispatch(np.ndarray)
+def nbytes(data):
+    return data.nbytes
+
+
+@dispatch((list, tuple, set, frozenset, dict) + _strtypes + (bytes,))
+def nbytes(data):
+    return sys.getsizeof(data)
+
+
+@dispatch(pd.DataFrame)
+def nbytes(data):
+    return int(data.memory_usage(index=True).sum())
+
+
+@dispatch(pd.Series)
+def nbytes(data):
+    return int(data.memory_usage(index=True))
+
+
+def _typename(data):
+    if isinstance(data, type):
+        return data.__name__
+    return type(data).__name__
+
+
+def _funcname(func, dispatcher=None, types=()):
+    """ Dotted name of ``func``, along with the signature it is registered
+    under on ``dispatcher`` that matches ``types``
+    """
+    if func is None:
+        return None
+    name = '%s.%s' % (getattr(func, '__module__', None),
+                      getattr(func, '__name__', repr(func)))
+    funcs = getattr(dispatcher, 'funcs', {})
+    for signature, f in funcs.items():
+        if f is func and len(signature) == len(types) and all(
+                map(issubclass, types, signature)):
+            return '%s<%s>' % (name, ', '.join(t.__name__ for t in signature))
+    return name
+
+
+class TraceEvent(object):
+    """ A single timed step of a ``compute`` call
+
+    Attributes
+    ----------
+    kind : str
+        The step taken, e.g. ``'compute_up'`` or ``'optimize'``.
+    expr : str
+        The expression the step was taken on.
+    implementation : str or None
+        The dotted name of the function that was dispatched to.
+    input_types, output_type : list of str, str
+        The type names of the data going in and coming out.
+    rows, nbytes : int or None
+        Row count and approximate size of the output, when cheap to tell.
+    status : str
+        One of ``'ok'``, ``'not implemented'`` or ``'error'``.
+    duration : float
+        Wall time in seconds, including any nested steps.
+    children : list of TraceEvent
+        Steps taken while this one was running.
+    """
+    __slots__ = ('kind', 'expr', 'implementation', 'input_types',
+                 'output_type', 'rows', 'nbytes', 'status', 'start',
+                 'duration', 'children', '_trace')
+
+    def __init__(self, kind, expr, inputs=(), trace=None):
+        self.kind = kind
+        self.expr = str(expr)
+        self.implementation = None
+        self.input_types = list(map(_typename, inputs))
+        self.output_type = None
+        self.rows = None
+        self.nbytes = None
+        self.status = 'ok'
+        self.start = None
+        self.duration = None
+        self.children = []
+        self._trace = trace
+
+    def finish(self, result, implementation=None, dispatcher=None, types=()):
+        """ Record the output of this step
+
+        ``dispatcher`` and the argument ``types`` are used to find the
+        signature under which ``implementation`` was registered.
+        """
+        self.implementation = _funcname(implementation, dispatcher, types)
+        self.output_type = _typename(result)
+        self.rows = nrows(result)
+        self.nbytes = nbytes(result)
+
+    def __enter__(self):
+        stack = self._trace._stack
+        stack[-1].children.append(self)
+        stack.append(self)
+        self.start = default_timer()
+        return self
+
+    def __exit__(self, typ, value, traceback):
+        self.duration = default_timer() - self.start
+        self._trace._stack.pop()
+        if typ is not None:
+            if issubclass(typ, NotImplementedError):
+                self.status = 'not implemented'
+            else:
+                self.status = 'error'
+
+    def to_dict(self):
+        return dict(kind=self.kind,
+                    expr=self.expr,
+                    implementation=self.implementation,
+                    input_types=self.input_types,
+                    output_type=self.output_type,
+                    rows=self.rows,
+                    nbytes=self.nbytes,
+                    status=self.status,
+                    duration=self.duration,
+                    children=[child.to_dict() for child in self.children])
+
+    def _render(self, depth, durations):
+        types = ', '.join(self.input_types)
+        if self.output_type is not None:
+            types = '%s -> %s' % (types, self.output_type)
+        parts = ['  ' * depth + self.kind, self.expr, '[%s]' % types]
+        if self.status != 'ok':
+            parts.append(self.status)
+        if self.implementation is not None:
+            parts.append(self.implementation)
+        if self.rows is not None:
+            parts.append('(%d rows)' % self.rows)
+        if durations and self.duration is not None:
+            parts.append('%.3f ms' % (self.duration * 1e3))
+        lines = [' '.join(parts)]
+        for child in self.children:
+            lines.extend(child._render(depth + 1, durations))
+        return lines
+
+    def __repr__(self):
+        return '<TraceEvent %s %s>' % (self.kind, self.expr)
+
+
+class _NullEvent(object):
+    """ Stand-in for ``TraceEvent`` when tracing is off """
+    __slots__ = ()
+
+    def finish(self, result, implementation=None, dispatcher=None, types=()):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+null_event = _NullEvent()
+
+
+class Trace(object):
+    """ A tree of ``TraceEvent``s recorded during a call to ``compute``
+
+    Iterating over a trace yields every event in the order it started.
+
+    See Also
+    --------
+    blaze.compute.core.compute
+    """
+    def __init__(self):
+        self.root = None
+        self._stack = [_Root()]
+
+    def event(self, kind, expr, inputs=()):
+        """ A context manager that times a step nested under the current one
+        """
+        event = TraceEvent(kind, expr, inputs, trace=self)
+        if self.root is None:
+            self.root = event
+        return event
+
+    def __iter__(self):
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            event = stack.pop()
+            yield event
+            stack.extend(reversed(event.children))
+
+    def to_dict(self):
+        return self.root.to_dict() if self.root is not None else {}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def render(self, durations=True):
+        """ Render the trace as an indented tree, one event per line """
+        if self.root is None:
+            return ''
+        return '\n'.join(self.root._render(0, durations))
+
+    def __str__(self):
+        return self.render()
+
+
+class _Root(object):
+    """ Collects the top level events of a trace """
+    __slots__ = 'children',
+
+    def __init__(self):
+        self.children = []
+
+
+def traced(trace, kind, expr, inputs=()):
+    """ Event for a step when tracing, otherwise a no-op context manager """
+    if trace is None:
+        return null_event
+    return trace.event(kind, expr, inputs)
@@ -41,6 +41,7 @@ __all__ = ['Concat',
            'sort',
            'Tail',
            'tail',
+           'TopK',
            'transform']
 
 
@@ -250,6 +251,46 @@ def tail(child, n=10):
     return Tail(child, n)
 
 
+class TopK(Expr):
+
+    """ First `n` elements of a collection in sorted order
+
+    Optimizers replace ``expr.sort(key).head(n)`` with this so that backends
+    can select the ``n`` elements without sorting the whole collection.
+
+    Examples
+    --------
+    >>> from blaze import symbol
+    >>> accounts = symbol('accounts', 'var * {name: string, amount: int}')
+    >>> TopK(accounts, 'amount', False, 5).dshape
+    dshape("5 * {name: string, amount: int32}")
+
+    See Also
+    --------
+
+    blaze.expr.collections.Sort
+    blaze.expr.collections.Head
+    blaze.expr.optimize.fuse_top_k
+    """
+    __slots__ = '_hash', '_child', '_key', 'ascending', 'n'
+
+    def _dshape(self):
+        return self.n * self._child.dshape.subshape[0]
+
+    def _len(self):
+        return min(self._child._len(), self.n)
+
+    key = Sort.key
+
+    @property
+    def _name(self):
+        return self._child._name
+
+    def __str__(self):
+        return "%s.sort(%s, ascending=%s).head(%d)" % (
+            self._child, repr(self._key), self.ascending, self.n)
+
+
 class Sample(Expr):
     """Random row-wise sample.  Can specify `n` or `frac` for an absolute or
     fractional number of rows, respectively.
@@ -2,7 +2,13 @@ from __future__ import absolute_import, division, print_function
 
 import numbers
 import inspect
+import operator
+import re
+import threading
+import types
+import weakref
 
+from hashlib import md5
 from pprint import pformat
 from functools import reduce, partial
 
@@ -11,11 +17,12 @@ import toolz
 from toolz import unique, concat, first
 import pandas as pd
 
-from ..compatibility import _strtypes
+from ..compatibility import _strtypes, with_metaclass
 from ..dispatch import dispatch
 from ..utils import ordered_intersect
 
-__all__ = ['Node', 'path', 'common_subexpression', 'eval_str']
+__all__ = ['Node', 'path', 'common_subexpression', 'shared_subterms',
+           'eval_str', 'get_interning', 'set_interning', 'digest']
 
 
 base = (numbers.Number,) + _strtypes
@@ -59,7 +66,138 @@ def isidentical(a, b):
     return a == b
 
 
-class Node(object):
+_interning = False
+_intern_table = weakref.WeakValueDictionary()
+_intern_lock = threading.Lock()
+
+
+def set_interning(on):
+    """ Turn interning of expression nodes on or off
+
+    While interning is on, constructing a node that is identical to a live
+    node made under interning returns that existing node.  Identical
+    subtrees are then shared between expressions, along with everything
+    cached on them (``dshape``, attribute lookups, hashes), and
+    ``isidentical`` on identical interned nodes returns at its identity
+    check.  Nodes are held weakly, so interning does not keep expressions
+    alive.
+
+    Returns the previous setting.
+
+    >>> from blaze.expr import symbol
+    >>> t = symbol('t', 'var * {x: int, y: int}')
+    >>> (t.x + 1) is (t.x + 1)
+    False
+    >>> old = set_interning(True)
+    >>> (t.x + 1) is (t.x + 1)
+    True
+    >>> _ = set_interning(old)
+
+    See Also
+    --------
+    get_interning
+    """
+    global _interning
+    old, _interning = _interning, bool(on)
+    if _interning:
+        _Interned.__call__ = _interning_call
+    elif '__call__' in vars(_Interned):
+        del _Interned.__call__
+    return old
+
+
+def get_interning():
+    """ Whether expression nodes are currently interned
+
+    See Also
+    --------
+    set_interning
+    """
+    return _interning
+
+
+class _InternKey(object):
+    """ Structural key of a node in the intern table
+
+    Holds the node's arguments but not the node itself, so that the table
+    does not keep nodes alive.
+    """
+    __slots__ = 'type', 'args', '_hash'
+
+    def __init__(self, node):
+        self.type = type(node)
+        self.args = node._hashargs
+        self._hash = hash(node)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        return self.type is other.type and _same(self.args, other.args)
+
+
+def _same(a, b):
+    """ Like ``isidentical``, but arguments of different types differ even
+    when they compare equal, so that ``t.x + 1.0`` is not interned as
+    ``t.x + 1``
+
+    >>> isidentical(1, 1.0)
+    True
+    >>> _same(1, 1.0)
+    False
+    >>> _same((1, 'a'), (1, 'a'))
+    True
+    """
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, Node):
+        if a._interned and b._interned:  # only one interned copy can exist
+            return False
+        return _same(a._hashargs, b._hashargs)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(map(_same, a, b))
+    return a == b
+
+
+def intern(node):
+    """ The interned node identical to ``node``
+
+    Adds ``node`` to the intern table if no identical node is there yet.
+    Nodes that can not be hashed are returned as they are.
+    """
+    if node._interned:
+        return node
+    try:
+        key = _InternKey(node)
+    except TypeError:  # unhashable arguments
+        return node
+    with _intern_lock:
+        existing = _intern_table.get(key)
+        if existing is not None:
+            return existing
+        try:
+            node._interned = True
+        except AttributeError:  # no __dict__ to mark the node in
+            return node
+        _intern_table[key] = node
+    return node
+
+
+def _interning_call(cls, *args, **kwargs):
+    return intern(type.__call__(cls, *args, **kwargs))
+
+
+class _Interned(type):
+    """ Metaclass that interns new nodes while interning is on
+
+    ``set_interning`` gives it a ``__call__`` only while interning is on, so
+    that otherwise nodes are constructed without an extra Python call.
+    """
+
+
+class Node(with_metaclass(_Interned, object)):
     """ Node in a tree
 
     This serves as the base class for ``Expr``.  This class holds all of the
@@ -74,6 +212,9 @@ class Node(object):
     """
     __slots__ = ()
     __inputs__ = '_child',
+    _interned = False
+    _digest = None  # cached by ``digest``
+    _tree_index = None  # cached by ``_subterm_index``
 
     def __init__(self, *args, **kwargs):
         slots = set(self.__slots__)
@@ -105,6 +246,11 @@ class Node(object):
 
     _hashargs = _args
 
+    @property
+    def _digestargs(self):
+        """ The arguments that ``digest`` identifies the node by """
+        return self._hashargs
+
     @property
     def _inputs(self):
         return tuple(getattr(self, i) for i in self.__inputs__)
@@ -127,11 +273,46 @@ class Node(object):
         [t, v]
         """
 
-        if not self._inputs:
-            return [self]
-        else:
-            return list(unique(concat(i._leaves() for i in self._inputs if
-                                      isinstance(i, Node))))
+        return list(self._subterm_index()[2])
+
+    def _subterm_index(self):
+        """ Subterms of this tree, their parents and the leaves of the tree
+
+        Returns ``(order, parents, leaves)``, where ``order`` lists each
+        distinct subterm once in depth first, left to right order, ``parents``
+        maps each subterm to the node it was first reached from (``None`` for
+        ``self``) and ``leaves`` are the nodes without inputs.  The index is
+        built once and cached on the node.
+
+        >>> from blaze.expr import symbol
+        >>> t = symbol('t', 'var * {x: int, y: int}')
+        >>> order, parents, leaves = (t.x + t.y)._subterm_index()
+        >>> order
+        [t.x + t.y, t.x, t, t.y]
+        >>> parents[t]
+        t.x
+        """
+        index = self._tree_index
+        if index is None:
+            order = []
+            parents = {}
+            stack = [(self, None)]
+            while stack:
+                node, parent = stack.pop()
+                if node in parents:
+                    continue
+                parents[node] = parent
+                order.append(node)
+                if isinstance(node, Node):
+                    stack.extend((i, node) for i in reversed(node._inputs))
+            leaves = tuple(node for node in order
+                           if isinstance(node, Node) and not node._inputs)
+            index = order, parents, leaves
+            try:
+                self._tree_index = index
+            except AttributeError:  # no __dict__ to cache the index in
+                pass
+        return index
 
     isidentical = isidentical
 
@@ -179,7 +360,7 @@ class Node(object):
         return subterms(self)
 
     def __contains__(self, other):
-        return other in set(self._subterms())
+        return other in self._subterm_index()[1]
 
     def __getstate__(self):
         return tuple(self._args)
@@ -336,6 +517,141 @@ def _str(s):
         return pformat(s).rstrip()
 
 
+def digest(expr):
+    """ Stable, content-addressed digest of an expression
+
+    The digest of a node is the md5 of its type and the digests of its
+    arguments, so it is computed bottom up and cached on every node.  Unlike
+    ``hash`` it is the same in every process and on every machine.  Leaves
+    bound to data by ``Data`` are identified by the path or URI of the data
+    where it has one, and otherwise by its contents.
+
+    >>> from blaze.expr import symbol
+    >>> t = symbol('t', 'var * {x: int, y: int}')
+    >>> digest(t.x + 1) == digest(t.x + 1)
+    True
+    >>> digest(t.x + 1) == digest(t.x + 1.0)
+    False
+    >>> len(digest(t.x + 1))
+    32
+    """
+    result = expr._digest
+    if result is None:
+        result = _md5(_token(type(expr)), *map(_token, expr._digestargs))
+        try:
+            expr._digest = result
+        except AttributeError:  # no __dict__ to cache the digest in
+            pass
+    return result
+
+
+def _md5(*tokens):
+    m = md5()
+    for token in tokens:
+        m.update(str(len(token)).encode('ascii'))
+        m.update(b':')
+        m.update(token)
+    return m.hexdigest()
+
+
+_address = re.compile(r'0x[0-9a-fA-F]+')
+
+
+@dispatch(object)
+def _token(o):
+    """ Bytes identifying an argument of a node, the same in every process
+
+    Objects are identified by their ``repr``, unless it holds a memory
+    address, as the default ``repr`` does.  Those are identified by their
+    attributes instead.
+    """
+    prefix = '%s.%s:' % (type(o).__module__, type(o).__name__)
+    text = repr(o)
+    if _address.search(text):
+        state = getattr(o, '__dict__', None)
+        if state is None:
+            slots = concat(getattr(cls, '__slots__', ())
+                           for cls in type(o).__mro__)
+            state = dict((k, getattr(o, k)) for k in slots
+                         if k != '__weakref__' and hasattr(o, k))
+        return prefix.encode('utf-8') + _token(state)
+    return (prefix + text).encode('utf-8')
+
+
+@dispatch(Node)
+def _token(o):
+    return digest(o).encode('ascii')
+
+
+@dispatch(type)
+def _token(o):
+    return ('type:%s.%s' % (o.__module__, o.__name__)).encode('utf-8')
+
+
+@dispatch(_strtypes + (bytes,))
+def _token(o):
+    if isinstance(o, bytes):
+        return b'b' + o
+    return b's' + o.encode('utf-8')
+
+
+@dispatch((tuple, list))
+def _token(o):
+    return ('%s:' % type(o).__name__).encode('ascii') + _md5(
+        *map(_token, o)).encode('ascii')
+
+
+@dispatch((set, frozenset))
+def _token(o):
+    # the order of iteration depends on the hash seed, so sort the members
+    return ('%s:' % type(o).__name__).encode('ascii') + _md5(
+        *sorted(map(_token, o))).encode('ascii')
+
+
+@dispatch(dict)
+def _token(o):
+    items = sorted(_token(k) + b'=' + _token(v) for k, v in o.items())
+    return b'dict:' + _md5(*items).encode('ascii')
+
+
+@dispatch(np.ndarray)
+def _token(o):
+    if o.dtype.hasobject:
+        # the bytes of an array of objects are their addresses
+        return ('ndarray:%s:' % (o.shape,)).encode('ascii') + _token(
+            o.tolist())
+    return ('ndarray:%s:%s:' % (o.dtype.str, o.shape)).encode('ascii') + md5(
+        np.ascontiguousarray(o).tobytes()).hexdigest().encode('ascii')
+
+
+@dispatch((pd.DataFrame, pd.Series))
+def _token(o):
+    # the repr of a large frame is truncated, so digest all of its values
+    frame = o.to_frame() if isinstance(o, pd.Series) else o
+    columns = [_token(np.asarray(frame.iloc[:, i]))
+               for i in range(len(frame.columns))]
+    return ('%s:' % type(o).__name__).encode('ascii') + _md5(
+        _token(list(frame.columns)), _token(np.asarray(frame.index)),
+        *columns).encode('ascii')
+
+
+@dispatch((types.FunctionType, partial))
+def _token(o):
+    # lambdas and nested functions share names, tell them apart by their code
+    code = getattr(o, '__code__', None)
+    token = ('function:%s:%s' % (getattr(o, '__module__', None),
+                                 get_callable_name(o))).encode('utf-8')
+    if code is None:
+        return token
+    return token + b':' + _token(code)
+
+
+@dispatch(types.CodeType)
+def _token(o):
+    return ('code:' + _md5(o.co_code, _token(o.co_consts),
+                           _token(o.co_names))).encode('ascii')
+
+
 @dispatch(Node)
 def subterms(expr):
     return concat([[expr], concat(map(subterms, expr._inputs))])
@@ -346,7 +662,7 @@ def subterms(x):
     yield x
 
 
-def subs(o, d):
+def subs(o, d, memo=None):
     """ Substitute values within data structure
 
     >>> subs(1, {1: 2})
@@ -354,26 +670,58 @@ def subs(o, d):
 
     >>> subs([1, 2, 3], {2: 'Hello'})
     [1, 'Hello', 3]
+
+    Parts of ``o`` that contain nothing to substitute are returned as they
+    are rather than copied, so the result shares all unchanged subtrees with
+    the original.
+
+    >>> from blaze.expr import symbol
+    >>> t = symbol('t', 'var * {x: int, y: int}')
+    >>> expr = t.x.sum() + t.y.sum()
+    >>> subs(expr, {'y': 'z'}).lhs is expr.lhs
+    True
+
+    ``memo`` maps the ids of terms already visited in this pass to their
+    substitutes, so that subtrees shared within ``o`` are only substituted
+    once.
     """
-    d = dict((k, v) for k, v in d.items() if k is not v)
-    if not d:
-        return o
+    if memo is None:
+        d = dict((k, v) for k, v in d.items() if k is not v)
+        if not d:
+            return o
+        memo = {}
+    key = id(o)
+    if key in memo:
+        return memo[key][1]
     try:
-        if o in d:
-            d = d.copy()
-            o = d.pop(o)
+        matched = o in d
     except TypeError:
-        pass
-    return _subs(o, d)
+        matched = False
+    if matched:
+        d = d.copy()
+        result = d.pop(o)
+        if d:
+            result = _subs(result, d, memo={})
+    else:
+        result = _subs(o, d, memo=memo)
+    memo[key] = o, result  # keep o alive so that its id is not reused
+    return result
+
+
+def _unchanged(old, new):
+    return len(old) == len(new) and all(map(operator.is_, old, new))
 
 
 @dispatch((tuple, list), dict)
-def _subs(o, d):
-    return type(o)([subs(arg, d) for arg in o])
+def _subs(o, d, memo=None):
+    newargs = [subs(arg, d, memo) for arg in o]
+    if _unchanged(o, newargs):
+        return o
+    return type(o)(newargs)
 
 
 @dispatch(Node, dict)
-def _subs(o, d):
+def _subs(o, d, memo=None):
     """
 
     >>> from blaze.expr import symbol
@@ -381,12 +729,15 @@ def _subs(o, d):
     >>> subs(t, {'balance': 'amount'}).fields
     ['name', 'amount']
     """
-    newargs = [subs(arg, d) for arg in o._args]
+    args = o._args
+    newargs = [subs(arg, d, memo) for arg in args]
+    if _unchanged(args, newargs):
+        return o
     return type(o)(*newargs)
 
 
 @dispatch(object, dict)
-def _subs(o, d):
+def _subs(o, d, memo=None):
     """ Private dispatched version of ``subs``
 
     >>> subs('Hello', {})
@@ -404,15 +755,16 @@ def path(a, b):
     >>> list(path(expr, t))
     [sum(t.amount), t.amount, t]
     """
-    while not a.isidentical(b):
+    parents = a._subterm_index()[1]
+    if b not in parents:
         yield a
-        if not a._inputs:
-            break
-        for child in a._inputs:
-            if any(b.isidentical(node) for node in child._traverse()):
-                a = child
-                break
-    yield a
+        return
+    result = [b]
+    while not b.isidentical(a):
+        b = parents[b]
+        result.append(b)
+    for node in reversed(result):
+        yield node
 
 
 def common_subexpression(expr, *exprs):
@@ -461,6 +813,39 @@ def common_subexpression(expr, *exprs):
     return first(common)
 
 
+def shared_subterms(*exprs):
+    """ Largest subexpressions that occur more than once among ``exprs``
+
+    Leaves are never returned.  The result is ordered so that every term comes
+    after any other shared term it contains, which lets each of them be
+    computed once and reused when computing the others.
+
+    Examples
+    --------
+
+    >>> from blaze.expr import symbol
+    >>> t = symbol('t', 'var * {x: int, y: int}')
+    >>> shared_subterms(t.x.sum(), t.x.sum() / t.x.count())
+    [t.x, sum(t.x)]
+    >>> shared_subterms(t.x + 1, t.y)
+    []
+    """
+    counts = toolz.frequencies(concat(map(subterms, exprs)))
+    result = []
+    seen = set()
+    stack = list(exprs)
+    while stack:
+        expr = stack.pop()
+        if expr in seen:
+            continue
+        seen.add(expr)
+        if counts.get(expr, 0) > 1 and expr._inputs:
+            result.append(expr)
+        else:
+            stack.extend(i for i in expr._inputs if isinstance(i, Node))
+    return sorted(result, key=lambda e: toolz.count(subterms(e)))
+
+
 def eval_str(expr):
     """ String suitable for evaluation
 
@@ -1,6 +1,7 @@
 from __future__ import absolute_import, division, print_function
 
 from keyword import iskeyword
+import operator
 import re
 
 import datashape
@@ -111,14 +112,21 @@ class Expr(Node):
                 (fieldname, self))
         return Field(self, fieldname)
 
+    def _has_fields(self, names):
+        measure = self.dshape.measure
+        if isinstance(measure, Record):
+            return builtins.all(map(field_positions(measure).__contains__,
+                                    names))
+        return set(names).issubset(self.fields)
+
     def __getitem__(self, key):
-        if isinstance(key, _strtypes) and key in self.fields:
+        if isinstance(key, _strtypes) and self._has_fields([key]):
             return self._get_field(key)
         elif isinstance(key, Expr) and iscollection(key.dshape):
             return selection(self, key)
         elif (isinstance(key, list) and
               builtins.all(isinstance(k, _strtypes) for k in key)):
-            if set(key).issubset(self.fields):
+            if self._has_fields(key):
                 return self._project(key)
             else:
                 raise ValueError('Names %s not consistent with known names %s'
@@ -187,13 +195,13 @@ class Expr(Node):
 
     def __dir__(self):
         result = dir(type(self))
-        if (isrecord(self.dshape.measure) or
-            isinstance(self.dshape.measure, datashape.Map) and
+        if isrecord(self.dshape.measure):
+            result.extend(field_index(self.dshape.measure))
+        elif (isinstance(self.dshape.measure, datashape.Map) and
                 self.fields):
             result.extend(map(valid_identifier, self.fields))
 
-        result.extend(toolz.merge(schema_methods(self.dshape.measure),
-                                  dshape_methods(self.dshape)))
+        result.extend(methods_of(self.dshape))
 
         return sorted(set(filter(isvalid_identifier, result)))
 
@@ -203,20 +211,22 @@ class Expr(Node):
         try:
             result = object.__getattribute__(self, key)
         except AttributeError:
-            fields = dict(zip(map(valid_identifier, self.fields), self.fields))
+            ds = self.dshape
+            if isinstance(ds.measure, Record):
+                fields = field_index(ds.measure)
+            else:
+                fields = dict(zip(map(valid_identifier, self.fields),
+                                  self.fields))
 
             # prefer the method if there's a field with the same name
-            methods = toolz.merge(
-                schema_methods(self.dshape.measure),
-                dshape_methods(self.dshape)
-            )
+            methods = methods_of(ds)
             if key in methods:
                 func = methods[key]
                 if func in method_properties:
                     result = func(self)
                 else:
                     result = boundmethod(func, self)
-            elif self.fields and key in fields:
+            elif key in fields:
                 if isscalar(self.dshape.measure):  # t.foo.foo is t.foo
                     result = self
                 else:
@@ -312,11 +322,14 @@ def symbol(name, dshape, token=None):
 
 
 @dispatch(Symbol, dict)
-def _subs(o, d):
+def _subs(o, d, memo=None):
     """ Subs symbols using symbol function
 
     Supports caching"""
-    newargs = [subs(arg, d) for arg in o._args]
+    args = o._args
+    newargs = [subs(arg, d, memo) for arg in args]
+    if all(map(operator.is_, args, newargs)):
+        return o
     return symbol(*newargs)
 
 
@@ -366,7 +379,7 @@ class Field(ElemWise):
         measure = self._child.dshape.measure
 
         # TODO: is this too special-case-y?
-        schema = getattr(measure, 'value', measure).dict[self._name]
+        schema = field_type(getattr(measure, 'value', measure), self._name)
 
         shape = shape + schema.shape
         schema = (schema.measure,)
@@ -397,8 +410,9 @@ class Projection(ElemWise):
 
     def _schema(self):
         measure = self._child.schema.measure
-        d = getattr(measure, 'value', measure).dict
-        return DataShape(Record((name, d[name]) for name in self.fields))
+        measure = getattr(measure, 'value', measure)
+        return DataShape(Record([(name, field_type(measure, name))
+                                 for name in self._fields]))
 
     def __str__(self):
         return '%s[%s]' % (self._child, self.fields)
@@ -409,7 +423,7 @@ class Projection(ElemWise):
         raise ValueError("Column Mismatch: %s" % key)
 
     def _get_field(self, fieldname):
-        if fieldname in self.fields:
+        if fieldname in field_positions(self.dshape.measure):
             return Field(self._child, fieldname)
         raise ValueError("Field %s not found in columns %s" % (fieldname,
                                                                self.fields))
@@ -421,7 +435,7 @@ def projection(expr, names):
         raise ValueError("Projection with no names")
     if not isinstance(names, (tuple, list)):
         raise TypeError("Wanted list of strings, got %s" % names)
-    if not set(names).issubset(expr.fields):
+    if not expr._has_fields(names):
         raise ValueError("Mismatched names. Asking for names %s "
                          "where expression has names %s" %
                          (names, expr.fields))
@@ -797,6 +811,64 @@ method_properties = set()
 dshape_methods = memoize(partial(select_functions, dshape_method_list))
 schema_methods = memoize(partial(select_functions, schema_method_list))
 
+_method_tables = dict()
+
+
+def methods_of(ds):
+    """ The schema and dshape methods of expressions with datashape ``ds``
+
+    Tables are cached per shape and measure.  The predicates that select
+    methods do not look inside records, so all record measures share one
+    table per shape, however wide they are.
+
+    >>> sorted(methods_of(dshape('var * {a: int, b: string}')))[:4]
+    ['apply', 'columns', 'count', 'count_values']
+    >>> methods_of(dshape('3 * {x: int}')) is methods_of(dshape('3 * {y: int}'))
+    True
+    """
+    measure = ds.measure
+    key = ds.shape, (Record if isinstance(measure, Record) else measure)
+    try:
+        return _method_tables[key]
+    except KeyError:
+        table = toolz.merge(schema_methods(measure), dshape_methods(ds))
+        _method_tables[key] = table
+        return table
+
+
+@memoize
+def field_positions(measure):
+    """ Map the field names of a record to their positions
+
+    The map is built once per record, so looking up a field of a wide record
+    does not scan its fields.
+
+    >>> field_positions(dshape('{a: int, b: string}').measure) == {
+    ...     'a': 0, 'b': 1}
+    True
+    """
+    return dict((name, i) for i, (name, _) in enumerate(measure.fields))
+
+
+def field_type(measure, name):
+    """ The type of field ``name`` of a record
+
+    >>> field_type(dshape('{a: int32, b: string}').measure, 'b')
+    ctype("string")
+    """
+    return measure.fields[field_positions(measure)[name]][1]
+
+
+@memoize
+def field_index(measure):
+    """ Map the field names of a record, as valid identifiers, to the names
+
+    >>> field_index(dshape('{"a b": int, c: int}').measure) == {
+    ...     'a_b': 'a b', 'c': 'c'}
+    True
+    """
+    return dict((valid_identifier(name), name) for name in measure.names)
+
 
 @dispatch(DataShape)
 def shape(ds):
@@ -1,6 +1,10 @@
 from __future__ import absolute_import, division, print_function
 from copy import deepcopy
+from functools import reduce
+import numbers
+import operator
 
+from datashape import Record, integral
 from datashape.predicates import isscalar
 from multipledispatch import MDNotImplementedError
 
@@ -11,6 +15,9 @@ from .collections import *
 from .split_apply_combine import *
 from .broadcast import *
 from .reductions import *
+from .core import Node, common_subexpression
+from .expressions import field_positions
+from ..compatibility import builtins
 from ..dispatch import dispatch
 
 
@@ -42,16 +49,30 @@ def _lean(expr, fields=None):
     >>> _lean(s, ('s',))
     (s, ())
     """
-    if not fields or set(expr.fields).issubset(fields):
+    if not fields or _covers(fields, expr):
         return expr, fields
     else:
         return expr[sorted(fields)], fields
 
 
+def _covers(fields, expr):
+    """ Whether ``fields`` includes every field of ``expr``
+
+    Only scans the fields of ``expr`` when there are at least as many
+    ``fields``, so that leaning a few columns of a wide table is cheap.
+    """
+    measure = expr.dshape.measure
+    if not isinstance(measure, Record):
+        return set(expr.fields).issubset(fields)
+    positions = field_positions(measure)
+    return len(fields) >= len(positions) and set(positions).issubset(fields)
+
+
 @dispatch(Projection)
 def _lean(expr, fields=None):
     child, _ = _lean(expr._child, fields=fields)
-    return child[sorted(fields, key=expr.fields.index)], fields
+    positions = field_positions(expr.dshape.measure)
+    return child[sorted(fields, key=positions.__getitem__)], fields
 
 
 @dispatch(Field)
@@ -157,25 +178,39 @@ def _lean(expr, fields=None):
     for name, val in zip(expr.names, expr.values):
         if name not in fields:
             continue
-        child, child_fields = _lean(val, fields=set())
-        save[name] = child
+        _, child_fields = _lean(val, fields=set())
+        save[name] = val
         new_fields |= set(child_fields)
 
-    return summary(**save), new_fields
+    result = summary(**save)
+    child = result._child
+    if len(child.fields) > len(new_fields):
+        # Lean the shared child once so that the values keep sharing it
+        leaned, _ = _lean(child, fields=new_fields)
+        result = result._subs({child: leaned})
+    return result, new_fields
 
 
 @dispatch(By)
 def _lean(expr, fields=None):
     fields = set(fields)
-    grouper, grouper_fields = _lean(expr.grouper,
-                                    fields=fields.intersection(expr.grouper.fields))
-    apply, apply_fields = _lean(expr.apply,
-                                fields=fields.intersection(expr.apply.fields))
+    _, grouper_fields = _lean(expr.grouper,
+                              fields=fields.intersection(expr.grouper.fields))
+    _, apply_fields = _lean(expr.apply,
+                            fields=fields.intersection(expr.apply.fields))
 
     new_fields = set(apply_fields) | set(grouper_fields)
 
-    child = common_subexpression(grouper, apply)
+    apply = expr.apply
+    if isinstance(apply, Summary):
+        apply = summary(**dict((name, val)
+                               for name, val in zip(apply.names, apply.values)
+                               if name in fields))
+
+    grouper = expr.grouper
+    child = expr._child
     if len(child.fields) > len(new_fields):
+        # Lean the shared child once so that the grouper and apply share it
         child, _ = _lean(child, fields=new_fields)
         grouper = grouper._subs({expr._child: child})
         apply = apply._subs({expr._child: child})
@@ -202,7 +237,71 @@ def _lean(expr, fields=None):
     return expr._subs({expr._child: child})[sorted(fields)], new_fields
 
 
-@dispatch((Join, Concat))
+def _join_keys(expr):
+    on_left, on_right = expr.on_left, expr.on_right
+    if not isinstance(on_left, list):
+        on_left, on_right = [on_left], [on_right]
+    return on_left, on_right
+
+
+def _join_fields(expr):
+    """ The fields of the sides of the join ``expr`` behind each of its fields
+
+    Returns a dict mapping each output field to a dict from side (``0`` for
+    the left, ``1`` for the right) to the name of the field on that side.
+
+    >>> a = symbol('a', 'var * {id: int, x: int}')
+    >>> b = symbol('b', 'var * {key: int, x: int, y: int}')
+    >>> fields = _join_fields(join(a, b, 'id', 'key'))
+    >>> sorted(fields.items())  # doctest: +NORMALIZE_WHITESPACE
+    [('id', {0: 'id', 1: 'key'}), ('x_left', {0: 'x'}), ('x_right', {1: 'x'}),
+     ('y', {1: 'y'})]
+    """
+    on_left, on_right = _join_keys(expr)
+    left = [f for f in expr.lhs.fields if f not in on_left]
+    right = [f for f in expr.rhs.fields if f not in on_right]
+    overlap = set(left) & set(right)
+    left_suffix, right_suffix = expr.suffixes
+
+    sources = dict((l, {0: l, 1: r}) for l, r in zip(on_left, on_right))
+    for f in left:
+        sources[f + left_suffix if f in overlap else f] = {0: f}
+    for f in right:
+        sources[f + right_suffix if f in overlap else f] = {1: f}
+    return sources
+
+
+@dispatch(Join)
+def _lean(expr, fields=None):
+    """ Only read the join keys and the fields used above the join
+
+    Fields that appear on both sides are kept on both so that the suffixes
+    of the output fields do not change.
+
+    >>> a = symbol('a', 'var * {id: int, x: int, y: int}')
+    >>> b = symbol('b', 'var * {id: int, x: int, z: int}')
+    >>> lean_projection(join(a, b, 'id').z)
+    Join(lhs=a[['id']], rhs=b[['id', 'z']], _on_left='id', _on_right='id', \
+how='inner', suffixes=('_left', '_right')).z
+    """
+    on_left, on_right = _join_keys(expr)
+    sources = _join_fields(expr)
+    needed = set(on_left), set(on_right)
+    for name in fields:
+        for side, f in sources[name].items():
+            needed[side].add(f)
+    overlap = ((set(expr.lhs.fields) - set(on_left)) &
+               (set(expr.rhs.fields) - set(on_right)))
+    for f in overlap & (needed[0] | needed[1]):
+        needed[0].add(f)
+        needed[1].add(f)
+
+    lhs, _ = _lean(expr.lhs, fields=needed[0])
+    rhs, _ = _lean(expr.rhs, fields=needed[1])
+    return type(expr)(lhs, rhs, *expr._args[2:]), fields
+
+
+@dispatch(Concat)
 def _lean(expr, fields=None):
     return expr, fields
 
@@ -255,3 +354,466 @@ def simple_selections(expr):
 @dispatch(Expr)
 def simple_selections(expr):
     return expr._subs({e: simple_selections(e) for e in expr._inputs})
+
+
+def push_selections(expr, elemwise=False):
+    """ Move selections as close to the data as possible
+
+    Filters are moved below sorts and distincts, and the conjuncts of a
+    filter on a join are split between the sides of the join they refer to.
+    Filtering early means that every operation in between handles fewer
+    rows.
+
+    Filters on fields, projections and other element-wise operations are
+    moved below them only on their way to a sort, distinct or join.  In
+    memory, filtering the table rather than one of its columns costs more
+    than it saves.  Backends that read from storage, such as CSV files, pass
+    ``elemwise=True`` to always move them, so that the filter is applied as
+    the data is read.
+
+    >>> t = symbol('t', 'var * {name: string, amount: int, id: int}')
+    >>> s = t.sort('amount')
+    >>> push_selections(s[s.amount > 0])
+    t[t.amount > 0].sort('amount', ascending=True)
+
+    >>> u = symbol('u', 'var * {id: int, city: string}')
+    >>> j = join(t, u, 'id')
+    >>> push_selections(j[(j.amount > 0) & (j.city == 'NYC')])
+    Join(lhs=t[t.amount > 0], rhs=u[u.city == 'NYC'], \
+_on_left='id', _on_right='id', how='inner', suffixes=('_left', '_right'))
+
+    >>> push_selections(t.amount[t.amount > 0])
+    t.amount[t.amount > 0]
+    >>> push_selections(t.amount[t.amount > 0], elemwise=True)
+    t[t.amount > 0].amount
+    """
+    return _push_selections(expr, {}, elemwise)
+
+
+def _push_selections(expr, memo, elemwise):
+    key = id(expr)
+    if key in memo:
+        return memo[key][1]
+    if not isinstance(expr, Expr):
+        return expr
+    inputs = [i for i in expr._inputs if isinstance(i, Expr)]
+    new = expr._subs(dict((i, _push_selections(i, memo, elemwise))
+                          for i in inputs))
+    if type(new) is Selection:
+        new = _push(new, elemwise)
+    memo[key] = expr, new  # keep expr alive so that its id is not reused
+    return new
+
+
+def _push(expr, elemwise=False):
+    """ Push the selection ``expr`` below its child, if that is legal """
+    try:
+        return _push_selection(expr._child, expr.predicate, elemwise=elemwise)
+    except NotImplementedError:
+        return expr
+
+
+def _rowwise(expr, base):
+    """ Whether ``expr`` uses ``base`` and only through element-wise nodes
+
+    >>> t = symbol('t', 'var * {x: int, y: int}')
+    >>> _rowwise(t.x + t.y > 1, t)
+    True
+    >>> _rowwise(t.x > t.x.mean(), t)
+    False
+    """
+    if not isinstance(expr, Node) or base not in expr:
+        return False
+    stack = [expr]
+    while stack:
+        e = stack.pop()
+        if e.isidentical(base) or base not in e:
+            continue
+        if not isinstance(e, ElemWise):
+            return False
+        stack.extend(i for i in e._inputs if isinstance(i, Node))
+    return True
+
+
+def _conjuncts(predicate):
+    """ Split ``predicate`` into the terms of its top level ``&``s """
+    if isinstance(predicate, And):
+        return _conjuncts(predicate.lhs) + _conjuncts(predicate.rhs)
+    return [predicate]
+
+
+def _fields_used(expr, child):
+    """ The names of the fields of ``child`` used by ``expr``
+
+    Returns ``None`` if ``expr`` uses ``child`` other than through fields.
+    """
+    names = set()
+    stack = [expr]
+    while stack:
+        e = stack.pop()
+        if isinstance(e, Field) and e._child.isidentical(child):
+            names.add(e._name)
+        elif e.isidentical(child):
+            return None
+        else:
+            stack.extend(i for i in e._inputs if isinstance(i, Node))
+    return names
+
+
+def _field_source(child, name):
+    """ Field ``name`` of ``child`` written in terms of the input of ``child``
+
+    >>> t = symbol('t', 'var * {x: int, y: int}')
+    >>> _field_source(t.relabel(x='a'), 'a')
+    t.x
+    >>> _field_source(merge(t.x, z=t.x + t.y), 'z')
+    t.x + t.y
+    """
+    if isinstance(child, ReLabel):
+        original = dict((new, old) for old, new in child.labels)
+        return child._child[original.get(name, name)]
+    if isinstance(child, (Projection, Merge)):
+        source = child._get_field(name)
+        return source._child if isinstance(source, Label) else source
+    raise NotImplementedError()
+
+
+def _predicate_on_inputs(predicate, child):
+    """ Rewrite ``predicate`` on the rows of ``child`` to use the fields that
+    the fields of ``child`` come from
+
+    Raises ``NotImplementedError`` when ``predicate`` uses the records of
+    ``child`` in some other way.
+
+    >>> t = symbol('t', 'var * {x: int, y: int}')
+    >>> r = t.relabel(x='a')
+    >>> _predicate_on_inputs(r.a > r.y, r)
+    t.x > t.y
+    """
+    fields = [e for e in predicate._subterms()
+              if isinstance(e, Field) and e._child.isidentical(child)]
+    result = predicate._subs(dict((f, _field_source(child, f._name))
+                                  for f in fields))
+    if isinstance(child.dshape.measure, Record) and child in result:
+        raise NotImplementedError()
+    return result
+
+
+@dispatch(Expr, object)
+def _push_selection(child, predicate, elemwise=False):
+    """ Rewrite ``child[predicate]`` with the filter applied further down
+
+    Raises ``NotImplementedError`` when the selection cannot be moved.
+    """
+    raise NotImplementedError()
+
+
+@dispatch((Sort, Distinct), object)
+def _push_selection(child, predicate, elemwise=False):
+    if getattr(child, 'on', None) or not _rowwise(predicate, child):
+        # distinct on a subset of columns keeps the first row of each group,
+        # so filtering first could change which row is kept
+        raise NotImplementedError()
+    grandchild = child._child
+    pushed = _push(Selection(grandchild,
+                             predicate._subs({child: grandchild})),
+                   elemwise)
+    return child._subs({grandchild: pushed})
+
+
+@dispatch(ElemWise, object)
+def _push_selection(child, predicate, elemwise=False):
+    inputs = [i for i in child._inputs
+              if isinstance(i, Expr) and len(i.dshape.shape) == 1]
+    if not inputs or len(child.dshape.shape) != 1:
+        raise NotImplementedError()
+    try:
+        base = common_subexpression(*inputs)
+    except ValueError:
+        raise NotImplementedError()
+    predicate = _predicate_on_inputs(predicate, child)
+    if not (_rowwise(child, base) and _rowwise(predicate, base)):
+        raise NotImplementedError()
+    selection = Selection(base, predicate)
+    pushed = _push(selection, elemwise)
+    if not elemwise and pushed is selection:
+        # only worth it on the way to a sort, distinct or join
+        raise NotImplementedError()
+    return child._subs({base: pushed})
+
+
+def _join_sides(expr):
+    """ Where each field of the join ``expr`` may be filtered before joining
+
+    Returns a dict mapping each output field to a dict from side (``0`` for
+    the left, ``1`` for the right) to the name of the field on that side.
+    Fields whose filters cannot be moved below the join, such as fields
+    that are filled with missing values by an outer join, map to ``{}``.
+
+    >>> a = symbol('a', 'var * {id: int, x: int}')
+    >>> b = symbol('b', 'var * {id: int, x: int}')
+    >>> sides = _join_sides(join(a, b, 'id', how='left'))
+    >>> sorted(sides.items())
+    [('id', {0: 'id'}), ('x_left', {0: 'x'}), ('x_right', {})]
+    """
+    allowed = dict(inner=(0, 1), left=(0,), right=(1,)).get(expr.how, ())
+    return dict((name, dict((side, f) for side, f in sources.items()
+                            if side in allowed))
+                for name, sources in _join_fields(expr).items())
+
+
+@dispatch(Join, object)
+def _push_selection(child, predicate, elemwise=False):
+    sides = _join_sides(child)
+    operands = child.lhs, child.rhs
+    pushed = [], []
+    rest = []
+    for term in _conjuncts(predicate):
+        names = _fields_used(term, child) if _rowwise(term, child) else None
+        targets = (set.intersection(*(set(sides[n]) for n in names))
+                   if names else ())
+        if not targets:
+            rest.append(term)
+            continue
+        for side in targets:
+            operand = operands[side]
+            pushed[side].append(term._subs(dict(
+                (child[n], operand[sides[n][side]]) for n in names
+            )))
+    if not builtins.any(pushed):
+        raise NotImplementedError()
+
+    lhs, rhs = (_push(Selection(operand, reduce(operator.and_, terms)),
+                      elemwise)
+                if terms else operand
+                for operand, terms in zip(operands, pushed))
+    joined = type(child)(lhs, rhs, *child._args[2:])
+    if not rest:
+        return joined
+    return Selection(joined, reduce(operator.and_, rest)._subs({child: joined}))
+
+
+@dispatch(Head)
+def fuse_top_k(expr):
+    """ Replace sorts followed by heads with ``TopK`` nodes
+
+    Backends that implement ``TopK`` can then find the first elements without
+    sorting all of the data.
+
+    >>> t = symbol('t', 'var * {name: string, amount: int}')
+    >>> expr = fuse_top_k(t.sort('amount', ascending=False).head(5).name)
+    >>> expr
+    t.sort('amount', ascending=False).head(5).name
+    >>> type(expr._child).__name__
+    'TopK'
+    """
+    child = fuse_top_k(expr._child)
+    if isinstance(child, Sort):
+        return TopK(child._child, child._key, child.ascending, expr.n)
+    return expr._subs({expr._child: child})
+
+
+@dispatch(Expr)
+def fuse_top_k(expr):
+    return expr._subs(dict((e, fuse_top_k(e)) for e in expr._inputs))
+
+
+def simplify(expr):
+    """ Fold constants and remove operations that do nothing
+
+    Rewrites are only made when they keep the datashape of each rewritten
+    node, and its name if it has a scalar measure, so e.g. ``t.x * 1`` is
+    kept when it promotes an ``int32`` column to ``int64``.
+
+    >>> t = symbol('t', 'var * {x: int64, y: float64, p: bool}')
+    >>> simplify(t.x * 1 + 0)
+    t.x
+    >>> simplify(t.x + 1 + 2 - 4)
+    t.x - 1
+    >>> simplify(~~(t.y > 3) & True)
+    t.y > 3
+    >>> simplify(t.relabel(x='a').relabel(a='x'))
+    t
+    """
+    return _simplify_tree(expr, {})
+
+
+def _simplify_tree(expr, memo):
+    key = id(expr)
+    if key in memo:
+        return memo[key][1]
+    if not isinstance(expr, Expr):
+        return expr
+    inputs = [i for i in expr._inputs if isinstance(i, Expr)]
+    new = expr._subs(dict((i, _simplify_tree(i, memo)) for i in inputs))
+    while True:
+        try:
+            simpler = _simplify(new)
+        except NotImplementedError:
+            break
+        if not (isinstance(simpler, Expr) and
+                simpler.dshape == expr.dshape and
+                (not isscalar(expr.dshape.measure) or
+                 simpler._name == expr._name)):
+            break
+        new = simpler
+    memo[key] = expr, new  # keep expr alive so that its id is not reused
+    return new
+
+
+def _is_constant(value, constant):
+    """ Whether ``value`` is the literal ``constant``, and not an expression
+
+    >>> _is_constant(1.0, 1)
+    True
+    >>> _is_constant(True, 1)
+    False
+    """
+    return (not isinstance(value, Node) and
+            isinstance(value, bool) == isinstance(constant, bool) and
+            isinstance(value, numbers.Number) and value == constant)
+
+
+def _is_integer(value):
+    return (isinstance(value, numbers.Integral) and
+            not isinstance(value, bool))
+
+
+def _integral(expr):
+    """ Whether ``expr`` holds integers, where regrouping constants is exact
+    """
+    return (isinstance(expr, Expr) and
+            getattr(expr.schema, 'measure', None) in integral.types)
+
+
+def _offset(expr):
+    """ Split ``expr`` into a child and an integer added to it, if it is an
+    integer addition or subtraction """
+    if (isinstance(expr, (Add, Sub)) and _is_integer(expr.rhs) and
+            _integral(expr.lhs)):
+        return expr.lhs, expr.rhs if isinstance(expr, Add) else -expr.rhs
+    return None, None
+
+
+@dispatch(Expr)
+def _simplify(expr):
+    """ A simpler but equivalent version of a node
+
+    Raises ``NotImplementedError`` when there is nothing to simplify.
+    """
+    raise NotImplementedError()
+
+
+@dispatch((Add, Sub))
+def _simplify(expr):
+    if _is_constant(expr.rhs, 0):
+        return expr.lhs
+    if isinstance(expr, Add) and _is_constant(expr.lhs, 0):
+        return expr.rhs
+    child, outer = _offset(expr)
+    grandchild, inner = _offset(child)
+    if grandchild is None:
+        raise NotImplementedError()
+    total = inner + outer
+    if total == 0:
+        return grandchild
+    return Add(grandchild, total) if total > 0 else Sub(grandchild, -total)
+
+
+@dispatch(Mult)
+def _simplify(expr):
+    if _is_constant(expr.rhs, 1):
+        return expr.lhs
+    if _is_constant(expr.lhs, 1):
+        return expr.rhs
+    if (isinstance(expr.lhs, Mult) and _is_integer(expr.rhs) and
+            _is_integer(expr.lhs.rhs) and _integral(expr.lhs.lhs)):
+        return Mult(expr.lhs.lhs, expr.lhs.rhs * expr.rhs)
+    raise NotImplementedError()
+
+
+@dispatch((Div, FloorDiv, Pow))
+def _simplify(expr):
+    if _is_constant(expr.rhs, 1):
+        return expr.lhs
+    raise NotImplementedError()
+
+
+@dispatch((USub, Not))
+def _simplify(expr):
+    if type(expr._child) is type(expr):
+        return expr._child._child
+    raise NotImplementedError()
+
+
+@dispatch(And)
+def _simplify(expr):
+    if _is_constant(expr.rhs, True):
+        return expr.lhs
+    if _is_constant(expr.lhs, True):
+        return expr.rhs
+    if isinstance(expr.rhs, Node) and expr.rhs.isidentical(expr.lhs):
+        return expr.lhs
+    raise NotImplementedError()
+
+
+@dispatch(Or)
+def _simplify(expr):
+    if _is_constant(expr.rhs, False):
+        return expr.lhs
+    if _is_constant(expr.lhs, False):
+        return expr.rhs
+    if isinstance(expr.rhs, Node) and expr.rhs.isidentical(expr.lhs):
+        return expr.lhs
+    raise NotImplementedError()
+
+
+@dispatch((Eq, Ne))
+def _simplify(expr):
+    # p == True and p != False are p itself for boolean p
+    if _is_constant(expr.rhs, isinstance(expr, Eq)):
+        return expr.lhs
+    raise NotImplementedError()
+
+
+@dispatch(Label)
+def _simplify(expr):
+    child = expr._child
+    if isinstance(child, Label):
+        return Label(child._child, expr.label)
+    if child._name == expr.label:
+        return child
+    raise NotImplementedError()
+
+
+@dispatch(ReLabel)
+def _simplify(expr):
+    child = expr._child
+    labels = dict(expr.labels)
+    if isinstance(child, ReLabel):
+        # compose the two renamings, dropping fields renamed back
+        inner = dict(child.labels)
+        labels = dict((old, labels.get(new, new))
+                      for old, new in ((f, inner.get(f, f))
+                                       for f in child._child.fields))
+        return relabel(child._child, labels)
+    if builtins.all(old == new for old, new in labels.items()):
+        return child
+    raise NotImplementedError()
+
+
+@dispatch(Projection)
+def _simplify(expr):
+    child = expr._child
+    if isinstance(child, Projection):
+        return Projection(child._child, expr._fields)
+    if list(expr.fields) == list(child.fields):
+        return child
+    raise NotImplementedError()
+
+
+@dispatch(Field)
+def _simplify(expr):
+    if isinstance(expr._child, Projection):
+        return Field(expr._child._child, expr._name)
+    raise NotImplementedError()
@@ -22,6 +22,9 @@ class Reduction(Expr):
 
         sum, min, max, any, all, mean, var, std, count, nunique
 
+    as well as ``approx_nunique``, an estimate of ``nunique``, and
+    ``quantile``.
+
     Examples
     --------
 
@@ -139,6 +142,52 @@ class mean(FloatingReduction):
     pass
 
 
+class quantile(FloatingReduction):
+
+    """ The ``q`` quantile, interpolating linearly between elements
+
+    Computed exactly in memory.  On chunked data it is estimated from
+    mergeable t-digest sketches of the chunks, see ``blaze.expr.split``.
+
+    Parameters
+    ----------
+    child : Expr
+        An expression
+    q : float, optional
+        The quantile to compute, between 0 and 1
+
+    Examples
+    --------
+    >>> from blaze import symbol
+    >>> t = symbol('t', 'var * {name: string, amount: float64}')
+    >>> t.amount.quantile(0.9)
+    quantile(t.amount, q=0.9)
+    >>> t.amount.median()
+    quantile(t.amount, q=0.5)
+
+    See Also
+    --------
+    median
+    """
+    __slots__ = '_hash', '_child', 'q', 'axis', 'keepdims'
+
+    def __init__(self, child, q=0.5, *args, **kwargs):
+        if not 0 <= q <= 1:
+            raise ValueError('q must be between 0 and 1, got %r' % q)
+        self.q = q
+        super(quantile, self).__init__(child, *args, **kwargs)
+
+
+def median(expr, axis=None, keepdims=False):
+    """ The median, the 0.5 quantile
+
+    See Also
+    --------
+    quantile
+    """
+    return quantile(expr, 0.5, axis=axis, keepdims=keepdims)
+
+
 class var(FloatingReduction):
 
     """Variance
@@ -194,8 +243,92 @@ class count(Reduction):
 
 
 class nunique(Reduction):
+
+    """ The number of distinct elements
+
+    ``approx=True`` gives an ``approx_nunique`` instead
+
+    >>> from blaze import symbol
+    >>> t = symbol('t', 'var * {name: string, amount: int}')
+    >>> t.name.nunique(approx=True)
+    approx_nunique(t.name, precision=12)
+    """
     schema = dshape(ct.int32)
 
+    def __new__(cls, *args, **kwargs):
+        if kwargs.pop('approx', False):
+            return approx_nunique(*args, **kwargs)
+        return super(nunique, cls).__new__(cls)
+
+    def __init__(self, _child, axis=None, keepdims=False, approx=False):
+        super(nunique, self).__init__(_child, axis=axis, keepdims=keepdims)
+
+
+class approx_nunique(Reduction):
+
+    """ An estimate of the number of distinct, non-null elements
+
+    The estimate comes from a HyperLogLog sketch with ``2 ** precision``
+    registers and has a relative error of about ``1.04 / sqrt(2 **
+    precision)``, 1.6% at the default precision of 12.  Unlike the sets of
+    distinct elements behind ``nunique``, sketches of chunks of data have a
+    fixed size and merge cheaply.
+
+    SQL databases that can estimate the number of distinct values of a column
+    do so with their own functions, others count them exactly, as do all
+    databases for the distinct rows of a table.
+
+    Parameters
+    ----------
+    child : Expr
+        An expression
+    precision : int, optional
+        The base 2 logarithm of the number of registers, from 4 to 16
+    """
+    __slots__ = '_hash', '_child', 'precision', 'axis', 'keepdims'
+    schema = dshape(ct.int32)
+
+    def __init__(self, child, precision=12, *args, **kwargs):
+        if not 4 <= precision <= 16:
+            raise ValueError('precision must be between 4 and 16, got %r' %
+                             precision)
+        self.precision = precision
+        super(approx_nunique, self).__init__(child, *args, **kwargs)
+
+
+class hll_sketch(Expr):
+
+    """ The registers of a HyperLogLog sketch of a collection
+
+    Computed on each chunk to split ``approx_nunique``, see
+    ``blaze.expr.split``.
+    """
+    __slots__ = '_hash', '_child', 'precision'
+
+    def _dshape(self):
+        return DataShape(datashape.Fixed(2 ** self.precision), ct.uint8)
+
+
+class hll_merge(Expr):
+
+    """ Merge the concatenated registers of several HyperLogLog sketches """
+    __slots__ = '_hash', '_child', 'precision'
+
+    def _dshape(self):
+        return DataShape(datashape.Fixed(2 ** self.precision), ct.uint8)
+
+
+class hll_count(Reduction):
+
+    """ The estimate of a HyperLogLog sketch, given the concatenated
+    registers of one or more sketches """
+    __slots__ = '_hash', '_child', 'precision', 'axis', 'keepdims'
+    schema = dshape(ct.int32)
+
+    def __init__(self, child, precision, *args, **kwargs):
+        self.precision = precision
+        super(hll_count, self).__init__(child, *args, **kwargs)
+
 
 class nelements(Reduction):
 
@@ -215,6 +348,42 @@ class nelements(Reduction):
     schema = dshape(ct.int32)
 
 
+_tdigest_dshape = dshape('var * {mean: float64, weight: float64}')
+
+
+class tdigest_sketch(Expr):
+
+    """ The centroids of a t-digest sketch of a collection
+
+    Computed on each chunk to split ``quantile``, see ``blaze.expr.split``.
+    """
+    __slots__ = '_hash', '_child', 'compression'
+
+    def _dshape(self):
+        return _tdigest_dshape
+
+
+class tdigest_merge(Expr):
+
+    """ Merge the concatenated centroids of several t-digest sketches """
+    __slots__ = '_hash', '_child', 'compression'
+
+    def _dshape(self):
+        return _tdigest_dshape
+
+
+class tdigest_quantile(Reduction):
+
+    """ The ``q`` quantile estimated from the concatenated centroids of one
+    or more t-digest sketches """
+    __slots__ = '_hash', '_child', 'q', 'axis', 'keepdims'
+    schema = dshape(ct.float64)
+
+    def __init__(self, child, q, *args, **kwargs):
+        self.q = q
+        super(tdigest_quantile, self).__init__(child, *args, **kwargs)
+
+
 def nrows(expr):
     return nelements(expr, axis=(0,))
 
@@ -320,11 +489,11 @@ dshape_method_list.extend([
                   isdatelike(ds))),
      set([min, max])),
     (lambda ds: len(ds.shape) == 1,
-     set([nrows, nunique])),
+     set([nrows, nunique, approx_nunique])),
     (lambda ds: iscollection(ds) and isboolean(ds),
      set([any, all])),
     (lambda ds: iscollection(ds) and (isnumeric(ds) or isboolean(ds)),
-     set([mean, sum, std, var, vnorm])),
+     set([mean, sum, std, var, vnorm, quantile, median])),
 ])
 
 method_properties.update([nrows])
@@ -30,8 +30,11 @@ We needed the following expressions
 
 This module performs this transformation for a wide array of chunkable
 expressions.  It supports elementwise operations, reductions,
-split-apply-combine, and selections.  It notably does not support sorting,
-joining, or slicing.
+split-apply-combine, selections and the first elements of a sort (``TopK``).
+``approx_nunique`` and ``quantile`` are split into fixed size sketches of each
+chunk, so on chunked data ``quantile`` is an estimate.
+It notably does not support full sorts, joining, or slicing.  Full sorts of
+chunked data are handled by ``blaze.compute.external_sort`` instead.
 
 If explicit chunksizes are given it can also reason about the size and shape of
 the intermediate aggregate.  It can also do this in N-Dimensions.
@@ -55,10 +58,10 @@ from .table import *
 from ..dispatch import dispatch
 from ..compatibility import builtins
 
-good_to_split = (Reduction, Summary, By, Distinct)
+good_to_split = (Reduction, Summary, By, Distinct, TopK)
 can_split = good_to_split + (Like, Selection, ElemWise, Apply)
 
-__all__ = ['path_split', 'split']
+__all__ = ['path_split', 'split', 'combiner']
 
 def path_split(leaf, expr):
     """ Find the right place in the expression tree/line to parallelize
@@ -208,6 +211,18 @@ def _split_agg(expr, leaf=None, agg=None):
     return agg.distinct()
 
 
+@dispatch(TopK)
+def _split_chunk(expr, leaf=None, chunk=None, **kwargs):
+    return expr._subs({leaf: chunk})
+
+@dispatch(TopK)
+def _split_agg(expr, leaf=None, agg=None):
+    key = expr._key
+    if isinstance(key, Expr):
+        key = key._subs({expr._child: agg})
+    return TopK(agg, key, expr.ascending, expr.n)
+
+
 @dispatch(nunique)
 def _split_chunk(expr, leaf=None, chunk=None, **kwargs):
     return (expr._child
@@ -219,6 +234,28 @@ def _split_agg(expr, leaf=None, agg=None):
     return agg.distinct().count(keepdims=expr.keepdims)
 
 
+@dispatch(approx_nunique)
+def _split_chunk(expr, leaf=None, chunk=None, **kwargs):
+    return hll_sketch(expr._child._subs({leaf: chunk}), expr.precision)
+
+@dispatch(approx_nunique)
+def _split_agg(expr, leaf=None, agg=None):
+    return hll_count(agg, expr.precision, keepdims=expr.keepdims)
+
+
+# The compression of the t-digest sketches that split ``quantile``
+tdigest_compression = 100
+
+@dispatch(quantile)
+def _split_chunk(expr, leaf=None, chunk=None, **kwargs):
+    return tdigest_sketch(expr._child._subs({leaf: chunk}),
+                          tdigest_compression)
+
+@dispatch(quantile)
+def _split_agg(expr, leaf=None, agg=None):
+    return tdigest_quantile(agg, expr.q, keepdims=expr.keepdims)
+
+
 @dispatch(Summary)
 def _split_chunk(expr, leaf=None, chunk=None, keepdims=True):
     exprs = [(name, split(leaf, val, chunk=chunk,
@@ -298,6 +335,93 @@ def _split_agg(expr, leaf=None, agg=None):
     return agg
 
 
+def combiner(leaf, expr, agg):
+    """ Expression that combines concatenated chunk results into one
+
+    The result of the combining expression has the same form as the results
+    of each chunk, so chunk results can be combined as they arrive, a few at a
+    time, rather than all concatenated before the aggregate expression is
+    computed.  Returns ``None`` when there is nothing to combine, e.g. for
+    element-wise expressions.
+
+    >>> t = symbol('t', 'var * {name: string, amount: int, id: int}')
+    >>> (chunk, chunk_expr), (agg, agg_expr) = split(t, t.id.count())
+    >>> combiner(t, t.id.count(), agg)
+    sum(aggregate, keepdims=True)
+    """
+    center = path_split(leaf, expr)
+    try:
+        return _split_combine(center, leaf=leaf, agg=agg)
+    except NotImplementedError:
+        return None
+
+
+def _combine_summary(s, agg, keepdims):
+    """ Combine the results of ``s``, a summary of reductions on chunks """
+    if not builtins.all(type(v) in reductions for v in s.values):
+        raise NotImplementedError()
+    return summary(keepdims=keepdims,
+                   **dict((name, reductions[type(v)][1](agg[name]))
+                          for name, v in zip(s.fields, s.values)))
+
+
+@dispatch(Expr)
+def _split_combine(expr, leaf=None, agg=None):
+    raise NotImplementedError()
+
+
+@dispatch(tuple(reductions))
+def _split_combine(expr, leaf=None, agg=None):
+    a, b = reductions[type(expr)]
+    return b(agg, axis=expr.axis, keepdims=True)
+
+
+@dispatch((mean, std, var))
+def _split_combine(expr, leaf=None, agg=None):
+    chunk = _split_chunk(expr, leaf=leaf, chunk=leaf)
+    return summary(keepdims=True, axis=expr.axis,
+                   **dict((name, agg[name].sum(axis=expr.axis))
+                          for name in chunk.fields))
+
+
+@dispatch((Distinct, nunique))
+def _split_combine(expr, leaf=None, agg=None):
+    return agg.distinct()
+
+
+@dispatch(approx_nunique)
+def _split_combine(expr, leaf=None, agg=None):
+    return hll_merge(agg, expr.precision)
+
+
+@dispatch(quantile)
+def _split_combine(expr, leaf=None, agg=None):
+    return tdigest_merge(agg, tdigest_compression)
+
+
+@dispatch(TopK)
+def _split_combine(expr, leaf=None, agg=None):
+    return _split_agg(expr, leaf=leaf, agg=agg)
+
+
+@dispatch(Summary)
+def _split_combine(expr, leaf=None, agg=None):
+    return _combine_summary(_split_chunk(expr, leaf=leaf, chunk=leaf), agg,
+                            keepdims=True)
+
+
+@dispatch(By)
+def _split_combine(expr, leaf=None, agg=None):
+    chunk_apply = _split_chunk(expr.apply, leaf=leaf, chunk=leaf,
+                               keepdims=False)
+    ngroup = len(expr.grouper.fields)
+    if isscalar(expr.grouper.dshape.measure):
+        grouper = agg[agg.fields[0]]
+    else:
+        grouper = agg[list(agg.fields[:ngroup])]
+    return by(grouper, _combine_summary(chunk_apply, agg, keepdims=False))
+
+
 from datashape import Fixed
 from math import ceil
 
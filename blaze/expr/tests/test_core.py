@@ -1,8 +1,16 @@
 from __future__ import absolute_import, division, print_function
 
+import gc
+import os
+import subprocess
+import sys
+import weakref
+
+import pytest
+
 from datashape import dshape
 from blaze.expr import *
-from blaze.expr.core import subs
+from blaze.expr.core import subs, shared_subterms
 
 
 def test_subs():
@@ -62,3 +70,139 @@ def test_hash():
 def test_subs_on_datashape():
     assert subs(dshape('3 * {foo: int}'), {'foo': 'bar'}) == dshape('3 * {bar: int}')
 """
+
+
+def test_shared_subterms():
+    t = symbol('t', 'var * {x: int, y: int}')
+    assert shared_subterms(t.x.sum(), t.x.sum() / t.x.count()) == [
+        t.x, t.x.sum()]
+    assert shared_subterms(t.x + 1, t.y) == []
+    assert shared_subterms((t.x + 1) * (t.x + 1)) == [t.x + 1]
+
+
+@pytest.fixture
+def interning():
+    old = set_interning(True)
+    try:
+        yield
+    finally:
+        set_interning(old)
+
+
+def test_interning_off_by_default():
+    assert not get_interning()
+    t = symbol('t', 'var * {x: int, y: int}')
+    assert (t.x + 1) is not (t.x + 1)
+
+
+def test_interning_shares_nodes(interning):
+    t = symbol('t', 'var * {x: int, y: int}')
+    s = symbol('s', 'var * {x: int, y: int}')
+    expr = (t.x + 1).sum()
+    assert expr is (t.x + 1).sum()
+    assert expr._child is (t.x + 1)
+    assert expr._subs({t: s})._subs({s: t}) is expr
+    assert expr.isidentical((t.x + 1).sum())
+    assert not expr.isidentical((t.x + 2).sum())
+    assert (t.x + 1).dshape is expr._child.dshape
+
+
+def test_interning_tells_equal_values_of_different_types_apart(interning):
+    t = symbol('t', 'var * {x: int, y: int}')
+    assert (t.x + 1) is (t.x + 1)
+    assert (t.x + 1.0) is not (t.x + 1)
+    assert (t.x + 1.0).dshape != (t.x + 1).dshape
+    assert (t.x * True) is not (t.x * 1)
+    assert (t.x + 1.0).rhs == 1.0 and isinstance((t.x + 1.0).rhs, float)
+
+
+def test_isidentical_does_not_depend_on_interning():
+    t = symbol('t', 'var * {x: int, y: int}')
+    for on in [False, True]:
+        old = set_interning(on)
+        try:
+            assert (t.x + 1).isidentical(t.x + 1.0)
+            assert not (t.x + 1).isidentical(t.x + 2)
+        finally:
+            set_interning(old)
+    assert (t.x + 1) is not (t.x + 1)
+
+
+def test_interning_holds_nodes_weakly(interning):
+    t = symbol('t', 'var * {x: int, y: int}')
+    ref = weakref.ref(t.x * 12345)
+    gc.collect()
+    assert ref() is None
+
+
+def test_digest():
+    t = symbol('t', 'var * {x: int, y: int, z: float64}')
+    s = symbol('s', 'var * {x: int, y: int, z: float64}')
+    expr = t[t.x > 1].y.sum()
+    assert digest(expr) == digest(t[t.x > 1].y.sum())
+    assert digest(expr) == expr._digest  # cached on the node
+
+    others = [s[s.x > 1].y.sum(), t[t.x > 1].z.sum(), t[t.x >= 1].y.sum(),
+              t[t.x > 1.0].y.sum(), t[t.x > 1].y.max(),
+              t.x.map(lambda x: x + 1), t.x.map(lambda x: x + 2)]
+    digests = [digest(e) for e in [expr] + others]
+    assert len(set(digests)) == len(digests)
+
+
+def test_digest_is_stable_across_processes():
+    code = ("from blaze.expr import symbol, digest;"
+            "t = symbol('t', 'var * {name: string, x: int}');"
+            "print(digest(t[t.name == 'Alice'].x.sum()))")
+    env = dict(os.environ, PYTHONHASHSEED='random')
+    result = subprocess.check_output([sys.executable, '-c', code], env=env)
+    t = symbol('t', 'var * {name: string, x: int}')
+    assert result.decode().strip() == digest(t[t.name == 'Alice'].x.sum())
+
+
+def test_path_takes_leftmost_route():
+    t = symbol('t', 'var * {x: int, y: int}')
+    expr = (t.x + 1) * (t.x + t.y)
+    assert list(path(expr, t.x)) == [expr, t.x + 1, t.x]
+    assert list(path(expr, t.y)) == [expr, t.x + t.y, t.y]
+    assert list(path(expr, t)) == [expr, t.x + 1, t.x, t]
+    assert list(path(t.x, t.y)) == [t.x]
+
+
+def test_subterm_index_is_cached():
+    t = symbol('t', 'var * {x: int, y: int}')
+    v = symbol('v', 'var * {x: int, y: int}')
+    expr = (t.x + v.x).sum() + t.y.max()
+    assert expr._subterm_index() is expr._subterm_index()
+    assert t.y in expr and v.x in expr and t.x + v.x in expr
+    assert v.y not in expr
+    assert expr._leaves() == [t, v]
+    assert expr._leaves() is not expr._leaves()  # callers may mutate them
+
+
+def test_subs_shares_unchanged_subtrees():
+    t = symbol('t', 'var * {x: int, y: int}')
+    s = symbol('s', 'var * {x: int, y: int}')
+    v = symbol('v', 'var * {x: int, y: int}')
+    expr = (t.x + 1).sum() + s.y.max()
+    assert subs(expr, {v: t}) is expr
+    result = subs(expr, {s: v})
+    assert result.isidentical((t.x + 1).sum() + v.y.max())
+    assert result.lhs is expr.lhs
+
+    shared = t.x + 1
+    expr = shared * shared
+    result = subs(expr, {t: s})
+    assert result.lhs is result.rhs
+
+
+def test_digest_of_sets_is_stable_across_processes():
+    code = ("from blaze.expr import symbol, digest;"
+            "t = symbol('t', 'var * {name: string, x: int}');"
+            "print(digest(t.name.isin(['a', 'b', 'c', 'd', 'e'])))")
+    t = symbol('t', 'var * {name: string, x: int}')
+    expected = digest(t.name.isin(['a', 'b', 'c', 'd', 'e']))
+    for seed in ['0', '1', '2', '3']:
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        result = subprocess.check_output([sys.executable, '-c', code],
+                                         env=env)
+        assert result.decode().strip() == expected
@@ -187,3 +187,39 @@ def test_pickle_roundtrip():
     t = symbol('t', 'var * int64')
     expr = (t + 1).mean()  # some expression with more than one node.
     assert expr.isidentical(pickle.loads(pickle.dumps(expr)))
+
+
+def test_method_tables_are_shared_between_records():
+    from blaze.expr.expressions import methods_of
+    t = symbol('t', 'var * {a: int32, b: string}')
+    s = symbol('s', 'var * {x: float64, y: int32, z: string}')
+    assert methods_of(t.dshape) is methods_of(s.dshape)
+    assert methods_of(t.a.dshape) is not methods_of(t.b.dshape)
+    assert 'strlen' in methods_of(t.b.dshape)
+    assert 'strlen' not in methods_of(t.a.dshape)
+
+
+def test_getattr_on_wide_record():
+    names = ['c%d' % i for i in range(500)] + ['a b', 'count']
+    t = symbol('t', 'var * {%s}' % ', '.join('"%s": int64' % n
+                                             for n in names))
+    assert t.c250.isidentical(t['c250'])
+    assert t.a_b.isidentical(t['a b'])
+    assert isinstance(t.count, types.MethodType)  # methods win over fields
+    assert 'c499' in dir(t) and 'a_b' in dir(t)
+    with pytest.raises(AttributeError):
+        t.c500
+
+
+def test_projection_on_wide_record():
+    names = ['c%d' % i for i in range(2000)]
+    t = symbol('t', 'var * {%s}' % ', '.join('%s: int32' % n for n in names))
+    p = t[['c1999', 'c3']]
+    assert p.fields == ['c1999', 'c3']
+    assert p.schema == dshape('{c1999: int32, c3: int32}')
+    assert p['c3'].isidentical(t.c3)
+    assert t.c1999.dshape == dshape('var * int32')
+    with pytest.raises(ValueError):
+        p['c4']
+    with pytest.raises(ValueError):
+        t[['c3', 'c2000']]
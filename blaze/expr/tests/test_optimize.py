@@ -1,4 +1,7 @@
-from blaze.expr.optimize import lean_projection, _lean
+import pytest
+
+from blaze.expr.optimize import (lean_projection, _lean, push_selections,
+                                 fuse_top_k, simplify)
 from blaze.expr import *
 
 t = symbol('t', 'var * {x: int, y: int, z: int, w: int}')
@@ -101,3 +104,180 @@ def test_like():
 
     result = lean_projection(expr)
     assert result._child._child.isidentical(t[['name', 'y']])
+
+
+def test_lean_projection_on_wide_table():
+    names = ['c%d' % i for i in range(2000)]
+    t = symbol('t', 'var * {%s}' % ', '.join('%s: int32' % n for n in names))
+    cols = ['c1500', 'c7', 'c300']
+    expr = t[cols].sort('c7').c300
+    assert lean_projection(expr).isidentical(
+        t[['c300', 'c7']][['c7', 'c300']].sort('c7').c300)
+    assert lean_projection(t[names].c5).isidentical(t.c5)
+
+
+def test_push_selections_through_sort_and_distinct():
+    s = t.sort('y')
+    assert push_selections(s[s.x > 0]).isidentical(t[t.x > 0].sort('y'))
+
+    d = t.distinct()
+    assert push_selections(d[d.x > 0]).isidentical(t[t.x > 0].distinct())
+
+    d = t.distinct('x')
+    assert push_selections(d[d.y > 0]).isidentical(d[d.y > 0])
+
+
+def test_push_selections_through_elemwise():
+    r = t.relabel(x='a')
+    expr = r[r.a > 0]
+    assert push_selections(expr, elemwise=True).isidentical(
+        t[t.x > 0].relabel(x='a'))
+
+    p = t[['x', 'y']]
+    assert push_selections(p[p.x > 0], elemwise=True).isidentical(
+        t[t.x > 0][['x', 'y']])
+
+    r = t.relabel(x='a', y='b')
+    assert push_selections(r[r.a > r.b], elemwise=True).isidentical(
+        t[t.x > t.y].relabel(x='a', y='b'))
+
+
+def test_push_selections_through_elemwise_only_to_reduce_rows():
+    p = t[['x', 'y']]
+    s = t.x * 2
+    for expr in [t.x[t.x > 0], p[p.x > 0], s[s > 10]]:
+        assert push_selections(expr).isidentical(expr)
+
+    p = t.sort('z')[['x', 'y']]
+    assert push_selections(p[p.x > 0]).isidentical(
+        t[t.x > 0].sort('z')[['x', 'y']])
+
+
+def test_pushed_selections_on_relabelled_fields_compute():
+    pd = pytest.importorskip('pandas')
+    from blaze import compute
+    df = pd.DataFrame({'x': [1, -2, 3], 'y': [4, 5, 6], 'z': [0, 0, 0],
+                       'w': [0, 0, 0]})
+    r = t.relabel(x='a')
+    expr = r[r.a > 0].y
+    optimized = lean_projection(push_selections(expr, elemwise=True))
+    assert list(compute(optimized, df)) == list(compute(expr, df)) == [4, 6]
+
+
+def test_push_selections_keeps_non_rowwise_predicates():
+    s = t.sort('y')
+    expr = s[s.x > s.x.mean()]
+    assert push_selections(expr).isidentical(expr)
+
+
+def test_push_selections_splits_join_predicates():
+    a = symbol('a', 'var * {id: int, x: int, y: int}')
+    b = symbol('b', 'var * {id: int, x: int, z: int}')
+
+    j = join(a, b, 'id')
+    expr = j[(j.x_left > 0) & (j.z < 5) & (j.id == 1) & (j.x_left > j.z)]
+    result = push_selections(expr)
+    joined = join(a[(a.x > 0) & (a.id == 1)], b[(b.z < 5) & (b.id == 1)],
+                  'id')
+    assert result.isidentical(joined[joined.x_left > joined.z])
+
+    j = join(a, b, 'id', how='left')
+    expr = j[(j.y > 0) & (j.z < 5) & (j.id == 1)]
+    result = push_selections(expr)
+    joined = join(a[(a.y > 0) & (a.id == 1)], b, 'id', how='left')
+    assert result.isidentical(joined[joined.z < 5])
+
+    j = join(a, b, 'id', how='outer')
+    expr = j[j.y > 0]
+    assert push_selections(expr).isidentical(expr)
+
+
+def test_push_selections_on_join_of_sorted_inputs():
+    a = symbol('a', 'var * {id: int, x: int}')
+    b = symbol('b', 'var * {id: int, z: int}')
+    j = join(a.sort('x'), b, 'id')
+    result = push_selections(j[j.x > 0])
+    assert result.isidentical(join(a[a.x > 0].sort('x'), b, 'id'))
+
+
+def test_lean_projection_through_join():
+    a = symbol('a', 'var * {id: int, x: int, y: int, w: int}')
+    b = symbol('b', 'var * {key: int, x: int, z: int, v: int}')
+
+    j = join(a, b, 'id', 'key')
+    result = lean_projection(j[['y', 'z']])
+    lean = join(a[['id', 'y']], b[['key', 'z']], 'id', 'key')
+    assert result.isidentical(lean[['y', 'z']])
+
+    # overlapping fields are kept on both sides to keep their suffixes
+    result = lean_projection(j.x_left)
+    lean = join(a[['id', 'x']], b[['key', 'x']], 'id', 'key')
+    assert result.isidentical(lean.x_left)
+
+
+def test_lean_projection_by_over_join():
+    a = symbol('a', 'var * {id: int, name: string, w: int}')
+    b = symbol('b', 'var * {id: int, amount: int, v: int}')
+    j = join(a, b, 'id')
+
+    result = lean_projection(by(j.name, total=j.amount.sum()))
+    lean = join(a[['id', 'name']], b[['amount', 'id']], 'id')
+    assert result.isidentical(by(lean.name, total=lean.amount.sum()))
+
+    result = lean_projection(summary(total=j.amount.sum(), n=j.name.count()))
+    assert result._child.isidentical(lean)
+
+
+def test_fuse_top_k():
+    expr = t.sort('y', ascending=False).head(3)
+    assert fuse_top_k(expr).isidentical(TopK(t, 'y', False, 3))
+
+    expr = (t.sort(['x', 'y']).head(3).z + 1).sum()
+    assert fuse_top_k(expr).isidentical((TopK(t, ('x', 'y'), True, 3).z + 1).sum())
+
+    expr = t.sort('y').x.head(3)
+    assert fuse_top_k(expr).isidentical(expr)
+
+
+def test_simplify_arithmetic():
+    s = symbol('s', 'var * {a: int64, b: float64, c: int32}')
+    assert simplify(s.a * 1 + 0).isidentical(s.a)
+    assert simplify(0 + 1 * s.b).isidentical(s.b)
+    assert simplify(s.b / 1 - 0).isidentical(s.b)
+    assert simplify(-(-s.a)).isidentical(s.a)
+    assert simplify((s.a + 2) - 2).isidentical(s.a)
+    assert simplify(s.a * 2 * 3).isidentical(s.a * 6)
+    assert simplify((s.a + s.a * 1).sum()).isidentical((s.a + s.a).sum())
+
+    # these change the type of the result
+    assert simplify(s.c * 1).isidentical(s.c * 1)
+    assert simplify(s.a / 1).isidentical(s.a / 1)
+    # floating point addition is not associative
+    assert simplify(s.b + 1 + 2).isidentical(s.b + 1 + 2)
+
+
+def test_simplify_predicates():
+    s = symbol('s', 'var * {a: int64, p: bool}')
+    pred = s.a > 3
+    assert simplify(~~pred).isidentical(pred)
+    assert simplify(pred & True).isidentical(pred)
+    assert simplify(True & pred).isidentical(pred)
+    assert simplify(pred | False).isidentical(pred)
+    assert simplify(pred & pred).isidentical(pred)
+    assert simplify(s.p == True).isidentical(s.p)
+    assert simplify(s.p != False).isidentical(s.p)
+    assert simplify(s[(s.a > 3) & True]).isidentical(s[s.a > 3])
+    assert simplify(pred & False).isidentical(pred & False)
+
+
+def test_simplify_labels_and_projections():
+    s = symbol('s', 'var * {a: int64, b: int64, c: int64}')
+    assert simplify(label(label(s.a, 'x'), 'y')).isidentical(s.a.label('y'))
+    assert simplify(label(s.a, 'a')).isidentical(s.a)
+    assert simplify(s.relabel(a='x').relabel(x='a')).isidentical(s)
+    assert simplify(s.relabel(a='x').relabel(x='y')).isidentical(
+        s.relabel(a='y'))
+    assert simplify(Projection(s, ('a', 'b', 'c'))).isidentical(s)
+    assert simplify(Projection(Projection(s, ('a', 'b')), ('b',))).isidentical(
+        s[['b']])
+    assert simplify(Field(Projection(s, ('a', 'b')), 'a')).isidentical(s.a)
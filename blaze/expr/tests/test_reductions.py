@@ -112,3 +112,27 @@ def test_timedelta_reduction(func):
     t = symbol('t', 'var * timedelta')
     method = getattr(t, func)
     assert_dshape_equal(method().dshape, dshape("timedelta"))
+
+
+def test_approx_nunique():
+    from blaze.expr import approx_nunique, nunique
+    t = symbol('t', 'var * {name: string, amount: int64}')
+    expr = t.name.nunique(approx=True, keepdims=True)
+    assert isinstance(expr, approx_nunique)
+    assert expr.isidentical(approx_nunique(t.name, keepdims=True))
+    assert expr.dshape == dshape('1 * int32')
+    assert isinstance(t.name.nunique(), nunique)
+    assert t.amount.approx_nunique(precision=8).precision == 8
+    with pytest.raises(ValueError):
+        approx_nunique(t.name, precision=2)
+
+
+def test_quantile():
+    from blaze.expr import quantile, median
+    t = symbol('t', 'var * {name: string, amount: int64}')
+    assert t.amount.median().isidentical(quantile(t.amount, 0.5))
+    assert t.amount.quantile(0.9).q == 0.9
+    assert t.amount.quantile(0.9).dshape == dshape('float64')
+    assert median(t.amount, keepdims=True).dshape == dshape('1 * float64')
+    with pytest.raises(ValueError):
+        t.amount.quantile(1.5)
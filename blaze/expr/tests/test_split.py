@@ -1,7 +1,7 @@
 import pytest
 from blaze.expr import (symbol, transform, by, count, summary, var, std, mean,
-                        sqrt, sum)
-from blaze.expr.split import split, path_split
+                        sqrt, sum, TopK, tdigest_sketch, tdigest_quantile)
+from blaze.expr.split import split, path_split, combiner
 from datashape import dshape
 from datashape.predicates import isscalar, isrecord, iscollection
 
@@ -137,6 +137,18 @@ def test_distinct():
     assert agg_expr.isidentical(count(agg.distinct()))
 
 
+def test_top_k():
+    expr = TopK(t, 'amount', False, 5)
+    (chunk, chunk_expr), (agg, agg_expr) = split(t, expr.name)
+
+    assert chunk_expr.isidentical(TopK(chunk, 'amount', False, 5))
+    assert agg_expr.isidentical(TopK(agg, 'amount', False, 5).name)
+
+    expr = TopK(t, -t.amount, True, 5)
+    (chunk, chunk_expr), (agg, agg_expr) = split(t, expr)
+    assert agg_expr.isidentical(TopK(agg, -agg.amount, True, 5))
+
+
 def test_summary():
     (chunk, chunk_expr), (agg, agg_expr) = split(t, summary(a=t.amount.count(),
                                                             b=t.id.sum() + 1))
@@ -351,3 +363,37 @@ def test_elemwise_with_multiple_paths():
     (chunk, chunk_expr), (agg, agg_expr) = split(s, expr)
     assert chunk_expr.isidentical(summary(x=chunk.x.sum(), y=chunk.y.sum()))
     assert agg_expr.isidentical(agg.x / agg.y)
+
+
+def test_combiner():
+    for expr in [t.amount.sum(), t.amount.mean(),
+                 summary(a=t.amount.count(), b=t.id.var()),
+                 by(t.name, total=t.amount.sum(), avg=t.id.mean()),
+                 t.name.distinct(), TopK(t, 'amount', False, 3)]:
+        (chunk, chunk_expr), (agg, agg_expr) = split(t, expr)
+        combine = combiner(t, expr, agg)
+        assert combine._leaves()[0].isidentical(agg)
+        assert combine.dshape.measure == chunk_expr.dshape.measure
+
+    expr = by(t.name, total=t.amount.sum())
+    (chunk, chunk_expr), (agg, agg_expr) = split(t, expr)
+    assert combiner(t, expr, agg).isidentical(
+        by(agg.name, total=agg.total.sum()))
+
+    assert combiner(t, t.amount + 1, symbol('agg', 'var * int32')) is None
+
+
+def test_approx_nunique():
+    expr = t.name.nunique(approx=True, precision=10)
+    (chunk, chunk_expr), (agg, agg_expr) = split(t, expr)
+    assert chunk_expr.dshape == dshape('1024 * uint8')
+    assert agg_expr.dshape == expr.dshape
+    assert combiner(t, expr, agg).dshape == chunk_expr.dshape
+
+
+def test_quantile():
+    expr = t.amount.quantile(0.9, keepdims=True)
+    (chunk, chunk_expr), (agg, agg_expr) = split(t, expr)
+    assert chunk_expr.isidentical(tdigest_sketch(chunk.amount, 100))
+    assert agg_expr.isidentical(tdigest_quantile(agg, 0.9, keepdims=True))
+    assert combiner(t, expr, agg).dshape == chunk_expr.dshape
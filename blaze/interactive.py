@@ -6,6 +6,7 @@ import datetime
 from functools import reduce, partial
 import itertools
 import operator
+import os
 import warnings
 
 import datashape
@@ -20,13 +21,14 @@ from pandas import DataFrame, Series, Timestamp
 
 from .expr import Expr, Symbol, ndim
 from .dispatch import dispatch
-from .compatibility import _strtypes
+from .compatibility import _strtypes, map
 
 
 __all__ = ['Data', 'Table', 'into', 'to_html']
 
 
-names = ('_%d' % i for i in itertools.count(1))
+# ``map`` rather than a generator, so that threads can share it
+names = map('_%d'.__mod__, itertools.count(1))
 not_an_iterator = []
 
 
@@ -96,6 +98,33 @@ class InteractiveSymbol(Symbol):
             data = id(data)
         return data, self.dshape, self._name
 
+    @property
+    def _digestargs(self):
+        return _identity(self.data), self.dshape, self._name
+
+
+def _identity(data):
+    """ What identifies ``data`` in every process, for ``digest``
+
+    Files are identified by their type and path, tables of a database by its
+    URL and their name, and anything else, e.g. data in memory, by itself.
+
+    >>> from odo.backends.csv import CSV
+    >>> from blaze.utils import example
+    >>> _identity(CSV(example('accounts.csv')))[0]
+    'CSV'
+    >>> _identity([1, 2, 3])
+    [1, 2, 3]
+    """
+    path = getattr(data, 'path', None)
+    if isinstance(path, _strtypes):
+        return type(data).__name__, os.path.abspath(path)
+    bind = getattr(data, 'bind', None)
+    if bind is not None and isinstance(getattr(data, 'name', None),
+                                       _strtypes):
+        return type(data).__name__, str(bind.url), data.name
+    return data
+
 
 @copydoc(InteractiveSymbol)
 def Data(data, dshape=None, name=None, fields=None, schema=None, **kwargs):
@@ -155,7 +184,7 @@ def Table(*args, **kwargs):
 
 
 @dispatch(InteractiveSymbol, dict)
-def _subs(o, d):
+def _subs(o, d, memo=None):
     return o
 
 
@@ -4,7 +4,6 @@ import collections
 from datetime import datetime
 import errno
 import functools
-from hashlib import md5
 import os
 import re
 import socket
@@ -24,7 +23,7 @@ from blaze.expr import utils as expr_utils
 
 from .serialization import json, all_formats
 from ..interactive import InteractiveSymbol
-from ..expr import Expr, symbol
+from ..expr import Expr, symbol, digest
 
 
 __all__ = 'Server', 'to_tree', 'from_tree', 'expr_md5'
@@ -120,7 +119,7 @@ _get_profiler_info = per_app_accesor('profiler_info')
 
 
 def expr_md5(expr):
-    """Returns the md5 hash of the str of the expression.
+    """Returns the md5 digest of the expression.
 
     Parameters
     ----------
@@ -130,12 +129,13 @@ def expr_md5(expr):
     Returns
     -------
     hexdigest : str
-        The hexdigest of the md5 of the str of ``expr``.
+        The hexdigest of ``expr``, the same in every process.
+
+    See Also
+    --------
+    blaze.expr.core.digest
     """
-    exprstr = str(expr)
-    if not isinstance(exprstr, bytes):
-        exprstr = exprstr.encode('utf-8')
-    return md5(exprstr).hexdigest()
+    return digest(expr)
 
 
 def _prof_path(profiler_output, expr):
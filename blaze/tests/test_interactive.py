@@ -493,3 +493,37 @@ def test_isidentical_regr():
     data = np.array([(np.nan,), (np.nan,)], dtype=[('a', 'float64')])
     ds = Data(data)
     assert ds.a.isidentical(ds.a)
+
+
+def test_subs_into_interactive_expression():
+    df = pd.DataFrame({'name': ['Alice', 'Bob'], 'amount': [100, 200]})
+    d = Data(df)
+    expr = (d.amount + 1)._subs({1: 2})
+    assert expr.lhs.isidentical(d.amount)
+    assert into(list, compute(expr)) == [102, 202]
+
+    s = symbol('s', d.dshape)
+    assert (d.amount + 1)._subs({d: s}).isidentical(s.amount + 1)
+
+
+def test_digest_of_data_is_stable_across_processes():
+    import os
+    import subprocess
+    from blaze.expr import digest
+    code = ("from blaze import Data; from blaze.expr import digest;"
+            "from blaze.utils import example;"
+            "import pandas as pd;"
+            "d = Data(example('accounts.csv'));"
+            "df = Data(pd.DataFrame({'x': [1, 2], 'y': ['a', 'b']}));"
+            "print(digest(d.amount.sum()));"
+            "print(digest(df.x.sum()))")
+    env = dict(os.environ, PYTHONHASHSEED='random')
+    result = subprocess.check_output([sys.executable, '-c', code], env=env)
+    df = pd.DataFrame({'x': [1, 2], 'y': ['a', 'b']})
+    expected = [digest(Data(example('accounts.csv')).amount.sum()),
+                digest(Data(df).x.sum())]
+    assert result.decode().split() == expected
+
+    # data in memory is identified by its contents
+    other = pd.DataFrame({'x': [1, 3], 'y': ['a', 'b']})
+    assert digest(Data(other).x.sum()) != expected[1]
@@ -6,7 +6,7 @@ import pandas as pd
 import pytest
 from pytz import utc
 
-from blaze.utils import tmpfile, json_dumps, object_hook
+from blaze.utils import tmpfile, json_dumps, object_hook, prefetch
 
 
 def test_tmpfile():
@@ -30,3 +30,40 @@ def test_json_encoder(input_, serialized):
     result = json.dumps(input_, default=json_dumps)
     assert result == serialized
     assert json.loads(result, object_hook=object_hook) == input_
+
+
+def test_prefetch():
+    assert list(prefetch(range(10), depth=3)) == list(range(10))
+    assert list(prefetch(range(10), depth=0)) == list(range(10))
+    assert list(prefetch([], depth=3)) == []
+
+
+def test_prefetch_reads_a_bounded_number_ahead():
+    import time
+    read = []
+
+    def seq():
+        for i in range(100):
+            read.append(i)
+            yield i
+
+    items = prefetch(seq(), depth=3)
+    assert next(items) == 0
+    time.sleep(0.2)
+    # three queued and one waiting to be queued
+    assert len(read) <= 5
+    items.close()
+    n = len(read)
+    time.sleep(0.2)
+    assert len(read) == n
+
+
+def test_prefetch_raises_reader_errors():
+    def seq():
+        yield 1
+        raise IOError('bad chunk')
+
+    items = prefetch(seq(), depth=2)
+    assert next(items) == 1
+    with pytest.raises(IOError):
+        next(items)
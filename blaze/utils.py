@@ -5,6 +5,12 @@ from collections import Iterator
 from itertools import islice
 import os
 import re
+import threading
+
+try:
+    from queue import Queue, Full
+except ImportError:
+    from Queue import Queue, Full
 
 try:
     from cytoolz import nth, unique, concat, first, drop, curry
@@ -136,6 +142,62 @@ def available_memory():
     return psutil.virtual_memory().available
 
 
+def prefetch(seq, depth=2):
+    """ Iterate over ``seq`` while a background thread reads up to ``depth``
+    items ahead
+
+    Reading the next chunks of a file overlaps with computing on the current
+    one.  The reader blocks once ``depth`` items wait unconsumed.  Errors
+    while reading are raised in the consumer, and the reader stops when the
+    consumer stops early or fails.  With a ``depth`` of zero nothing is read
+    ahead.
+
+    >>> list(prefetch(range(5), depth=2))
+    [0, 1, 2, 3, 4]
+    """
+    if not depth:
+        for item in seq:
+            yield item
+        return
+
+    items = Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def read():
+        try:
+            for item in seq:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except Exception as e:
+            put((None, e))
+
+    reader = threading.Thread(target=read)
+    reader.daemon = True
+    reader.start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+        reader.join()
+
+
 def listpack(x):
     """
     >>> listpack(1)